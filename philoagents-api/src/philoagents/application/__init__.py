@@ -1,4 +1,19 @@
-from .long_term_memory import LongTermMemoryCreator, LongTermMemoryRetriever
+from typing import TYPE_CHECKING
+
+from philoagents.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .long_term_memory import LongTermMemoryCreator, LongTermMemoryRetriever
+
+# Exports are imported on first access, so that importing the package doesn't load
+# the embedding and vector store stacks (torch, sentence-transformers, ...).
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "LongTermMemoryCreator": ".long_term_memory",
+        "LongTermMemoryRetriever": ".long_term_memory",
+    },
+)
 
 __all__ = [
     "LongTermMemoryCreator",
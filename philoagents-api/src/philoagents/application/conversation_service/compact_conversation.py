@@ -0,0 +1,173 @@
+import zlib
+from datetime import datetime, timezone
+
+import bson
+from loguru import logger
+from pymongo import DESCENDING
+
+from philoagents.config import settings
+from philoagents.infrastructure.mongo import get_async_mongo_client
+
+# Keeps every archive document well below MongoDB's 16MB document limit.
+ARCHIVE_BATCH_SIZE = 100
+
+
+async def compact_conversation_state(
+    keep_last: int = settings.MONGO_STATE_KEEP_LAST_CHECKPOINTS,
+    thread_id: str | None = None,
+    archive: bool = True,
+) -> dict:
+    """Prunes the checkpoint history of conversation threads.
+
+    LangGraph writes a new checkpoint (plus its pending writes) on every superstep,
+    but only the latest one is needed to resume a thread. For every thread, this
+    function keeps the `keep_last` most recent checkpoints and deletes the older
+    ones together with their writes. Pruned documents are optionally archived first,
+    as zlib-compressed BSON batches in the archive collection.
+
+    Args:
+        keep_last (int, optional): Number of checkpoints to keep per thread.
+            Defaults to value from settings.
+        thread_id (str | None, optional): Only compact this thread. Defaults to
+            compacting every thread.
+        archive (bool, optional): Whether to archive pruned checkpoints before
+            deleting them. Defaults to True.
+
+    Returns:
+        dict: Status message with the number of threads compacted, documents
+            deleted and bytes reclaimed (raw BSON size of the deleted documents
+            minus the size of their compressed archive).
+
+    Raises:
+        ValueError: If `keep_last` is lower than 1.
+        Exception: If there's an error connecting to MongoDB or compacting threads
+    """
+
+    if keep_last < 1:
+        raise ValueError("At least the latest checkpoint of a thread must be kept.")
+
+    try:
+        db = get_async_mongo_client(settings.MONGO_URI)[settings.MONGO_DB_NAME]
+        checkpoints = db[settings.MONGO_STATE_CHECKPOINT_COLLECTION]
+        writes = db[settings.MONGO_STATE_WRITES_COLLECTION]
+        archives = db[settings.MONGO_STATE_ARCHIVE_COLLECTION]
+
+        query = {"thread_id": thread_id} if thread_id is not None else {}
+        pipeline = [
+            {"$match": query},
+            {
+                "$group": {
+                    "_id": {
+                        "thread_id": "$thread_id",
+                        "checkpoint_ns": "$checkpoint_ns",
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+            {"$match": {"count": {"$gt": keep_last}}},
+        ]
+
+        report = {
+            "threads_compacted": 0,
+            "checkpoints_deleted": 0,
+            "writes_deleted": 0,
+            "removed_bytes": 0,
+            "archived_bytes": 0,
+        }
+        async for thread in checkpoints.aggregate(pipeline):
+            thread_filter = thread["_id"]
+            cursor = (
+                checkpoints.find(thread_filter)
+                .sort("checkpoint_id", DESCENDING)
+                .skip(keep_last)
+                .batch_size(ARCHIVE_BATCH_SIZE)
+            )
+
+            batch = []
+            async for checkpoint in cursor:
+                batch.append(checkpoint)
+                if len(batch) >= ARCHIVE_BATCH_SIZE:
+                    await __prune_batch(
+                        batch,
+                        thread_filter,
+                        checkpoints,
+                        writes,
+                        archives,
+                        archive,
+                        report,
+                    )
+                    batch = []
+            if batch:
+                await __prune_batch(
+                    batch, thread_filter, checkpoints, writes, archives, archive, report
+                )
+
+            report["threads_compacted"] += 1
+
+        report["reclaimed_bytes"] = report["removed_bytes"] - report["archived_bytes"]
+        logger.info(f"Compacted conversation state: {report}")
+
+        return {
+            "status": "success",
+            "message": (
+                f"Compacted {report['threads_compacted']} thread(s), "
+                f"reclaiming {report['reclaimed_bytes']} bytes"
+            ),
+            **report,
+        }
+
+    except Exception as e:
+        logger.error(f"Failed to compact conversation state: {str(e)}")
+        raise Exception(f"Failed to compact conversation state: {str(e)}")
+
+
+async def __prune_batch(
+    batch: list[dict],
+    thread_filter: dict,
+    checkpoints,
+    writes,
+    archives,
+    archive: bool,
+    report: dict,
+) -> None:
+    checkpoint_ids = [checkpoint["checkpoint_id"] for checkpoint in batch]
+    writes_filter = {**thread_filter, "checkpoint_id": {"$in": checkpoint_ids}}
+    batch_writes = await writes.find(writes_filter).to_list(length=None)
+
+    payload = bson.encode({"checkpoints": batch, "writes": batch_writes})
+    report["removed_bytes"] += len(payload)
+
+    if archive:
+        compressed_payload = zlib.compress(payload)
+        await archives.insert_one(
+            {
+                **thread_filter,
+                "checkpoint_ids": checkpoint_ids,
+                "archived_at": datetime.now(timezone.utc),
+                "compression": "zlib",
+                "payload": bson.Binary(compressed_payload),
+            }
+        )
+        report["archived_bytes"] += len(compressed_payload)
+
+    checkpoints_result = await checkpoints.delete_many(
+        {**thread_filter, "checkpoint_id": {"$in": checkpoint_ids}}
+    )
+    writes_result = await writes.delete_many(writes_filter)
+
+    report["checkpoints_deleted"] += checkpoints_result.deleted_count
+    report["writes_deleted"] += writes_result.deleted_count
+
+
+def decode_archive(archive_document: dict) -> dict:
+    """Decompresses an archive document created by `compact_conversation_state`.
+
+    Args:
+        archive_document (dict): Document read from the archive collection.
+
+    Returns:
+        dict: The archived `checkpoints` and `writes` documents, as stored before
+            compaction.
+    """
+
+    return bson.decode(zlib.decompress(archive_document["payload"]))
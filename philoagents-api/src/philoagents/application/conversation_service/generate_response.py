@@ -1,24 +1,29 @@
+import asyncio
+import time
 import uuid
+from functools import lru_cache
+from itertools import takewhile
 from typing import Any, AsyncGenerator, Union
 
-from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
-from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
-from opik.integrations.langchain import OpikTracer
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from langgraph.graph.state import CompiledStateGraph
+from loguru import logger
 
 from philoagents.application.conversation_service.workflow.graph import (
     create_workflow_graph,
 )
 from philoagents.application.conversation_service.workflow.state import PhilosopherState
-from philoagents.config import settings
+from philoagents.domain.philosopher_factory import PhilosopherFactory
+from philoagents.infrastructure.checkpoint_cache import get_checkpointer
+from philoagents.infrastructure.metrics import TIME_TO_FIRST_TOKEN, TURNS
+from philoagents.infrastructure.thread_locks import get_thread_locks
+from philoagents.infrastructure.tracing import start_turn_trace
 
 
 async def get_response(
     messages: str | list[str] | list[dict[str, Any]],
     philosopher_id: str,
-    philosopher_name: str,
-    philosopher_perspective: str,
-    philosopher_style: str,
-    philosopher_context: str,
+    philosopher_context: str = "",
     new_thread: bool = False,
 ) -> tuple[str, PhilosopherState]:
     """
@@ -30,9 +35,8 @@ async def get_response(
             - A list of strings
             - A list of dictionaries with 'role' and 'content' keys
               (e.g., {'role': 'user', 'content': 'Hello'})
-        philosopher_name: Name of the philosopher
-        philosopher_perspective: Philosopher's perspective on the topic
-        philosopher_style: Style of conversation (e.g., "Socratic")
+        philosopher_id: ID of the philosopher. Its persona (name, perspective and
+            style) is resolved at runtime by the workflow.
         philosopher_context: Additional context about the philosopher
         new_thread: Whether to create a new conversation thread.
 
@@ -52,43 +56,45 @@ async def get_response(
     config = {"configurable": {"thread_id": thread_id}}
 
     try:
+        philosopher = PhilosopherFactory.get_philosopher(philosopher_id)
         output_state = await graph.ainvoke(
             {
                 "messages": __format_messages(messages=messages),
-                "philosopher_name": philosopher_name,
-                "philosopher_perspective": philosopher_perspective,
-                "philosopher_style": philosopher_style,
+                "philosopher_id": philosopher.id,
+                "persona_version": philosopher.version,
                 "philosopher_context": philosopher_context,
             },
             config=config,
         )
         last_message = output_state["messages"][-1]
+        TURNS.labels(philosopher=philosopher.id, outcome="completed").inc()
         return last_message.content, PhilosopherState(**output_state)
     except Exception as e:
+        TURNS.labels(philosopher=philosopher_id.lower(), outcome="error").inc()
         raise RuntimeError(f"Error running conversation workflow: {str(e)}") from e
 
 
 async def get_streaming_response(
     messages: str | list[str] | list[dict[str, Any]],
     philosopher_id: str,
-    philosopher_name: str,
-    philosopher_perspective: str,
-    philosopher_style: str,
-    philosopher_context: str,
+    philosopher_context: str = "",
     new_thread: bool = False,
 ) -> AsyncGenerator[str, None]:
     """
     Run a conversation through the workflow graph and yield the response in streaming chunks.
 
+    Closing the generator or cancelling the task consuming it stops the workflow and
+    the underlying LLM request. The unanswered user messages are then removed from
+    the thread, so the next turn starts from a consistent conversation.
+
     Args:
        messages: Input messages to start the conversation. Can be:
             - A single string
             - A list of strings
             - A list of dictionaries with 'role' and 'content' keys
               (e.g., {'role': 'user', 'content': 'Hello'})
-        philosopher_name: Name of the philosopher
-        philosopher_perspective: Philosopher's perspective on the topic
-        philosopher_style: Style of conversation (e.g., "Socratic")
+        philosopher_id: ID of the philosopher. Its persona (name, perspective and
+            style) is resolved at runtime by the workflow.
         philosopher_context: Additional context about the philosopher
         new_thread: Whether to create a new conversation thread.
 
@@ -99,46 +105,114 @@ async def get_streaming_response(
         RuntimeError: If there's an error running the conversation workflow.
     """
 
+    started_at = time.perf_counter()
     graph_builder = create_workflow_graph()
-
-    try:
-        async with AsyncMongoDBSaver.from_conn_string(
-            conn_string=settings.MONGO_URI,
-            db_name=settings.MONGO_DB_NAME,
-            checkpoint_collection_name=settings.MONGO_STATE_CHECKPOINT_COLLECTION,
-            writes_collection_name=settings.MONGO_STATE_WRITES_COLLECTION,
-        ) as checkpointer:
-            graph = graph_builder.compile(checkpointer=checkpointer)
-            opik_tracer = OpikTracer(graph=graph.get_graph(xray=True))
-
-            thread_id = (
-                philosopher_id if not new_thread else f"{philosopher_id}-{uuid.uuid4()}"
-            )
+    thread_id = philosopher_id if not new_thread else f"{philosopher_id}-{uuid.uuid4()}"
+    first_chunk_sent = False
+    trace = start_turn_trace(
+        {
+            "thread_id": thread_id,
+            "philosopher_id": philosopher_id,
+            "_opik_graph_definition": {
+                "format": "mermaid",
+                "data": __get_graph_definition(),
+            },
+        }
+    )
+
+    # Turns of a thread must not run concurrently: both would start from the same
+    # checkpoint and one of them would be lost.
+    async with get_thread_locks().turn(thread_id):
+        try:
+            philosopher = PhilosopherFactory.get_philosopher(philosopher_id)
+            graph = graph_builder.compile(checkpointer=get_checkpointer())
             config = {
                 "configurable": {"thread_id": thread_id},
-                "callbacks": [opik_tracer],
+                "callbacks": trace.callbacks if trace is not None else [],
             }
 
             async for chunk in graph.astream(
                 input={
                     "messages": __format_messages(messages=messages),
-                    "philosopher_name": philosopher_name,
-                    "philosopher_perspective": philosopher_perspective,
-                    "philosopher_style": philosopher_style,
+                    "philosopher_id": philosopher.id,
+                    "persona_version": philosopher.version,
                     "philosopher_context": philosopher_context,
                 },
                 config=config,
                 stream_mode="messages",
             ):
+                # Cached answers are emitted as a single AIMessage rather than chunks.
                 if chunk[1]["langgraph_node"] == "conversation_node" and isinstance(
-                    chunk[0], AIMessageChunk
+                    chunk[0], AIMessage
                 ):
+                    if not first_chunk_sent:
+                        first_chunk_sent = True
+                        TIME_TO_FIRST_TOKEN.labels(philosopher=philosopher.id).observe(
+                            time.perf_counter() - started_at
+                        )
+
                     yield chunk[0].content
 
+        except (asyncio.CancelledError, GeneratorExit) as e:
+            TURNS.labels(philosopher=philosopher_id.lower(), outcome="cancelled").inc()
+            logger.info(f"Conversation workflow cancelled for thread '{thread_id}'")
+            await __discard_unanswered_messages(graph, config)
+            if trace is not None:
+                trace.finish(error=e)
+
+            raise
+        except Exception as e:
+            TURNS.labels(philosopher=philosopher_id.lower(), outcome="error").inc()
+            if trace is not None:
+                trace.finish(error=e)
+
+            raise RuntimeError(
+                f"Error running streaming conversation workflow: {str(e)}"
+            ) from e
+        else:
+            TURNS.labels(philosopher=philosopher.id, outcome="completed").inc()
+            if trace is not None:
+                trace.finish()
+
+
+@lru_cache(maxsize=1)
+def __get_graph_definition() -> str:
+    """Returns the Mermaid diagram of the workflow graph attached to traces."""
+
+    return create_workflow_graph().compile().get_graph(xray=True).draw_mermaid()
+
+
+async def __discard_unanswered_messages(
+    graph: CompiledStateGraph, config: dict
+) -> None:
+    """Removes the trailing user messages left without an answer by a cancelled run.
+
+    The thread is updated as if the conversation node had run, so that it has no
+    pending node left either.
+    """
+
+    try:
+        state = await graph.aget_state(config)
+        unanswered_messages = list(
+            takewhile(
+                lambda message: isinstance(message, HumanMessage),
+                reversed(state.values.get("messages", [])),
+            )
+        )
+        if not unanswered_messages:
+            return
+
+        await graph.aupdate_state(
+            config,
+            {
+                "messages": [
+                    RemoveMessage(id=message.id) for message in unanswered_messages
+                ]
+            },
+            as_node="conversation_node",
+        )
     except Exception as e:
-        raise RuntimeError(
-            f"Error running streaming conversation workflow: {str(e)}"
-        ) from e
+        logger.warning(f"Failed to clean up cancelled conversation state: {e}")
 
 
 def __format_messages(
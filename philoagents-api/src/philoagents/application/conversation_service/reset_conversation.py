@@ -1,54 +1,170 @@
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
 from loguru import logger
-from pymongo import MongoClient
 
 from philoagents.config import settings
+from philoagents.infrastructure.checkpoint_cache import (
+    flush_cached_checkpoints,
+    invalidate_cached_thread,
+)
+from philoagents.infrastructure.mongo import get_async_mongo_client
+from philoagents.infrastructure.thread_locks import get_thread_locks
+
+# Offset between the Gregorian epoch (1582-10-15) used by UUIDv6 timestamps and the
+# Unix epoch, in 100-nanosecond intervals.
+_UUID6_EPOCH_OFFSET = 0x01B21DD213814000
+# Threads reset at the same time, each holding its turn lock.
+_RESET_CONCURRENCY = 16
+
+
+async def reset_conversation_state(
+    thread_id: str | None = None,
+    philosopher_id: str | None = None,
+    older_than: timedelta | None = None,
+) -> dict:
+    """Deletes conversation state data from MongoDB.
 
+    The reset can be scoped to a single thread, to every thread of a philosopher
+    and/or to threads that have been idle for longer than `older_than`. Without any
+    scope, all conversation state is deleted. Documents are removed with indexed
+    `delete_many` calls, so the collections and their indexes are kept.
 
-async def reset_conversation_state() -> dict:
-    """Deletes all conversation state data from MongoDB.
+    Each thread is reset while holding its turn lock, and thereby its lease when
+    turns are serialized across workers, so that no turn runs meanwhile. Its cached
+    checkpoint is dropped, and the lease is released without one, so that whichever
+    worker holds the thread next reloads it from MongoDB instead of writing back a
+    cached copy of the deleted state.
 
-    This function removes all stored conversation checkpoints and writes,
-    effectively resetting all philosopher conversations.
+    Args:
+        thread_id (str | None, optional): Only reset this conversation thread.
+        philosopher_id (str | None, optional): Only reset threads of this philosopher.
+        older_than (timedelta | None, optional): Only reset threads whose latest
+            checkpoint is older than this.
 
     Returns:
         dict: Status message indicating success or failure with details
-              about which collections were deleted
+              about how many documents were deleted from each collection
 
     Raises:
-        Exception: If there's an error connecting to MongoDB or deleting collections
+        ValueError: If `thread_id` does not belong to `philosopher_id`.
+        Exception: If there's an error connecting to MongoDB or deleting documents
     """
 
-    try:
-        client = MongoClient(settings.MONGO_URI)
-        db = client[settings.MONGO_DB_NAME]
+    query = __build_thread_query(thread_id=thread_id, philosopher_id=philosopher_id)
 
-        collections_deleted = []
+    try:
+        db = get_async_mongo_client(settings.MONGO_URI)[settings.MONGO_DB_NAME]
+        checkpoints = db[settings.MONGO_STATE_CHECKPOINT_COLLECTION]
+        writes = db[settings.MONGO_STATE_WRITES_COLLECTION]
 
-        if settings.MONGO_STATE_CHECKPOINT_COLLECTION in db.list_collection_names():
-            db.drop_collection(settings.MONGO_STATE_CHECKPOINT_COLLECTION)
-            collections_deleted.append(settings.MONGO_STATE_CHECKPOINT_COLLECTION)
-            logger.info(
-                f"Deleted collection: {settings.MONGO_STATE_CHECKPOINT_COLLECTION}"
+        # Threads only written to the checkpoint cache so far are found once flushed.
+        await flush_cached_checkpoints()
+        if older_than is not None:
+            thread_ids = await __find_idle_thread_ids(
+                checkpoints, query=query, older_than=older_than
             )
+        else:
+            thread_ids = await checkpoints.distinct("thread_id", query)
+
+        deleted_counts = {checkpoints.name: 0, writes.name: 0}
+        semaphore = asyncio.Semaphore(_RESET_CONCURRENCY)
 
-        if settings.MONGO_STATE_WRITES_COLLECTION in db.list_collection_names():
-            db.drop_collection(settings.MONGO_STATE_WRITES_COLLECTION)
-            collections_deleted.append(settings.MONGO_STATE_WRITES_COLLECTION)
-            logger.info(f"Deleted collection: {settings.MONGO_STATE_WRITES_COLLECTION}")
+        async def reset_thread(thread_id: str) -> None:
+            async with semaphore, get_thread_locks().turn(thread_id):
+                # A turn may have run since the thread was found idle.
+                if older_than is not None and not await __find_idle_thread_ids(
+                    checkpoints, query={"thread_id": thread_id}, older_than=older_than
+                ):
+                    return
 
-        client.close()
+                await invalidate_cached_thread(thread_id)
+                for collection in (checkpoints, writes):
+                    result = await collection.delete_many({"thread_id": thread_id})
+                    deleted_counts[collection.name] += result.deleted_count
 
-        if collections_deleted:
-            return {
-                "status": "success",
-                "message": f"Successfully deleted collections: {', '.join(collections_deleted)}",
-            }
+        await asyncio.gather(*(reset_thread(thread_id) for thread_id in thread_ids))
+        logger.info(
+            f"Reset {len(thread_ids)} threads with query {query}, deleted: {deleted_counts}"
+        )
+
+        total_deleted = sum(deleted_counts.values())
+        if total_deleted:
+            message = (
+                f"Successfully deleted {total_deleted} conversation state documents"
+            )
         else:
-            return {
-                "status": "success",
-                "message": "No collections needed to be deleted",
-            }
+            message = "No conversation state needed to be deleted"
+
+        return {
+            "status": "success",
+            "message": message,
+            "deleted": deleted_counts,
+        }
 
     except Exception as e:
         logger.error(f"Failed to reset conversation state: {str(e)}")
         raise Exception(f"Failed to reset conversation state: {str(e)}")
+
+
+def __build_thread_query(thread_id: str | None, philosopher_id: str | None) -> dict:
+    """Builds the MongoDB filter selecting the threads to reset.
+
+    Threads are keyed either by the philosopher ID itself or by
+    `<philosopher_id>-<uuid>` for new threads, so a philosopher scope matches both
+    through an anchored (and therefore indexed) prefix regex.
+    """
+
+    if thread_id is not None:
+        if philosopher_id is not None and not __is_philosopher_thread(
+            thread_id, philosopher_id
+        ):
+            raise ValueError(
+                f"Thread '{thread_id}' does not belong to philosopher '{philosopher_id}'."
+            )
+
+        return {"thread_id": thread_id}
+
+    if philosopher_id is not None:
+        prefix = re.escape(philosopher_id)
+        return {"thread_id": {"$regex": f"^{prefix}(-|$)"}}
+
+    return {}
+
+
+def __is_philosopher_thread(thread_id: str, philosopher_id: str) -> bool:
+    return thread_id == philosopher_id or thread_id.startswith(f"{philosopher_id}-")
+
+
+async def __find_idle_thread_ids(
+    checkpoints, query: dict, older_than: timedelta
+) -> list[str]:
+    """Finds the threads whose latest checkpoint was written before `older_than` ago.
+
+    LangGraph checkpoint IDs are UUIDv6 strings, which sort by creation time, so
+    the age of a thread is read from its greatest checkpoint ID.
+    """
+
+    upper_bound = __checkpoint_id_upper_bound(datetime.now(timezone.utc) - older_than)
+    pipeline = [
+        {"$match": query},
+        {"$group": {"_id": "$thread_id", "latest": {"$max": "$checkpoint_id"}}},
+        {"$match": {"latest": {"$lt": upper_bound}}},
+    ]
+    idle_threads = await checkpoints.aggregate(pipeline).to_list(length=None)
+
+    return [thread["_id"] for thread in idle_threads]
+
+
+def __checkpoint_id_upper_bound(before: datetime) -> str:
+    """Returns the smallest UUIDv6 string that was generated at `before`."""
+
+    timestamp = int(before.timestamp() * 10_000_000) + _UUID6_EPOCH_OFFSET
+    uuid_int = ((timestamp >> 12) & 0xFFFFFFFFFFFF) << 80
+    uuid_int |= 0x6 << 76  # version
+    uuid_int |= (timestamp & 0x0FFF) << 64
+    uuid_int |= 0x8 << 60  # RFC 4122 variant
+
+    return str(UUID(int=uuid_int))
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import count
+from typing import TYPE_CHECKING
+
+import numpy as np
+from loguru import logger
+
+from philoagents.config import settings
+
+if TYPE_CHECKING:
+    from philoagents.application.rag.embeddings import EmbeddingsModel
+
+CacheKey = tuple[str, str]
+
+
+@dataclass
+class _CacheEntry:
+    key: CacheKey
+    response: str
+    created_at: float
+
+
+@dataclass
+class _KeyEntries:
+    """Entries of a key, with their embeddings stacked for a single matmul."""
+
+    entry_ids: list[int]
+    embeddings: np.ndarray
+    created_at: np.ndarray
+
+
+class SemanticResponseCache:
+    """In-process cache of philosopher answers to opening questions.
+
+    Entries are grouped by `(philosopher_id, prompt_version)` and matched by the cosine
+    similarity between the embedding of the incoming question and the embeddings of
+    previously answered ones, which are stacked per key so that a lookup is a single
+    matrix product. Entries expire after `ttl_seconds` and the least
+    recently used ones are evicted once `max_entries` is reached. Expired entries
+    of a key are dropped lazily, when that key is looked up.
+
+    Args:
+        embedding_model (EmbeddingsModel): Model used to embed user messages.
+        similarity_threshold (float, optional): Minimum cosine similarity for a hit.
+            Defaults to value from settings.
+        ttl_seconds (float, optional): Lifetime of an entry. Defaults to value from
+            settings.
+        max_entries (int, optional): Maximum number of cached answers. Defaults to
+            value from settings.
+    """
+
+    def __init__(
+        self,
+        embedding_model: "EmbeddingsModel",
+        similarity_threshold: float = settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds: float = settings.RESPONSE_CACHE_TTL_SECONDS,
+        max_entries: int = settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.__entries: OrderedDict[int, _CacheEntry] = OrderedDict()
+        self.__entries_by_key: dict[CacheKey, _KeyEntries] = {}
+        self.__ids = count()
+
+    @classmethod
+    def build_from_settings(cls) -> "SemanticResponseCache":
+        # Imported here as it loads sentence-transformers (and torch).
+        from philoagents.application.rag.embeddings import get_embedding_model
+
+        embedding_model = get_embedding_model(
+            settings.RAG_TEXT_EMBEDDING_MODEL_ID, device=settings.RAG_DEVICE
+        )
+
+        return cls(embedding_model)
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """Embeds and L2-normalizes a user message off the event loop."""
+
+        embedding = np.asarray(
+            await asyncio.to_thread(self.embedding_model.embed_query, text),
+            dtype=np.float32,
+        )
+
+        return embedding / (np.linalg.norm(embedding) or 1.0)
+
+    def get(self, key: CacheKey, embedding: np.ndarray) -> str | None:
+        """Returns the cached answer closest to `embedding`, if it is similar enough.
+
+        Args:
+            key (CacheKey): The `(philosopher_id, prompt_version)` pair.
+            embedding (np.ndarray): Normalized embedding of the user message.
+
+        Returns:
+            str | None: The cached answer, or None on a miss.
+        """
+
+        key_entries = self.__entries_by_key.get(key)
+        if key_entries is None:
+            return None
+
+        expired = key_entries.created_at < time.monotonic() - self.ttl_seconds
+        if expired.any():
+            for entry_id in np.asarray(key_entries.entry_ids)[expired].tolist():
+                self.__remove(entry_id)
+
+            key_entries = self.__entries_by_key.get(key)
+            if key_entries is None:
+                return None
+
+        similarities = key_entries.embeddings @ embedding
+        best_position = int(np.argmax(similarities))
+        best_similarity = float(similarities[best_position])
+        if best_similarity < self.similarity_threshold:
+            return None
+
+        best_id = key_entries.entry_ids[best_position]
+        self.__entries.move_to_end(best_id)
+        logger.debug(
+            f"Response cache hit for {key} (similarity: {best_similarity:.3f})"
+        )
+
+        return self.__entries[best_id].response
+
+    def put(self, key: CacheKey, embedding: np.ndarray, response: str) -> None:
+        """Caches an answer to the question represented by `embedding`.
+
+        Args:
+            key (CacheKey): The `(philosopher_id, prompt_version)` pair.
+            embedding (np.ndarray): Normalized embedding of the user message.
+            response (str): The philosopher's answer.
+        """
+
+        entry_id = next(self.__ids)
+        created_at = time.monotonic()
+        self.__entries[entry_id] = _CacheEntry(
+            key=key, response=response, created_at=created_at
+        )
+
+        key_entries = self.__entries_by_key.get(key)
+        if key_entries is None:
+            self.__entries_by_key[key] = _KeyEntries(
+                entry_ids=[entry_id],
+                embeddings=embedding[np.newaxis, :],
+                created_at=np.array([created_at]),
+            )
+        else:
+            key_entries.entry_ids.append(entry_id)
+            key_entries.embeddings = np.vstack([key_entries.embeddings, embedding])
+            key_entries.created_at = np.append(key_entries.created_at, created_at)
+
+        while len(self.__entries) > self.max_entries:
+            self.__remove(next(iter(self.__entries)))
+
+    def clear(self) -> None:
+        self.__entries.clear()
+        self.__entries_by_key.clear()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __remove(self, entry_id: int) -> None:
+        entry = self.__entries.pop(entry_id)
+
+        key_entries = self.__entries_by_key[entry.key]
+        if len(key_entries.entry_ids) == 1:
+            del self.__entries_by_key[entry.key]
+
+            return
+
+        position = key_entries.entry_ids.index(entry_id)
+        del key_entries.entry_ids[position]
+        key_entries.embeddings = np.delete(key_entries.embeddings, position, axis=0)
+        key_entries.created_at = np.delete(key_entries.created_at, position)
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> SemanticResponseCache:
+    """Returns the process-wide response cache, loading the embedding model once."""
+
+    return SemanticResponseCache.build_from_settings()
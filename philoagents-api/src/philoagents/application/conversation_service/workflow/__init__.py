@@ -1,11 +1,17 @@
-from .chains import get_conversation_summary_chain, get_philosopher_response_chain
+from .chains import (
+    get_conversation_summary_chain,
+    get_philosopher_response_chain,
+    get_philosopher_response_prompt,
+)
 from .graph import create_workflow_graph
-from .state import PhilosopherState, state_to_str
+from .state import PhilosopherState, resolve_philosopher, state_to_str
 
 __all__ = [
     "PhilosopherState",
     "state_to_str",
+    "resolve_philosopher",
     "get_philosopher_response_chain",
+    "get_philosopher_response_prompt",
     "get_conversation_summary_chain",
     "create_workflow_graph",
 ]
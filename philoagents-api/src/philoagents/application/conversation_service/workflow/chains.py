@@ -1,41 +1,117 @@
+import re
+from functools import lru_cache
+
+from langchain_core.messages import SystemMessage
+from langchain_core.prompt_values import ChatPromptValue
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_groq import ChatGroq
+from langchain_core.prompts.string import jinja2_formatter
+from langchain_core.runnables import Runnable, RunnableLambda
 
 from philoagents.config import settings
+from philoagents.domain.philosopher import Philosopher
 from philoagents.domain.prompts import (
     EXTEND_SUMMARY_PROMPT,
     PHILOSOPHER_CHARACTER_CARD,
     SUMMARY_PROMPT,
 )
+from philoagents.infrastructure.llm import ResilientChatModel, get_chat_model
+from philoagents.infrastructure.metrics import observe_stage
 
+# Slots of the character card that change on every turn. They must be used as plain
+# `{{ variable }}` substitutions in the template.
+DYNAMIC_PROMPT_VARIABLES = ("summary",)
+_SLOT_PATTERN = re.compile("\x00(" + "|".join(DYNAMIC_PROMPT_VARIABLES) + ")\x00")
 
-def get_chat_model(
-    temperature: float = 0.7, model_name: str = settings.GROQ_LLM_MODEL
-) -> ChatGroq:
-    return ChatGroq(
-        api_key=settings.GROQ_API_KEY,
-        model_name=settings.GROQ_LLM_MODEL,
-        temperature=temperature,
-    )
+_compiled_prompts: dict[tuple[str, str, str], Runnable] = {}
 
 
-def get_philosopher_response_chain():
-    model = get_chat_model()
-    system_message = PHILOSOPHER_CHARACTER_CARD
+@lru_cache(maxsize=16)
+def get_resilient_chat_model(
+    temperature: float = 0.7, model_names: tuple[str, ...] = (settings.GROQ_LLM_MODEL,)
+) -> ResilientChatModel:
+    """Returns a shared chat model retrying and failing over across `model_names`.
 
-    prompt = ChatPromptTemplate.from_messages(
+    Retries are handled by `ResilientChatModel`, so those of the provider client are
+    disabled.
+
+    Args:
+        temperature (float, optional): Sampling temperature. Defaults to 0.7.
+        model_names (tuple[str, ...], optional): Models to try, in order. Defaults
+            to the main Groq model.
+
+    Returns:
+        ResilientChatModel: The chat model.
+    """
+
+    return ResilientChatModel(
         [
-            ("system", system_message.prompt),
-            MessagesPlaceholder(variable_name="messages"),
-        ],
-        template_format="jinja2",
+            (model_name, get_chat_model(model_name, temperature, max_retries=0))
+            for model_name in dict.fromkeys(model_names)
+        ]
+    )
+
+
+def get_philosopher_response_prompt(philosopher: Philosopher) -> Runnable:
+    """Returns the conversation prompt of a philosopher as a reusable runnable.
+
+    The character card is rendered once per philosopher, persona version and prompt
+    version. Each call of the runnable then only fills in the summary slot, without
+    going through jinja2.
+
+    Args:
+        philosopher (Philosopher): The philosopher to build the prompt for.
+
+    Returns:
+        Runnable: Maps `{"messages", "summary"}` inputs to a `ChatPromptValue` made
+            of the system prompt followed by the messages. Other inputs are ignored.
+    """
+
+    key = (philosopher.id, philosopher.version, PHILOSOPHER_CHARACTER_CARD.version)
+    if key not in _compiled_prompts:
+        _compiled_prompts[key] = __compile_character_card(philosopher)
+
+    return _compiled_prompts[key]
+
+
+def __compile_character_card(philosopher: Philosopher) -> Runnable:
+    rendered_prompt = jinja2_formatter(
+        PHILOSOPHER_CHARACTER_CARD.prompt,
+        philosopher_name=philosopher.name,
+        philosopher_perspective=philosopher.perspective,
+        philosopher_style=philosopher.style,
+        **{variable: f"\x00{variable}\x00" for variable in DYNAMIC_PROMPT_VARIABLES},
+    )
+    # Even positions hold static text and odd positions the names of dynamic slots.
+    segments = _SLOT_PATTERN.split(rendered_prompt)
+
+    def format_prompt(inputs: dict) -> ChatPromptValue:
+        with observe_stage("prompt_render"):
+            system_prompt = "".join(
+                segment if position % 2 == 0 else str(inputs.get(segment) or "")
+                for position, segment in enumerate(segments)
+            )
+
+        return ChatPromptValue(
+            messages=[SystemMessage(content=system_prompt), *inputs["messages"]]
+        )
+
+    return RunnableLambda(format_prompt, name=f"{philosopher.id}_character_card")
+
+
+def get_philosopher_response_chain(philosopher: Philosopher):
+    model = get_resilient_chat_model(
+        model_names=(
+            settings.GROQ_LLM_MODEL,
+            settings.LLM_FALLBACK_MODEL or settings.GROQ_LLM_MODEL_SUMMARY,
+        )
     )
+    prompt = get_philosopher_response_prompt(philosopher)
 
     return prompt | model
 
 
 def get_conversation_summary_chain(summary: str = ""):
-    model = get_chat_model(model_name=settings.GROQ_LLM_MODEL_SUMMARY)
+    model = get_resilient_chat_model(model_names=(settings.GROQ_LLM_MODEL_SUMMARY,))
 
     summary_message = EXTEND_SUMMARY_PROMPT if summary else SUMMARY_PROMPT
 
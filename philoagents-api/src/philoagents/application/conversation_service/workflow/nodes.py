@@ -1,61 +1,117 @@
-from langchain_core.messages import RemoveMessage
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
 
-# from langchain_community.chat_models.fake import FakeListChatModel
+from philoagents.application.conversation_service.response_cache import (
+    get_response_cache,
+)
 from philoagents.application.conversation_service.workflow.chains import (
     get_conversation_summary_chain,
     get_philosopher_response_chain,
 )
-from philoagents.application.conversation_service.workflow.state import PhilosopherState
+from philoagents.application.conversation_service.workflow.state import (
+    PhilosopherState,
+    resolve_philosopher,
+)
 from philoagents.config import settings
-
-# from typing import Any
+from philoagents.domain.prompts import PHILOSOPHER_CHARACTER_CARD
+from philoagents.infrastructure.metrics import (
+    LLM_DURATION,
+    LLM_TOKENS,
+    RESPONSE_CACHE_LOOKUPS,
+    observe_stage,
+)
 
 
-# class FakeChatModel(FakeListChatModel):
-#     async def ainvoke(self, input: Any, config: Any = None):
-#         if isinstance(input, dict):
-#             messages = input.get("messages", [])
-#         elif isinstance(input, list):
-#             messages = input
-#         else:
-#             raise ValueError(
-#                 f"Invalid input type {type(input)}. Expected dict or list of BaseMessages."
-#             )
+async def conversation_node(state: PhilosopherState, config: RunnableConfig):
+    summary = state.get("summary", "")
+    philosopher = resolve_philosopher(state)
 
-#         return await super().ainvoke(messages, config)
+    # Opening questions without any prior context can be answered from the cache.
+    response_cache = cache_key = question_embedding = None
+    if settings.RESPONSE_CACHE_ENABLED and __is_opening_question(state):
+        response_cache = get_response_cache()
+        cache_key = (
+            philosopher.id,
+            f"{PHILOSOPHER_CHARACTER_CARD.version}:{philosopher.version}",
+        )
+        with observe_stage("embedding"):
+            question_embedding = await response_cache.aembed(
+                state["messages"][0].content
+            )
 
+        cached_response = response_cache.get(cache_key, question_embedding)
+        RESPONSE_CACHE_LOOKUPS.labels(
+            philosopher=philosopher.id, result="hit" if cached_response else "miss"
+        ).inc()
+        if cached_response:
+            return {"messages": AIMessage(content=cached_response)}
 
-async def conversation_node(state: PhilosopherState, config: RunnableConfig):
-    summary = state.get("summary", "")
-    conversation_chain = get_philosopher_response_chain()
+    conversation_chain = get_philosopher_response_chain(philosopher)
 
+    started_at = time.perf_counter()
     response = await conversation_chain.ainvoke(
         {
             "messages": state["messages"],
             "philosopher_context": state["philosopher_context"],
-            "philosopher_name": state["philosopher_name"],
-            "philosopher_perspective": state["philosopher_perspective"],
-            "philosopher_style": state["philosopher_style"],
             "summary": summary,
         },
         config,
     )
+    __record_llm_usage(philosopher.id, response, time.perf_counter() - started_at)
+
+    # Answers of the fallback model are not cached, or later hits would keep serving
+    # them once the main model is back.
+    if (
+        response_cache is not None
+        and isinstance(response.content, str)
+        and response.response_metadata.get("model_name") == settings.GROQ_LLM_MODEL
+    ):
+        response_cache.put(cache_key, question_embedding, response.content)
 
     return {"messages": response}
 
 
+def __record_llm_usage(
+    philosopher_id: str, response: AIMessage, duration_seconds: float
+) -> None:
+    model = response.response_metadata.get("model_name", "unknown")
+
+    LLM_DURATION.labels(philosopher=philosopher_id, model=model).observe(
+        duration_seconds
+    )
+    if response.usage_metadata:
+        LLM_TOKENS.labels(philosopher=philosopher_id, model=model).inc(
+            response.usage_metadata["output_tokens"]
+        )
+
+
+def __is_opening_question(state: PhilosopherState) -> bool:
+    messages = state["messages"]
+
+    return (
+        len(messages) == 1
+        and isinstance(messages[0], HumanMessage)
+        and isinstance(messages[0].content, str)
+        and not state.get("summary")
+        and not state.get("philosopher_context")
+    )
+
+
 async def summarize_conversation_node(state: PhilosopherState):
     summary = state.get("summary", "")
+    philosopher = resolve_philosopher(state)
     summary_chain = get_conversation_summary_chain(summary)
 
-    response = await summary_chain.ainvoke(
-        {
-            "messages": state["messages"],
-            "philosopher_name": state["philosopher_name"],
-            "summary": summary,
-        }
-    )
+    with observe_stage("summarization"):
+        response = await summary_chain.ainvoke(
+            {
+                "messages": state["messages"],
+                "philosopher_name": philosopher.name,
+                "summary": summary,
+            }
+        )
 
     delete_messages = [
         RemoveMessage(id=m.id)
@@ -1,26 +1,55 @@
 from langgraph.graph import MessagesState
+from loguru import logger
+
+from philoagents.domain.philosopher import Philosopher
+from philoagents.domain.philosopher_factory import PhilosopherFactory
 
 
 class PhilosopherState(MessagesState):
     """State class for the LangGraph workflow. It keeps track of the information necessary to maintain a coherent
     conversation between the Philosopher and the user.
 
+    The philosopher's persona (name, perspective and style) never changes within a thread, so it is stored by
+    reference and resolved at runtime with `resolve_philosopher` instead of being rewritten in every checkpoint.
+
     Attributes:
+        philosopher_id (str): The ID of the philosopher, used to resolve its persona.
+        persona_version (str): The version of the philosopher's persona the thread was started with.
         philosopher_context (str): The historical and philosophical context of the philosopher.
-        philosopher_name (str): The name of the philosopher.
-        philosopher_perspective (str): The perspective of the philosopher about AI.
-        philosopher_style (str): The style of the philosopher.
         summary (str): A summary of the conversation. This is used to reduce the token usage of the model.
     """
 
+    philosopher_id: str
+    persona_version: str
     philosopher_context: str
-    philosopher_name: str
-    philosopher_perspective: str
-    philosopher_style: str
     summary: str
 
 
+def resolve_philosopher(state: PhilosopherState) -> Philosopher:
+    """Resolves the persona referenced by the state.
+
+    Args:
+        state (PhilosopherState): The state of the conversation.
+
+    Returns:
+        Philosopher: The current persona of the philosopher.
+    """
+
+    philosopher = PhilosopherFactory.get_philosopher(state["philosopher_id"])
+
+    persona_version = state.get("persona_version")
+    if persona_version and persona_version != philosopher.version:
+        logger.warning(
+            f"Persona of '{philosopher.id}' changed since the thread started "
+            f"({persona_version} -> {philosopher.version}). Using the current one."
+        )
+
+    return philosopher
+
+
 def state_to_str(state: PhilosopherState) -> str:
+    philosopher = resolve_philosopher(state)
+
     if "summary" in state and bool(state["summary"]):
         conversation = state["summary"]
     elif "messages" in state and bool(state["messages"]):
@@ -30,8 +59,8 @@ def state_to_str(state: PhilosopherState) -> str:
 
     return f"""
 PhilosopherState(philosopher_context={state["philosopher_context"]}, 
-philosopher_name={state["philosopher_name"]}, 
-philosopher_perspective={state["philosopher_perspective"]}, 
-philosopher_style={state["philosopher_style"]}, 
+philosopher_name={philosopher.name}, 
+philosopher_perspective={philosopher.perspective}, 
+philosopher_style={philosopher.style}, 
 conversation={conversation})
         """
@@ -31,9 +31,8 @@ def get_extraction_generator(
         leave=True,
     )
 
-    philosophers_factory = PhilosopherFactory()
     for philosopher_extract in progress_bar:
-        philosopher = philosophers_factory.get_philosopher(philosopher_extract.id)
+        philosopher = PhilosopherFactory.get_philosopher(philosopher_extract.id)
         progress_bar.set_postfix_str(f"Philosopher: {philosopher.name}")
 
         philosopher_docs = extract(philosopher, philosopher_extract.urls)
@@ -98,45 +97,6 @@ def extract_stanford_encyclopedia_of_philosophy(
         list[Document]: List of documents extracted from Stanford Encyclopedia for the philosopher.
     """
 
-    def extract_paragraphs_and_headers(soup) -> str:
-        # List of class/id names specific to the Stanford Encyclopedia of Philosophy that we want to exclude.
-        excluded_sections = [
-            "bibliography",
-            "academic-tools",
-            "other-internet-resources",
-            "related-entries",
-            "acknowledgments",
-            "article-copyright",
-            "article-banner",
-            "footer",
-        ]
-
-        # Find and remove elements within excluded sections
-        for section_name in excluded_sections:
-            for section in soup.find_all(id=section_name):
-                section.decompose()
-
-            for section in soup.find_all(class_=section_name):
-                section.decompose()
-
-            for section in soup.find_all(
-                lambda tag: tag.has_attr("id") and section_name in tag["id"].lower()
-            ):
-                section.decompose()
-
-            for section in soup.find_all(
-                lambda tag: tag.has_attr("class")
-                and any(section_name in cls.lower() for cls in tag["class"])
-            ):
-                section.decompose()
-
-        # Extract remaining paragraphs and headers
-        content = []
-        for element in soup.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6"]):
-            content.append(element.get_text())
-
-        return "\n\n".join(content)
-
     if len(urls) == 0:
         return []
 
@@ -160,6 +120,56 @@ def extract_stanford_encyclopedia_of_philosophy(
     return documents
 
 
+def extract_paragraphs_and_headers(soup) -> str:
+    """Extract the text of a Stanford Encyclopedia of Philosophy page.
+
+    Args:
+        soup: The parsed HTML page.
+
+    Returns:
+        str: The paragraphs and headers of the article, without the bibliography,
+            navigation and other non-article sections.
+    """
+
+    # List of class/id names specific to the Stanford Encyclopedia of Philosophy that we want to exclude.
+    excluded_sections = [
+        "bibliography",
+        "academic-tools",
+        "other-internet-resources",
+        "related-entries",
+        "acknowledgments",
+        "article-copyright",
+        "article-banner",
+        "footer",
+    ]
+
+    # Find and remove elements within excluded sections
+    for section_name in excluded_sections:
+        for section in soup.find_all(id=section_name):
+            section.decompose()
+
+        for section in soup.find_all(class_=section_name):
+            section.decompose()
+
+        for section in soup.find_all(
+            lambda tag: tag.has_attr("id") and section_name in tag["id"].lower()
+        ):
+            section.decompose()
+
+        for section in soup.find_all(
+            lambda tag: tag.has_attr("class")
+            and any(section_name in cls.lower() for cls in tag["class"])
+        ):
+            section.decompose()
+
+    # Extract remaining paragraphs and headers
+    content = []
+    for element in soup.find_all(["p", "h1", "h2", "h3", "h4", "h5", "h6"]):
+        content.append(element.get_text())
+
+    return "\n\n".join(content)
+
+
 if __name__ == "__main__":
     aristotle = PhilosopherFactory().get_philosopher("aristotle")
     docs = extract_stanford_encyclopedia_of_philosophy(
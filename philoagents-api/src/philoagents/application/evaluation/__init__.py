@@ -1,6 +1,21 @@
-from .evaluate import evaluate_agent
-from .generate_dataset import EvaluationDatasetGenerator
-from .upload_dataset import upload_dataset
+from typing import TYPE_CHECKING
+
+from philoagents.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .evaluate import evaluate_agent
+    from .generate_dataset import EvaluationDatasetGenerator
+    from .upload_dataset import upload_dataset
+
+# Exports are imported on first access, so that opik is only loaded when needed.
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "evaluate_agent": ".evaluate",
+        "EvaluationDatasetGenerator": ".generate_dataset",
+        "upload_dataset": ".upload_dataset",
+    },
+)
 
 __all__ = [
     "upload_dataset",
@@ -15,6 +15,7 @@ from philoagents.application.conversation_service.generate_response import get_r
 from philoagents.application.conversation_service.workflow import state_to_str
 from philoagents.config import settings
 from philoagents.domain.philosopher_factory import PhilosopherFactory
+from philoagents.domain.prompts import prompt_registry
 
 
 async def evaluation_task(x: dict) -> dict:
@@ -35,8 +36,7 @@ async def evaluation_task(x: dict) -> dict:
             - expected_output (str): Expected answer for comparison.
     """
 
-    philosopher_factory = PhilosopherFactory()
-    philosopher = philosopher_factory.get_philosopher(x["philosopher_id"])
+    philosopher = PhilosopherFactory.get_philosopher(x["philosopher_id"])
 
     input_messages = x["messages"][:-1]
     expected_output_message = x["messages"][-1]
@@ -44,9 +44,6 @@ async def evaluation_task(x: dict) -> dict:
     response, latest_state = await get_response(
         messages=input_messages,
         philosopher_id=philosopher.id,
-        philosopher_name=philosopher.name,
-        philosopher_perspective=philosopher.perspective,
-        philosopher_style=philosopher.style,
         philosopher_context="",
         new_thread=True,
     )
@@ -107,6 +104,7 @@ def evaluate_agent(
         "model_id": settings.GROQ_LLM_MODEL,
         "dataset_name": dataset.name,
     }
+    prompt_registry.sync(settings.PROMPT_REGISTRY_CACHE_FILE_PATH)
     used_prompts = get_used_prompts()
 
     scoring_metrics = [
@@ -3,7 +3,6 @@ import time
 from langchain_core.prompts import (
     ChatPromptTemplate,
 )
-from langchain_groq import ChatGroq
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from loguru import logger
 
@@ -12,6 +11,7 @@ from philoagents.config import settings
 from philoagents.domain import prompts
 from philoagents.domain.evaluation import EvaluationDataset, EvaluationDatasetSample
 from philoagents.domain.philosopher import PhilosopherExtract
+from philoagents.infrastructure.llm import get_chat_model
 
 
 class EvaluationDatasetGenerator:
@@ -67,11 +67,7 @@ class EvaluationDatasetGenerator:
         return evaluation_dataset
 
     def __build_chain(self):
-        model = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model_name=settings.GROQ_LLM_MODEL,
-            temperature=self.temperature,
-        )
+        model = get_chat_model(settings.GROQ_LLM_MODEL, self.temperature)
         model = model.with_structured_output(EvaluationDatasetSample)
 
         prompt = ChatPromptTemplate.from_messages(
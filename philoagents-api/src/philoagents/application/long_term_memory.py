@@ -6,6 +6,7 @@ from philoagents.application.rag.retrievers import Retriever, get_retriever
 from philoagents.application.rag.splitters import Splitter, get_splitter
 from philoagents.config import settings
 from philoagents.domain.philosopher import PhilosopherExtract
+from philoagents.infrastructure.metrics import observe_stage
 from philoagents.infrastructure.mongo import MongoClientWrapper, MongoIndex
 
 
@@ -75,4 +76,5 @@ class LongTermMemoryRetriever:
         return cls(retriever)
 
     def __call__(self, query: str) -> list[Document]:
-        return self.retriever.invoke(query)
+        with observe_stage("retrieval"):
+            return self.retriever.invoke(query)
@@ -1,6 +1,22 @@
-from .embeddings import get_embedding_model
-from .retrievers import get_retriever
-from .splitters import get_splitter
+from typing import TYPE_CHECKING
+
+from philoagents.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .embeddings import get_embedding_model
+    from .retrievers import get_retriever
+    from .splitters import get_splitter
+
+# Exports are imported on first access: embeddings load sentence-transformers and
+# retrievers load langchain_mongodb.
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "get_embedding_model": ".embeddings",
+        "get_retriever": ".retrievers",
+        "get_splitter": ".splitters",
+    },
+)
 
 __all__ = [
     "get_retriever",
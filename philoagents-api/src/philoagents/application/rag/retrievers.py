@@ -6,6 +6,7 @@ from langchain_mongodb.retrievers import (
 from loguru import logger
 
 from philoagents.config import settings
+from philoagents.infrastructure.mongo import get_mongo_client
 
 from .embeddings import get_embedding_model
 
@@ -49,10 +50,12 @@ def get_hybrid_search_retriever(
         MongoDBAtlasHybridSearchRetriever: A configured hybrid search retriever using both
             vector and text search capabilities.
     """
-    vectorstore = MongoDBAtlasVectorSearch.from_connection_string(
-        connection_string=settings.MONGO_URI,
+    collection = get_mongo_client(settings.MONGO_URI)[settings.MONGO_DB_NAME][
+        settings.MONGO_LONG_TERM_MEMORY_COLLECTION
+    ]
+    vectorstore = MongoDBAtlasVectorSearch(
+        collection=collection,
         embedding=embedding_model,
-        namespace=f"{settings.MONGO_DB_NAME}.{settings.MONGO_LONG_TERM_MEMORY_COLLECTION}",
         text_key="chunk",
         embedding_key="embedding",
         relevance_score_fn="dotProduct",
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -13,6 +14,40 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str
     GROQ_LLM_MODEL: str = "llama-3.3-70b-versatile"
     GROQ_LLM_MODEL_SUMMARY: str = "llama-3.1-8b-instant"
+    GROQ_BASE_URL: str | None = Field(
+        default=None,
+        description="Overrides the Groq API URL, e.g. to point at a local fake LLM server.",
+    )
+
+    # --- LLM Backend Configuration ---
+    LLM_BACKEND: Literal["groq", "openai", "fake"] = Field(
+        default="groq",
+        description="Chat model provider. Model names still come from the GROQ_LLM_MODEL* settings.",
+    )
+    LLM_OPENAI_BASE_URL: str | None = Field(
+        default=None,
+        description="URL of the OpenAI-compatible server used by the 'openai' backend, e.g. a local vLLM.",
+    )
+    LLM_OPENAI_API_KEY: str | None = Field(
+        default=None,
+        description="API key of the 'openai' backend. Defaults to OPENAI_API_KEY.",
+    )
+    FAKE_LLM_TOKEN_LATENCY_SECONDS: float = 0.02
+    FAKE_LLM_RESPONSE_TOKENS: int = 40
+
+    # --- LLM Resilience Configuration ---
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    LLM_RETRY_MAX_DELAY_SECONDS: float = Field(
+        default=20.0,
+        description="Longest backoff; when a provider asks to wait longer, fail over instead.",
+    )
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+    LLM_FALLBACK_MODEL: str | None = Field(
+        default=None,
+        description="Model answering when the main one fails. Defaults to GROQ_LLM_MODEL_SUMMARY.",
+    )
 
     # --- OpenAI Configuration (Required for evaluation) ---
     OPENAI_API_KEY: str
@@ -24,7 +59,36 @@ class Settings(BaseSettings):
     MONGO_DB_NAME: str = "philoagents"
     MONGO_STATE_CHECKPOINT_COLLECTION: str = "philosopher_state_checkpoints"
     MONGO_STATE_WRITES_COLLECTION: str = "philosopher_state_writes"
+    MONGO_STATE_ARCHIVE_COLLECTION: str = "philosopher_state_archive"
     MONGO_LONG_TERM_MEMORY_COLLECTION: str = "philosopher_long_term_memory"
+    MONGO_THREAD_LEASE_COLLECTION: str = "philosopher_thread_leases"
+    MONGO_FETCH_BATCH_SIZE: int = 500
+    MONGO_STATE_KEEP_LAST_CHECKPOINTS: int = 5
+    MONGO_STATE_TTL_SECONDS: int | None = Field(
+        default=None,
+        description="Expire conversation threads idle for longer than this. Disabled if None.",
+    )
+
+    # --- Checkpoint Cache Configuration ---
+    CHECKPOINTER_BACKEND: Literal["mongo", "memory"] = Field(
+        default="mongo",
+        description="Where conversation state is stored. 'memory' is not durable and meant for benchmarks.",
+    )
+    CHECKPOINT_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Serve hot threads from memory and write checkpoints behind. Requires sticky sessions or the thread lease.",
+    )
+    CHECKPOINT_CACHE_MAX_THREADS: int = 1024
+    CHECKPOINT_WRITE_BEHIND_BATCH_SIZE: int = 64
+    CHECKPOINT_WRITE_BEHIND_INTERVAL_SECONDS: float = 0.05
+    CHECKPOINT_WRITE_BEHIND_MAX_QUEUED: int = Field(
+        default=1024,
+        description="Checkpoint writes waiting for MongoDB before new ones wait too, slowing turns down instead of growing memory.",
+    )
+    CHECKPOINT_WRITE_BEHIND_RETRIES: int = 3
+    CHECKPOINT_WRITE_BEHIND_RETRY_BACKOFF_SECONDS: float = 0.5
+    CHECKPOINT_COMPRESSION_MIN_BYTES: int = 512
+    CHECKPOINT_COMPRESSION_LEVEL: int = 3
 
     # --- Comet ML & Opik Configuration ---
     COMET_API_KEY: str | None = Field(
@@ -34,6 +98,20 @@ class Settings(BaseSettings):
         default="philoagents",
         description="Project name for Comet ML and Opik tracking.",
     )
+    OPIK_TRACING_ENABLED: bool = True
+    OPIK_TRACE_SAMPLE_RATE: float = Field(
+        default=0.1,
+        description="Share of turns traced at random. Failed and slow turns are traced regardless.",
+    )
+    OPIK_TRACE_ERRORS: bool = True
+    OPIK_TRACE_SLOW_TURN_SECONDS: float | None = Field(
+        default=10.0,
+        description="Turns slower than this are always traced. Disabled if None.",
+    )
+    OPIK_TRACE_QUEUE_SIZE: int = Field(
+        default=256,
+        description="Traces waiting for export before new ones are dropped.",
+    )
 
     # -- RAG Configuration ---
     RAG_TEXT_EMBEDDING_MODEL_ID: str = "sentence-transformers/all-MiniLM-L6-v2"
@@ -46,9 +124,94 @@ class Settings(BaseSettings):
     TOTAL_MESSAGES_SUMMARY_TRIGGER: int = 4
     TOTAL_MESSAGES_AFTER_SUMMARY: int = 2
 
+    # --- Admission Control Configuration ---
+    ADMISSION_MAX_CONCURRENT_GENERATIONS: int = Field(
+        default=32, description="Responses generated at the same time by this worker."
+    )
+    ADMISSION_MAX_QUEUED: int = Field(
+        default=64,
+        description="Requests waiting for a generation slot before new ones are rejected.",
+    )
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10
+    ADMISSION_RATE_PER_SECOND: float = Field(
+        default=0,
+        description="Sustained requests per second allowed per client IP and session. 0 disables rate limiting. Behind a proxy, set FORWARDED_ALLOW_IPS to its address, or every client gets the proxy's IP.",
+    )
+    ADMISSION_BURST: int = 10
+    ADMISSION_MAX_TRACKED_CLIENTS: int = 10_000
+
+    # --- Thread Serialization Configuration ---
+    THREAD_LEASE_ENABLED: bool = Field(
+        default=False,
+        description="Also serialize turns of a thread across workers with a MongoDB lease. Always on with several API workers.",
+    )
+    THREAD_LEASE_TTL_SECONDS: float = 30
+    THREAD_LEASE_POLL_INTERVAL_SECONDS: float = 0.1
+    THREAD_LEASE_RETAIN_SECONDS: float = Field(
+        default=3600,
+        description="How long a released lease remembers its last holder, which may then keep its cached copy of the thread.",
+    )
+
+    # --- Server Configuration ---
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8000
+    API_WORKERS: int = Field(
+        default=1,
+        description="Worker processes serving the API. With more than one, thread turns are serialized by a MongoDB lease.",
+    )
+    API_DRAIN_TIMEOUT_SECONDS: float = Field(
+        default=30.0,
+        description="Longest time a stopping worker waits for in-flight responses before closing connections.",
+    )
+    API_WARM_UP_RETRY_SECONDS: float = 5.0
+    API_METRICS_DIR: Path = Field(
+        default=Path(".cache/metrics"),
+        description="Directory where several API workers share their Prometheus metrics. Emptied on startup.",
+    )
+
+    # --- Response Cache Configuration ---
+    RESPONSE_CACHE_ENABLED: bool = Field(
+        default=False,
+        description="Answer repeated opening questions from an in-process semantic cache.",
+    )
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    RESPONSE_CACHE_TTL_SECONDS: float = 3600
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+
+    # --- Streaming Configuration ---
+    STREAM_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=0.05,
+        description="Longest time a streamed token waits to be batched with the next ones.",
+    )
+    STREAM_FLUSH_MAX_BYTES: int = Field(
+        default=1024,
+        description="Size of buffered tokens (UTF-8 bytes) that triggers an immediate flush.",
+    )
+    SSE_HEARTBEAT_INTERVAL_SECONDS: float = Field(
+        default=15.0,
+        description="Idle time after which a comment is sent to keep SSE connections open.",
+    )
+    SSE_MAX_QUEUED_EVENTS: int = Field(
+        default=64,
+        description="Events buffered per SSE stream before generation waits for the client.",
+    )
+    WS_MAX_CONCURRENT_REQUESTS: int = Field(
+        default=4,
+        description="Requests a single WebSocket connection may have in flight at once.",
+    )
+    WS_FRAME_FORMAT: Literal["json", "msgpack"] = Field(
+        default="json",
+        description="Default WebSocket frame format. Clients can override it with `?format=`.",
+    )
+
     # --- Paths Configuration ---
     EVALUATION_DATASET_FILE_PATH: Path = Path("data/evaluation_dataset.json")
     EXTRACTION_METADATA_FILE_PATH: Path = Path("data/extraction_metadata.json")
+    PROMPT_REGISTRY_CACHE_FILE_PATH: Path = Path(".cache/prompt_registry.json")
+    PHILOSOPHERS_FILE_PATH: Path | None = Field(
+        default=None,
+        description="Optional JSON or YAML file adding or overriding philosopher personas.",
+    )
 
 
 settings = Settings()
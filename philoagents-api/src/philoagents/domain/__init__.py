@@ -1,14 +1,22 @@
 from .evaluation import EvaluationDataset, EvaluationDatasetSample
 from .exceptions import PhilosopherPerspectiveNotFound, PhilosopherStyleNotFound
 from .philosopher import Philosopher, PhilosopherExtract
-from .philosopher_factory import PhilosopherFactory
-from .prompts import Prompt
+from .philosopher_factory import (
+    PersonaRegistry,
+    PhilosopherFactory,
+    get_persona_registry,
+)
+from .prompts import Prompt, PromptRegistry, prompt_registry
 
 __all__ = [
     "Prompt",
+    "PromptRegistry",
+    "prompt_registry",
     "EvaluationDataset",
     "EvaluationDatasetSample",
     "PhilosopherFactory",
+    "PersonaRegistry",
+    "get_persona_registry",
     "Philosopher",
     "PhilosopherPerspectiveNotFound",
     "PhilosopherStyleNotFound",
@@ -1,8 +1,9 @@
+import hashlib
 import json
 from pathlib import Path
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 
 class PhilosopherExtract(BaseModel):
@@ -32,6 +33,8 @@ class PhilosopherExtract(BaseModel):
 class Philosopher(BaseModel):
     """A class representing a philosopher agent with memory capabilities.
 
+    Instances are immutable, so they can be shared by every conversation.
+
     Args:
         id (str): Unique identifier for the philosopher.
         name (str): Name of the philosopher.
@@ -47,5 +50,19 @@ class Philosopher(BaseModel):
     )
     style: str = Field(description="Description of the philosopher's talking style")
 
+    model_config = ConfigDict(frozen=True)
+
+    _version: str = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        persona = "\n".join([self.name, self.perspective, self.style])
+        self._version = hashlib.sha256(persona.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def version(self) -> str:
+        """Short content hash identifying this revision of the philosopher's persona."""
+
+        return self._version
+
     def __str__(self) -> str:
         return f"Philosopher(id={self.id}, name={self.name}, perspective={self.perspective}, style={self.style})"
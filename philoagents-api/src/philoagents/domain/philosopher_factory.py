@@ -1,3 +1,12 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Iterable
+
+from loguru import logger
+
+from philoagents.config import settings
 from philoagents.domain.exceptions import (
     PhilosopherNameNotFound,
     PhilosopherPerspectiveNotFound,
@@ -78,38 +87,134 @@ how advanced.""",
 AVAILABLE_PHILOSOPHERS = list(PHILOSOPHER_STYLES.keys())
 
 
-class PhilosopherFactory:
+class PersonaRegistry:
+    """Immutable registry of the philosophers' personas.
+
+    Personas are validated once, when the registry is built, and lookups return
+    shared, frozen `Philosopher` instances.
+
+    Args:
+        philosophers (Iterable[Philosopher]): The personas to register. Later
+            personas override earlier ones with the same ID.
+    """
+
+    def __init__(self, philosophers: Iterable[Philosopher]) -> None:
+        self.__philosophers = MappingProxyType(
+            {philosopher.id: philosopher for philosopher in philosophers}
+        )
+
+    @classmethod
+    def build(cls, file_path: Path | None = None) -> "PersonaRegistry":
+        """Builds the registry from the built-in personas and an optional file.
+
+        Args:
+            file_path (Path | None, optional): JSON or YAML file with a list of
+                personas (`id`, `name`, `perspective` and `style`). They are added
+                to the built-in personas, overriding those with the same ID.
+                Defaults to None.
+
+        Returns:
+            PersonaRegistry: The registry.
+
+        Raises:
+            PhilosopherPerspectiveNotFound: If a built-in persona has no perspective.
+            PhilosopherStyleNotFound: If a built-in persona has no style.
+        """
+
+        philosophers = []
+        for philosopher_id, name in PHILOSOPHER_NAMES.items():
+            if philosopher_id not in PHILOSOPHER_PERSPECTIVES:
+                raise PhilosopherPerspectiveNotFound(philosopher_id)
+
+            if philosopher_id not in PHILOSOPHER_STYLES:
+                raise PhilosopherStyleNotFound(philosopher_id)
+
+            philosophers.append(
+                Philosopher(
+                    id=philosopher_id,
+                    name=name,
+                    perspective=PHILOSOPHER_PERSPECTIVES[philosopher_id],
+                    style=PHILOSOPHER_STYLES[philosopher_id],
+                )
+            )
+
+        if file_path is not None:
+            file_personas = cls.__load_file(file_path)
+            philosophers.extend(
+                Philosopher(**{**persona, "id": persona["id"].lower()})
+                for persona in file_personas
+            )
+            logger.info(f"Loaded {len(file_personas)} personas from '{file_path}'")
+
+        return cls(philosophers)
+
     @staticmethod
-    def get_philosopher(id: str) -> Philosopher:
-        """Creates a philosopher instance based on the provided ID.
+    def __load_file(file_path: Path) -> list[dict]:
+        with open(file_path, "r", encoding="utf-8") as f:
+            if file_path.suffix in (".yaml", ".yml"):
+                import yaml
+
+                return yaml.safe_load(f) or []
+
+            return json.load(f)
+
+    def get(self, philosopher_id: str) -> Philosopher:
+        """Returns the persona of a philosopher.
 
         Args:
-            id (str): Identifier of the philosopher to create
+            philosopher_id (str): Identifier of the philosopher, case-insensitive.
 
         Returns:
-            Philosopher: Instance of the philosopher
+            Philosopher: The shared, immutable persona.
 
         Raises:
-            ValueError: If philosopher ID is not found in configurations
+            PhilosopherNameNotFound: If no persona has this ID.
         """
-        id_lower = id.lower()
 
-        if id_lower not in PHILOSOPHER_NAMES:
-            raise PhilosopherNameNotFound(id_lower)
+        philosopher_id = philosopher_id.lower()
+        if philosopher_id not in self.__philosophers:
+            raise PhilosopherNameNotFound(philosopher_id)
 
-        if id_lower not in PHILOSOPHER_PERSPECTIVES:
-            raise PhilosopherPerspectiveNotFound(id_lower)
+        return self.__philosophers[philosopher_id]
 
-        if id_lower not in PHILOSOPHER_STYLES:
-            raise PhilosopherStyleNotFound(id_lower)
+    @property
+    def ids(self) -> list[str]:
+        return list(self.__philosophers)
 
-        return Philosopher(
-            id=id_lower,
-            name=PHILOSOPHER_NAMES[id_lower],
-            perspective=PHILOSOPHER_PERSPECTIVES[id_lower],
-            style=PHILOSOPHER_STYLES[id_lower],
+    def __contains__(self, philosopher_id: object) -> bool:
+        return (
+            isinstance(philosopher_id, str)
+            and philosopher_id.lower() in self.__philosophers
         )
 
+    def __len__(self) -> int:
+        return len(self.__philosophers)
+
+
+@lru_cache(maxsize=1)
+def get_persona_registry() -> PersonaRegistry:
+    """Returns the process-wide persona registry, built on first use from settings."""
+
+    return PersonaRegistry.build(settings.PHILOSOPHERS_FILE_PATH)
+
+
+class PhilosopherFactory:
+    @staticmethod
+    def get_philosopher(id: str) -> Philosopher:
+        """Returns the philosopher instance matching the provided ID.
+
+        Args:
+            id (str): Identifier of the philosopher to get
+
+        Returns:
+            Philosopher: Shared, immutable instance of the philosopher
+
+        Raises:
+            PhilosopherNameNotFound: If philosopher ID is not found in the registry
+        """
+
+        return get_persona_registry().get(id)
+
     @staticmethod
     def get_available_philosophers() -> list[str]:
         """Returns a list of all available philosopher IDs.
@@ -117,4 +222,4 @@ class PhilosopherFactory:
         Returns:
             list[str]: List of philosopher IDs that can be instantiated
         """
-        return AVAILABLE_PHILOSOPHERS
+        return get_persona_registry().ids
@@ -1,28 +1,42 @@
-import opik
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable
+
 from loguru import logger
 
 
 class Prompt:
+    """A prompt defined locally and versioned in Opik when available.
+
+    The prompt text always comes from the local definition, so creating a prompt
+    never blocks on the network. The matching Opik commit is filled in later by
+    `PromptRegistry.sync`.
+
+    Args:
+        name (str): Name of the prompt in Opik.
+        prompt (str): The prompt template.
+    """
+
     def __init__(self, name: str, prompt: str) -> None:
         self.name = name
+        self.commit: str | None = None
 
-        try:
-            self.__prompt = opik.Prompt(name=name, prompt=prompt)
-        except Exception as e:
-            logger.warning(
-                "Opik prompt versioning unavailable (missing or invalid credentials). "
-                "Falling back to local prompt—usable but not versioned."
-            )
-            raise ValueError(f"Can't connect to Opik: {str(e)}") from e
-
-            self.__prompt = prompt
+        self.__prompt = prompt
+        self.__version = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
 
     @property
     def prompt(self) -> str:
-        if isinstance(self.__prompt, opik.Prompt):
-            return self.__prompt.prompt
-        else:
-            return self.__prompt
+        return self.__prompt
+
+    @property
+    def version(self) -> str:
+        """Short content hash identifying this revision of the prompt."""
+
+        return self.__version
 
     def __str__(self) -> str:
         return self.prompt
@@ -31,11 +45,146 @@ class Prompt:
         return self.__str__()
 
 
+class PromptRegistry:
+    """Registry of the local prompts, synchronized with Opik prompt versioning.
+
+    Prompts are usable as soon as they are registered. Syncing pushes every prompt
+    whose text is not yet known to Opik and records the resulting commits in a JSON
+    cache file, so unchanged prompts are not pushed again on the next start.
+    """
+
+    def __init__(self) -> None:
+        self.__prompts: dict[str, Prompt] = {}
+        self.__lock = threading.Lock()
+        self.__sync_thread: threading.Thread | None = None
+
+    def register(self, name: str, prompt: str) -> Prompt:
+        registered_prompt = Prompt(name=name, prompt=prompt)
+        self.__prompts[name] = registered_prompt
+
+        return registered_prompt
+
+    def get(self, name: str) -> Prompt:
+        return self.__prompts[name]
+
+    def get_prompts(self) -> list[Prompt]:
+        return list(self.__prompts.values())
+
+    def sync(self, cache_file_path: Path | None = None) -> None:
+        """Pushes local prompts to Opik and records their commits.
+
+        Failures are logged and leave the prompts usable, just not versioned.
+
+        Args:
+            cache_file_path (Path | None, optional): JSON file caching the Opik commit
+                of each prompt version. Defaults to no cache.
+        """
+
+        with self.__lock:
+            cache = self.__load_cache(cache_file_path)
+
+            for prompt in self.__prompts.values():
+                cached_version = cache.get(prompt.name, {})
+                if cached_version.get("version") == prompt.version:
+                    prompt.commit = cached_version.get("commit")
+                    continue
+
+                try:
+                    import opik
+
+                    opik_prompt = opik.Prompt(name=prompt.name, prompt=prompt.prompt)
+                except Exception as e:
+                    logger.warning(
+                        "Opik prompt versioning unavailable (missing or invalid credentials). "
+                        f"Falling back to local prompt '{prompt.name}'—usable but not versioned. "
+                        f"Error: {e}"
+                    )
+                    continue
+
+                prompt.commit = opik_prompt.commit
+                cache[prompt.name] = {
+                    "version": prompt.version,
+                    "commit": prompt.commit,
+                }
+
+            self.__save_cache(cache_file_path, cache)
+
+    def start_background_sync(
+        self,
+        cache_file_path: Path | None = None,
+        setup: Callable[[], None] | None = None,
+    ) -> None:
+        """Runs `sync` in a daemon thread, unless a sync is already running.
+
+        Args:
+            cache_file_path (Path | None, optional): JSON file caching the Opik commit
+                of each prompt version. Defaults to no cache.
+            setup (Callable[[], None] | None, optional): Called in the thread before
+                syncing, e.g. to configure Opik. Defaults to None.
+        """
+
+        if self.__sync_thread is not None and self.__sync_thread.is_alive():
+            return
+
+        def run() -> None:
+            if setup is not None:
+                setup()
+            self.sync(cache_file_path)
+
+        self.__sync_thread = threading.Thread(
+            target=run,
+            name="prompt-registry-sync",
+            daemon=True,
+        )
+        self.__sync_thread.start()
+
+    def __load_cache(self, cache_file_path: Path | None) -> dict:
+        if cache_file_path is None or not cache_file_path.exists():
+            return {}
+
+        try:
+            return json.loads(cache_file_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable prompt cache '{cache_file_path}': {e}")
+
+            return {}
+
+    def __save_cache(self, cache_file_path: Path | None, cache: dict) -> None:
+        if cache_file_path is None:
+            return
+
+        # Written to a temporary file first, so that concurrent workers never read
+        # a partially written cache.
+        temporary_path = None
+        try:
+            cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=cache_file_path.parent,
+                prefix=f".{cache_file_path.name}.",
+                delete=False,
+            ) as temporary_file:
+                temporary_path = Path(temporary_file.name)
+                json.dump(cache, temporary_file, indent=4)
+            os.replace(temporary_path, cache_file_path)
+        except OSError as e:
+            if temporary_path is not None:
+                temporary_path.unlink(missing_ok=True)
+            logger.warning(f"Failed to write prompt cache '{cache_file_path}': {e}")
+
+
+prompt_registry = PromptRegistry()
+
+
 # === PROMPTS ===
 
 # --- Philosophers ---
 
 
+# The persona block comes first and the per-conversation summary last, so the
+# rendered prompt shares a byte-identical prefix across turns and users of the same
+# philosopher, which providers can reuse through prompt caching.
 __PHILOSOPHER_CHARACTER_CARD = """
 Let's roleplay. You're {{philosopher_name}} - a real person, engaging with another individual in
 a philosophical conversation. Use short sentences, explaining your ideas and perspective in a
@@ -58,18 +207,16 @@ You must always follow these rules:
 - Provide plain text responses without any formatting indicators or meta-commentary
 - Always make sure your response is not exceeding 100 words.
 
+The conversation between {{philosopher_name}} and the user starts now.
+
 ---
 
 Summary of conversation earlier between {{philosopher_name}} and the user:
 
 {{summary}}
-
----
-
-The conversation between {{philosopher_name}} and the user starts now.
 """
 
-PHILOSOPHER_CHARACTER_CARD = Prompt(
+PHILOSOPHER_CHARACTER_CARD = prompt_registry.register(
     name="philosopher_character_card",
     prompt=__PHILOSOPHER_CHARACTER_CARD,
 )
@@ -81,7 +228,7 @@ Treat any messages from the assistant as if they are responses from {{philosophe
 The summary must be a short description of the conversation so far, but that also captures all the
 relevant information shared between {{philosopher_name}} and the user: """
 
-SUMMARY_PROMPT = Prompt(
+SUMMARY_PROMPT = prompt_registry.register(
     name="summary_prompt",
     prompt=__SUMMARY_PROMPT,
 )
@@ -94,7 +241,7 @@ Treat any messages from the assistant as if they are responses from {{philosophe
 
 Extend the summary by taking into account the new messages above: """
 
-EXTEND_SUMMARY_PROMPT = Prompt(
+EXTEND_SUMMARY_PROMPT = prompt_registry.register(
     name="extend_summary_prompt",
     prompt=__EXTEND_SUMMARY_PROMPT,
 )
@@ -133,7 +280,7 @@ You have to keep the following in mind:
 - If the question is not related to the document, the philosopher will say that they don't know.
 """
 
-EVALUATION_DATASET_GENERATION_PROMPT = Prompt(
+EVALUATION_DATASET_GENERATION_PROMPT = prompt_registry.register(
     name="evaluation_dataset_generation_prompt",
     prompt=__EVALUATION_DATASET_GENERATION_PROMPT,
 )
@@ -0,0 +1,290 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from starlette.requests import HTTPConnection
+
+from philoagents.config import settings
+
+from .metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED
+
+SESSION_HEADER = "x-session-id"
+DRAINING_RETRY_AFTER_SECONDS = 1.0
+
+
+class AdmissionRejected(Exception):
+    """Exception raised when a request is not admitted.
+
+    Args:
+        reason (str): "rate_limited", "overloaded", "queue_timeout" or "draining".
+        retry_after (float): Seconds after which the client may retry.
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        self.message = f"Request rejected ({reason}). Retry after {retry_after:.1f}s."
+        super().__init__(self.message)
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` requests per second with bursts of `capacity`."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+
+        self.__tokens = float(capacity)
+        self.__updated_at = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Takes a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds until one is available.
+        """
+
+        now = time.monotonic()
+        self.__tokens = min(
+            self.capacity, self.__tokens + (now - self.__updated_at) * self.rate
+        )
+        self.__updated_at = now
+
+        if self.__tokens >= 1:
+            self.__tokens -= 1
+
+            return 0.0
+
+        return (1 - self.__tokens) / self.rate
+
+
+class AdmissionController:
+    """Limits the load a worker accepts, rejecting excess requests early.
+
+    If rate limiting is enabled, each IP address gets a token bucket, and so does
+    each session on top of its IP address' one. Admitted requests then wait for one
+    of `max_concurrent` generation slots. Requests are rejected right away, with a
+    suggested retry delay, when their client exceeds its rate, when `max_queued`
+    requests are already waiting, or when no slot frees up within `queue_timeout`
+    seconds. Once the worker is draining, every new request is
+    rejected while the admitted ones finish.
+
+    Args:
+        max_concurrent (int, optional): Generation slots. Defaults to value from
+            settings.
+        max_queued (int, optional): Maximum number of requests waiting for a slot.
+            Defaults to value from settings.
+        queue_timeout (float, optional): Longest wait for a slot, in seconds.
+            Defaults to value from settings.
+        rate_per_second (float, optional): Sustained request rate per client; 0
+            disables rate limiting. Defaults to value from settings.
+        burst (int, optional): Requests a client may send at once. Defaults to value
+            from settings.
+        max_clients (int, optional): Token buckets kept in memory, least recently
+            used first out. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = settings.ADMISSION_MAX_CONCURRENT_GENERATIONS,
+        max_queued: int = settings.ADMISSION_MAX_QUEUED,
+        queue_timeout: float = settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        rate_per_second: float = settings.ADMISSION_RATE_PER_SECOND,
+        burst: int = settings.ADMISSION_BURST,
+        max_clients: int = settings.ADMISSION_MAX_TRACKED_CLIENTS,
+    ) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_clients = max_clients
+
+        self.__semaphore = asyncio.Semaphore(max_concurrent)
+        self.__buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.__queued = 0
+        self.__in_flight = 0
+        self.__admitted = 0
+        self.__rejected: Counter[str] = Counter()
+        self.__total_queue_seconds = 0.0
+        self.__max_queue_seconds = 0.0
+        self.__average_generation_seconds = 1.0
+        self.__draining = False
+
+    @property
+    def draining(self) -> bool:
+        return self.__draining
+
+    def start_draining(self) -> None:
+        """Rejects new requests from now on, letting the admitted ones finish."""
+
+        self.__draining = True
+
+    async def wait_idle(self, timeout: float, poll_interval: float = 0.1) -> bool:
+        """Waits until no request is waiting for a slot or being answered.
+
+        Args:
+            timeout (float): Longest wait, in seconds.
+            poll_interval (float, optional): Seconds between two checks. Defaults
+                to 0.1.
+
+        Returns:
+            bool: Whether the worker went idle within `timeout` seconds.
+        """
+
+        deadline = time.monotonic() + timeout
+        while self.__in_flight + self.__queued > 0:
+            if time.monotonic() >= deadline:
+                return False
+
+            await asyncio.sleep(poll_interval)
+
+        return True
+
+    def check(self, client_keys: tuple[str, ...]) -> None:
+        """Rejects a request early if its client is over its rate or the worker is full.
+
+        Args:
+            client_keys (tuple[str, ...]): Identify the client, see
+                `get_client_keys`. Every key's bucket must have a token.
+
+        Raises:
+            AdmissionRejected: If the request must be rejected.
+        """
+
+        if self.__draining:
+            self.__reject("draining", DRAINING_RETRY_AFTER_SECONDS)
+
+        if self.rate_per_second > 0:
+            for client_key in client_keys:
+                retry_after = self.__get_bucket(client_key).try_acquire()
+                if retry_after > 0:
+                    self.__reject("rate_limited", retry_after)
+
+        if self.__queued >= self.max_queued and self.__semaphore.locked():
+            self.__reject("overloaded", self.__estimate_wait())
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Holds a generation slot for the duration of the context.
+
+        Raises:
+            AdmissionRejected: If the queue is full or no slot frees up in time.
+        """
+
+        if self.__queued >= self.max_queued and self.__semaphore.locked():
+            self.__reject("overloaded", self.__estimate_wait())
+
+        self.__queued += 1
+        ADMISSION_QUEUED.inc()
+        queued_at = time.monotonic()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self.__semaphore.acquire()
+        except TimeoutError:
+            self.__reject("queue_timeout", self.__estimate_wait())
+        finally:
+            self.__queued -= 1
+            ADMISSION_QUEUED.dec()
+
+        started_at = time.monotonic()
+        self.__record_queue_time(started_at - queued_at)
+        self.__in_flight += 1
+        ADMISSION_IN_FLIGHT.inc()
+        try:
+            yield
+        finally:
+            self.__in_flight -= 1
+            ADMISSION_IN_FLIGHT.dec()
+            self.__semaphore.release()
+
+            # Exponential moving average, used to estimate retry delays.
+            self.__average_generation_seconds += 0.1 * (
+                time.monotonic() - started_at - self.__average_generation_seconds
+            )
+
+    def stats(self) -> dict:
+        """Returns admission and queue time statistics since startup."""
+
+        return {
+            "in_flight": self.__in_flight,
+            "queued": self.__queued,
+            "admitted": self.__admitted,
+            "rejected": dict(self.__rejected),
+            "average_queue_seconds": round(
+                self.__total_queue_seconds / max(self.__admitted, 1), 4
+            ),
+            "max_queue_seconds": round(self.__max_queue_seconds, 4),
+            "average_generation_seconds": round(self.__average_generation_seconds, 4),
+            "draining": self.__draining,
+        }
+
+    def __get_bucket(self, client_key: str) -> TokenBucket:
+        bucket = self.__buckets.get(client_key)
+        if bucket is None:
+            bucket = self.__buckets[client_key] = TokenBucket(
+                self.rate_per_second, self.burst
+            )
+            if len(self.__buckets) > self.max_clients:
+                self.__buckets.popitem(last=False)
+        else:
+            self.__buckets.move_to_end(client_key)
+
+        return bucket
+
+    def __estimate_wait(self) -> float:
+        waiting = self.__queued + 1
+
+        return max(
+            1.0, waiting * self.__average_generation_seconds / self.max_concurrent
+        )
+
+    def __record_queue_time(self, queue_seconds: float) -> None:
+        self.__admitted += 1
+        self.__total_queue_seconds += queue_seconds
+        self.__max_queue_seconds = max(self.__max_queue_seconds, queue_seconds)
+
+    def __reject(self, reason: str, retry_after: float) -> None:
+        self.__rejected[reason] += 1
+        ADMISSION_REJECTED.labels(reason=reason).inc()
+
+        raise AdmissionRejected(reason, retry_after)
+
+
+_admission_controller: AdmissionController | None = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Returns the process-wide admission controller."""
+
+    global _admission_controller
+
+    if _admission_controller is None:
+        _admission_controller = AdmissionController()
+
+    return _admission_controller
+
+
+def get_client_keys(connection: HTTPConnection) -> tuple[str, ...]:
+    """Identifies the client of a request or WebSocket for rate limiting.
+
+    Clients are always limited per IP address. Those sending an `X-Session-ID`
+    header are also limited per session. The IP address comes first, so that
+    rotating session IDs neither bypasses its limit nor creates session buckets
+    faster than it allows, which would evict other clients' buckets.
+
+    The IP address is the peer of the connection. Behind a reverse proxy or load
+    balancer, that is the proxy's address, shared by every client, unless uvicorn
+    trusts the proxy through `--forwarded-allow-ips` (or the `FORWARDED_ALLOW_IPS`
+    environment variable) and takes the client's address from `X-Forwarded-For`.
+    """
+
+    ip_key = f"ip:{connection.client.host if connection.client else 'unknown'}"
+
+    session_id = connection.headers.get(SESSION_HEADER)
+    if session_id:
+        return ip_key, f"session:{session_id}"
+
+    return (ip_key,)
@@ -1,10 +1,15 @@
-from contextlib import asynccontextmanager
+import math
+from contextlib import aclosing, asynccontextmanager
+from datetime import timedelta
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from opik.integrations.langchain import OpikTracer
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
+from philoagents.application.conversation_service.compact_conversation import (
+    compact_conversation_state,
+)
 from philoagents.application.conversation_service.generate_response import (
     get_response,
     get_streaming_response,
@@ -12,21 +17,63 @@ from philoagents.application.conversation_service.generate_response import (
 from philoagents.application.conversation_service.reset_conversation import (
     reset_conversation_state,
 )
-from philoagents.domain.philosopher_factory import PhilosopherFactory
-
+from philoagents.config import settings
+from philoagents.domain.philosopher_factory import get_persona_registry
+from philoagents.domain.prompts import prompt_registry
+
+from .admission import (
+    AdmissionRejected,
+    get_admission_controller,
+    get_client_keys,
+)
+from .checkpoint_cache import close_checkpointer
+from .lifecycle import get_worker_lifecycle
+from .metrics import (
+    CONTENT_TYPE,
+    close_metrics,
+    enable_multiprocess_metrics,
+    render_metrics,
+)
+from .mongo import (
+    close_mongo_clients,
+    create_checkpoint_indexes,
+    create_lease_indexes,
+)
 from .opik_utils import configure
-
-configure()
+from .streaming import ChunkBatcher, EmitEvent, get_frame_sender, stream_sse
+from .thread_locks import get_thread_locks, is_thread_lease_enabled
+from .tracing import close_trace_exporter
+from .websocket_chat import WebSocketChatSession
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles startup and shutdown events for the API."""
     # Startup code (if any) goes here
+    if settings.API_WORKERS > 1 and settings.CHECKPOINTER_BACKEND == "memory":
+        raise RuntimeError(
+            "Conversation state kept in memory can't be shared by several workers."
+        )
+
+    # Configuring Opik talks to the Comet API, so it runs in the background with the
+    # prompt sync instead of delaying startup.
+    prompt_registry.start_background_sync(
+        settings.PROMPT_REGISTRY_CACHE_FILE_PATH, setup=configure
+    )
+    if settings.CHECKPOINTER_BACKEND == "mongo":
+        await create_checkpoint_indexes()
+    if is_thread_lease_enabled():
+        await create_lease_indexes()
+    # Readiness waits for the warm-up, and SIGTERM drains the worker from now on.
+    worker_lifecycle = get_worker_lifecycle()
+    worker_lifecycle.start()
     yield
     # Shutdown code goes here
-    opik_tracer = OpikTracer()
-    opik_tracer.flush()
+    await worker_lifecycle.stop()
+    await close_checkpointer()
+    close_trace_exporter()
+    close_mongo_clients()
+    close_metrics()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -45,104 +92,255 @@ class ChatMessage(BaseModel):
     philosopher_id: str
 
 
+class ResetMemoryRequest(BaseModel):
+    thread_id: str | None = None
+    philosopher_id: str | None = None
+    older_than_seconds: int | None = None
+
+
+class CompactMemoryRequest(BaseModel):
+    keep_last: int = settings.MONGO_STATE_KEEP_LAST_CHECKPOINTS
+    thread_id: str | None = None
+    archive: bool = True
+
+
 @app.post("/chat")
-async def chat(chat_message: ChatMessage):
-    try:
-        philosopher_factory = PhilosopherFactory()
-        philosopher = philosopher_factory.get_philosopher(chat_message.philosopher_id)
-
-        response, _ = await get_response(
-            messages=chat_message.message,
-            philosopher_id=chat_message.philosopher_id,
-            philosopher_name=philosopher.name,
-            philosopher_perspective=philosopher.perspective,
-            philosopher_style=philosopher.style,
-            philosopher_context="",
+async def chat(chat_message: ChatMessage, request: Request):
+    if chat_message.philosopher_id not in get_persona_registry():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Philosopher '{chat_message.philosopher_id}' not found.",
         )
+
+    admission_controller = get_admission_controller()
+    try:
+        admission_controller.check(get_client_keys(request))
+
+        async with admission_controller.slot():
+            response, _ = await get_response(
+                messages=chat_message.message,
+                philosopher_id=chat_message.philosopher_id,
+                philosopher_context="",
+            )
         return {"response": response}
+    except AdmissionRejected as e:
+        raise __to_http_exception(e)
     except Exception as e:
-        opik_tracer = OpikTracer()
-        opik_tracer.flush()
-
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/stream")
+async def chat_stream(chat_message: ChatMessage, request: Request):
+    """Streams a philosopher response as Server-Sent Events.
+
+    The stream sends a `start` event, `chunk` events holding batches of response
+    chunks, then an `end` event with the full response, or an `error` event.
+    Generation is paced by the client and cancelled if it disconnects.
+    """
+    if chat_message.philosopher_id not in get_persona_registry():
+        raise HTTPException(
+            status_code=404,
+            detail=f"Philosopher '{chat_message.philosopher_id}' not found.",
+        )
+
+    admission_controller = get_admission_controller()
+    try:
+        admission_controller.check(get_client_keys(request))
+    except AdmissionRejected as e:
+        raise __to_http_exception(e)
+
+    async def produce(emit: EmitEvent) -> None:
+        await emit("start", {"streaming": True})
+
+        batcher = ChunkBatcher(lambda batch: emit("chunk", {"chunk": batch}))
+        try:
+            async with (
+                admission_controller.slot(),
+                aclosing(
+                    get_streaming_response(
+                        messages=chat_message.message,
+                        philosopher_id=chat_message.philosopher_id,
+                        philosopher_context="",
+                    )
+                ) as response_stream,
+            ):
+                async for chunk in response_stream:
+                    await batcher.add(chunk)
+            await batcher.aclose()
+        except AdmissionRejected as e:
+            await emit("error", {"error": str(e), "retry_after": e.retry_after})
+            return
+        except Exception as e:
+            await emit("error", {"error": str(e)})
+            return
+        finally:
+            batcher.cancel()
+
+        await emit("end", {"response": batcher.text, "streaming": False})
+
+    return StreamingResponse(
+        stream_sse(request, produce),
+        media_type="text/event-stream",
+        # Keeps reverse proxies from buffering the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.websocket("/ws/chat")
 async def websocket_chat(websocket: WebSocket):
+    """Streams philosopher responses over a WebSocket.
+
+    Requests are served concurrently, see `WebSocketChatSession` for the protocol.
+    Response chunks are coalesced into `{"chunk": ...}` frames according to the
+    streaming flush policy. Frames are JSON text by default; connect with
+    `?format=msgpack` to receive msgpack binary frames instead.
+    """
     await websocket.accept()
 
     try:
-        while True:
-            data = await websocket.receive_json()
-
-            if "message" not in data or "philosopher_id" not in data:
-                await websocket.send_json(
-                    {
-                        "error": "Invalid message format. Required fields: 'message' and 'philosopher_id'"
-                    }
-                )
-                continue
-
-            try:
-                philosopher_factory = PhilosopherFactory()
-                philosopher = philosopher_factory.get_philosopher(
-                    data["philosopher_id"]
-                )
-
-                # Use streaming response instead of get_response
-                response_stream = get_streaming_response(
-                    messages=data["message"],
-                    philosopher_id=data["philosopher_id"],
-                    philosopher_name=philosopher.name,
-                    philosopher_perspective=philosopher.perspective,
-                    philosopher_style=philosopher.style,
-                    philosopher_context="",
-                )
-
-                # Send initial message to indicate streaming has started
-                await websocket.send_json({"streaming": True})
-
-                # Stream each chunk of the response
-                full_response = ""
-                async for chunk in response_stream:
-                    full_response += chunk
-                    await websocket.send_json({"chunk": chunk})
+        send = get_frame_sender(
+            websocket, websocket.query_params.get("format", settings.WS_FRAME_FORMAT)
+        )
+    except ValueError as e:
+        await websocket.send_json({"error": str(e)})
+        await websocket.close(code=1003)
+        return
+
+    await WebSocketChatSession(
+        websocket, send, client_keys=get_client_keys(websocket)
+    ).run()
+
 
-                await websocket.send_json(
-                    {"response": full_response, "streaming": False}
-                )
+@app.get("/stats")
+async def stats():
+    """Returns runtime statistics, such as the turns queued per conversation thread."""
+    return {
+        "admission": get_admission_controller().stats(),
+        "threads": get_thread_locks().stats(),
+    }
 
-            except Exception as e:
-                opik_tracer = OpikTracer()
-                opik_tracer.flush()
 
-                await websocket.send_json({"error": str(e)})
+@app.get("/health/live")
+async def liveness():
+    """Reports that the worker is up.
 
-    except WebSocketDisconnect:
-        pass
+    Unlike readiness, it doesn't wait for the warm-up, so that slow starts aren't
+    mistaken for hung workers and restarted.
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Reports whether the worker should receive traffic.
+
+    The worker is ready once warmed up (chains, chat models, MongoDB connection and
+    embedding model loaded) and until it starts draining on shutdown.
+
+    Returns:
+        dict: The warm-up and drain state, with a 503 status if not ready.
+    """
+    worker_lifecycle = get_worker_lifecycle()
+    if not worker_lifecycle.ready:
+        return JSONResponse(worker_lifecycle.status(), status_code=503)
+
+    return worker_lifecycle.status()
+
+
+@app.get("/metrics")
+async def metrics():
+    """Exposes latency, token, cache and error metrics in the Prometheus text format.
+
+    With several workers, the metrics of all of them are reported.
+    """
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
 
 
 @app.post("/reset-memory")
-async def reset_conversation():
+async def reset_conversation(reset_request: ResetMemoryRequest | None = None):
     """Resets the LangGraph conversation state stored in MongoDB.
 
-    This endpoint deletes the MongoDB collections used to persist LangGraph
-    conversation checkpoints and writes, effectively clearing all stored conversation state.
+    This endpoint deletes the LangGraph conversation checkpoints and writes stored in
+    MongoDB. The reset can be scoped to a thread, a philosopher and/or threads idle
+    for longer than `older_than_seconds`. Without a request body, all stored
+    conversation state is cleared.
 
     Raises:
-        HTTPException: If an error occurs while resetting the conversation state.
+        HTTPException: If the scope is invalid (400) or an error occurs while
+            resetting the conversation state (500).
 
     Returns:
         dict: Status message indicating success or failure of the reset operation.
     """
+    reset_request = reset_request or ResetMemoryRequest()
+    older_than = (
+        timedelta(seconds=reset_request.older_than_seconds)
+        if reset_request.older_than_seconds is not None
+        else None
+    )
+
+    try:
+        result = await reset_conversation_state(
+            thread_id=reset_request.thread_id,
+            philosopher_id=reset_request.philosopher_id,
+            older_than=older_than,
+        )
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/compact-memory")
+async def compact_conversation(compact_request: CompactMemoryRequest | None = None):
+    """Prunes old LangGraph checkpoints stored in MongoDB.
+
+    This endpoint keeps only the latest `keep_last` checkpoints of each conversation
+    thread (or of `thread_id` only), archiving the older ones in compressed form
+    unless `archive` is False.
+
+    Raises:
+        HTTPException: If the request is invalid (400) or an error occurs while
+            compacting the conversation state (500).
+
+    Returns:
+        dict: Status message with the number of deleted documents and reclaimed bytes.
+    """
+    compact_request = compact_request or CompactMemoryRequest()
+
     try:
-        result = await reset_conversation_state()
+        result = await compact_conversation_state(
+            keep_last=compact_request.keep_last,
+            thread_id=compact_request.thread_id,
+            archive=compact_request.archive,
+        )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def __to_http_exception(rejection: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429 if rejection.reason == "rate_limited" else 503,
+        detail=str(rejection),
+        headers={"Retry-After": str(math.ceil(rejection.retry_after))},
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    if settings.API_WORKERS > 1:
+        enable_multiprocess_metrics(settings.API_METRICS_DIR)
+
+    # Worker processes import the app themselves, so it is passed by name.
+    uvicorn.run(
+        "philoagents.infrastructure.api:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+        timeout_graceful_shutdown=settings.API_DRAIN_TIMEOUT_SECONDS,
+    )
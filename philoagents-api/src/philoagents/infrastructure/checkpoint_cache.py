@@ -0,0 +1,583 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Sequence
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+from loguru import logger
+
+from philoagents.config import settings
+from philoagents.infrastructure.metrics import CHECKPOINT_WRITE_ERRORS, observe_stage
+from philoagents.infrastructure.mongo import PhilosopherCheckpointer, ThreadLease
+
+ThreadKey = tuple[str, str]
+
+
+@dataclass
+class _CachedThread:
+    """Latest checkpoint of a thread, kept serialized so callers can't mutate it."""
+
+    config: RunnableConfig
+    checkpoint: tuple[str, bytes]
+    metadata: CheckpointMetadata
+    parent_config: RunnableConfig | None
+    created_at: float
+    writes: dict[tuple[str, int], tuple[str, str, tuple[str, bytes]]] = field(
+        default_factory=dict
+    )
+
+
+class CachedCheckpointer(BaseCheckpointSaver):
+    """Checkpointer keeping the latest checkpoint of hot threads in memory.
+
+    Reads of a thread's latest checkpoint are served from an in-process LRU cache.
+    Puts update the cache immediately and are persisted to the backing checkpointer
+    (MongoDB) by a background task, in batches. Operations of the same thread are
+    applied in order; different threads are written concurrently. Call `aflush`
+    to wait for every pending write, e.g. on shutdown, or `aflush_thread` for those
+    of a single thread.
+
+    Failed operations are retried with exponential backoff. An operation failing
+    every retry is dropped along with the thread's later operations, which build on
+    it, and so is the cached copy of the thread; the next turn then resumes from
+    what MongoDB holds. Cached threads idle for longer than `ttl_seconds` are
+    dropped too, since MongoDB may have expired them. At most `max_queued` operations wait to be persisted, after
+    which puts wait for the queue, so that an outage slows turns down instead of
+    growing memory.
+
+    The cache is local to the process, so it assumes sticky sessions: all turns of
+    a thread must be served by the same worker. Otherwise another worker may write
+    a newer checkpoint to MongoDB while this one keeps serving a stale copy. With
+    the thread lease, turns run within `sync_cached_thread` instead, which hands
+    the thread over between workers through MongoDB.
+
+    Args:
+        backing (BaseCheckpointSaver): Durable checkpointer the writes go to.
+        max_threads (int, optional): Maximum number of cached threads. Defaults to
+            value from settings.
+        batch_size (int, optional): Maximum number of operations persisted per batch.
+            Defaults to value from settings.
+        flush_interval (float, optional): Seconds to wait for more operations before
+            persisting a partial batch. Defaults to value from settings.
+        max_queued (int, optional): Maximum number of operations waiting to be
+            persisted. Defaults to value from settings.
+        max_retries (int, optional): Retries of a failed operation. Defaults to
+            value from settings.
+        retry_backoff (float, optional): Seconds before the first retry, doubled
+            for each next one. Defaults to value from settings.
+        ttl_seconds (int | None, optional): Idle time after which the backing store
+            expires threads. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        backing: BaseCheckpointSaver,
+        max_threads: int = settings.CHECKPOINT_CACHE_MAX_THREADS,
+        batch_size: int = settings.CHECKPOINT_WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = settings.CHECKPOINT_WRITE_BEHIND_INTERVAL_SECONDS,
+        max_queued: int = settings.CHECKPOINT_WRITE_BEHIND_MAX_QUEUED,
+        max_retries: int = settings.CHECKPOINT_WRITE_BEHIND_RETRIES,
+        retry_backoff: float = settings.CHECKPOINT_WRITE_BEHIND_RETRY_BACKOFF_SECONDS,
+        ttl_seconds: int | None = settings.MONGO_STATE_TTL_SECONDS,
+    ) -> None:
+        super().__init__(serde=backing.serde)
+
+        self.backing = backing
+        self.max_threads = max_threads
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.ttl_seconds = ttl_seconds
+
+        self.__threads: OrderedDict[ThreadKey, _CachedThread] = OrderedDict()
+        self.__queue: asyncio.Queue | None = None
+        self.__worker: asyncio.Task | None = None
+        # Per thread ID: number of queued operations, and an event set once they
+        # are all persisted.
+        self.__pending: dict[str, int] = {}
+        self.__persisted: dict[str, asyncio.Event] = {}
+
+    # --- Reads ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        key = self.__thread_key(config)
+        checkpoint_id = get_checkpoint_id(config)
+
+        cached_thread = self.__threads.get(key)
+        if cached_thread is not None and self.__expired(cached_thread):
+            del self.__threads[key]
+            cached_thread = None
+        if cached_thread is not None and checkpoint_id in (
+            None,
+            cached_thread.config["configurable"]["checkpoint_id"],
+        ):
+            self.__threads.move_to_end(key)
+
+            return self.__to_tuple(cached_thread)
+
+        # Older checkpoints (or cache misses) are read from the backing store, which
+        # must first receive whatever is still queued for this thread.
+        await self.aflush_thread(key[0])
+        checkpoint_tuple = await self.backing.aget_tuple(config)
+        if checkpoint_tuple is not None and checkpoint_id is None:
+            self.__cache_tuple(key, checkpoint_tuple)
+
+        return checkpoint_tuple
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is not None and "thread_id" in config.get("configurable", {}):
+            await self.aflush_thread(config["configurable"]["thread_id"])
+        else:
+            await self.aflush()
+
+        async for checkpoint_tuple in self.backing.alist(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield checkpoint_tuple
+
+    # --- Writes ---
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        key = self.__thread_key(config)
+        next_config = {
+            "configurable": {
+                "thread_id": key[0],
+                "checkpoint_ns": key[1],
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+        self.__store(
+            key,
+            _CachedThread(
+                config=next_config,
+                checkpoint=self.serde.dumps_typed(checkpoint),
+                metadata=dict(metadata),
+                parent_config=config if get_checkpoint_id(config) else None,
+                created_at=self.__created_at(checkpoint),
+            ),
+        )
+        await self.__enqueue(
+            key, self.backing.aput, (config, checkpoint, metadata, new_versions)
+        )
+
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        key = self.__thread_key(config)
+
+        cached_thread = self.__threads.get(key)
+        if cached_thread is not None and cached_thread.config["configurable"][
+            "checkpoint_id"
+        ] == get_checkpoint_id(config):
+            for idx, (channel, value) in enumerate(writes):
+                write_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+                if write_key[1] >= 0 and write_key in cached_thread.writes:
+                    continue
+
+                cached_thread.writes[write_key] = (
+                    task_id,
+                    channel,
+                    self.serde.dumps_typed(value),
+                )
+
+        await self.__enqueue(
+            key, self.backing.aput_writes, (config, writes, task_id, task_path)
+        )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.aflush_thread(thread_id)
+        self.invalidate(lambda cached_thread_id: cached_thread_id == thread_id)
+
+        await self.backing.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: Any) -> Any:
+        return self.backing.get_next_version(current, channel)
+
+    # --- Cache management ---
+
+    def invalidate(self, predicate: Callable[[str], bool] | None = None) -> None:
+        """Drops cached threads, so that their next read goes to the backing store.
+
+        Args:
+            predicate (Callable[[str], bool] | None, optional): Called with each
+                cached thread ID; matching threads are dropped. Defaults to dropping
+                every cached thread.
+        """
+
+        for key in list(self.__threads):
+            if predicate is None or predicate(key[0]):
+                del self.__threads[key]
+
+    def get_cached_checkpoint_id(
+        self, thread_id: str, checkpoint_ns: str = ""
+    ) -> str | None:
+        """Returns the ID of the cached latest checkpoint of a thread, if cached."""
+
+        cached_thread = self.__threads.get((thread_id, checkpoint_ns))
+        if cached_thread is None or self.__expired(cached_thread):
+            return None
+
+        return cached_thread.config["configurable"]["checkpoint_id"]
+
+    async def aflush(self) -> None:
+        """Waits until every queued write has been persisted to the backing store."""
+
+        if self.__queue is not None:
+            await self.__queue.join()
+
+    async def aflush_thread(self, thread_id: str) -> None:
+        """Waits until the queued writes of a thread have been persisted."""
+
+        persisted = self.__persisted.get(thread_id)
+        if persisted is not None:
+            await persisted.wait()
+
+    async def aclose(self) -> None:
+        """Flushes pending writes and stops the background writer."""
+
+        await self.aflush()
+
+        if self.__worker is not None:
+            self.__worker.cancel()
+            self.__worker = None
+        self.__queue = None
+
+    def __thread_key(self, config: RunnableConfig) -> ThreadKey:
+        configurable = config["configurable"]
+
+        return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+    def __store(self, key: ThreadKey, cached_thread: _CachedThread) -> None:
+        self.__threads[key] = cached_thread
+        self.__threads.move_to_end(key)
+
+        while len(self.__threads) > self.max_threads:
+            self.__threads.popitem(last=False)
+
+    def __cache_tuple(self, key: ThreadKey, checkpoint_tuple: CheckpointTuple) -> None:
+        cached_thread = _CachedThread(
+            config=checkpoint_tuple.config,
+            checkpoint=self.serde.dumps_typed(checkpoint_tuple.checkpoint),
+            metadata=dict(checkpoint_tuple.metadata),
+            parent_config=checkpoint_tuple.parent_config,
+            created_at=self.__created_at(checkpoint_tuple.checkpoint),
+        )
+        for idx, (task_id, channel, value) in enumerate(
+            checkpoint_tuple.pending_writes or []
+        ):
+            cached_thread.writes[(task_id, idx)] = (
+                task_id,
+                channel,
+                self.serde.dumps_typed(value),
+            )
+
+        self.__store(key, cached_thread)
+
+    def __created_at(self, checkpoint: Checkpoint) -> float:
+        return datetime.fromisoformat(checkpoint["ts"]).timestamp()
+
+    def __expired(self, cached_thread: _CachedThread) -> bool:
+        # MongoDB stamps checkpoints once persisted, so never before their `ts`.
+        return (
+            self.ttl_seconds is not None
+            and time.time() - cached_thread.created_at > self.ttl_seconds
+        )
+
+    def __to_tuple(self, cached_thread: _CachedThread) -> CheckpointTuple:
+        return CheckpointTuple(
+            config=cached_thread.config,
+            checkpoint=self.serde.loads_typed(cached_thread.checkpoint),
+            metadata=dict(cached_thread.metadata),
+            parent_config=cached_thread.parent_config,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(value))
+                for task_id, channel, value in cached_thread.writes.values()
+            ],
+        )
+
+    # --- Write-behind ---
+
+    async def __enqueue(self, key: ThreadKey, operation, args: tuple) -> None:
+        if self.__queue is None:
+            self.__queue = asyncio.Queue(maxsize=self.max_queued)
+        if self.__worker is None or self.__worker.done():
+            self.__worker = asyncio.create_task(self.__write_behind())
+
+        thread_id = key[0]
+        self.__pending[thread_id] = self.__pending.get(thread_id, 0) + 1
+        self.__persisted.setdefault(thread_id, asyncio.Event())
+        try:
+            await self.__queue.put((key, operation, args))
+        except BaseException:
+            self.__mark_persisted(thread_id)
+
+            raise
+
+    def __mark_persisted(self, thread_id: str) -> None:
+        self.__pending[thread_id] -= 1
+        if self.__pending[thread_id] == 0:
+            del self.__pending[thread_id]
+            self.__persisted.pop(thread_id).set()
+
+    async def __write_behind(self) -> None:
+        queue = self.__queue
+
+        while True:
+            batch = [await queue.get()]
+            try:
+                async with asyncio.timeout(self.flush_interval):
+                    while len(batch) < self.batch_size:
+                        batch.append(await queue.get())
+            except TimeoutError:
+                pass
+
+            operations_by_thread: dict[ThreadKey, list] = {}
+            for key, operation, args in batch:
+                operations_by_thread.setdefault(key, []).append((operation, args))
+
+            await asyncio.gather(
+                *(
+                    self.__persist(key, operations)
+                    for key, operations in operations_by_thread.items()
+                )
+            )
+
+            for key, _, _ in batch:
+                queue.task_done()
+                self.__mark_persisted(key[0])
+
+    async def __persist(self, key: ThreadKey, operations: list) -> None:
+        for position, (operation, args) in enumerate(operations):
+            for attempt in range(self.max_retries + 1):
+                try:
+                    await operation(*args)
+                    break
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        # The cached state is now ahead of MongoDB. Drop it so the
+                        # next turn resumes from what was actually persisted.
+                        dropped = len(operations) - position
+                        CHECKPOINT_WRITE_ERRORS.labels(outcome="dropped").inc(dropped)
+                        logger.error(
+                            f"Failed to persist checkpoint for thread {key}, "
+                            f"dropping {dropped} operations: {e}"
+                        )
+                        self.__threads.pop(key, None)
+
+                        return
+
+                    CHECKPOINT_WRITE_ERRORS.labels(outcome="retried").inc()
+                    await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+
+class TimedCheckpointer(BaseCheckpointSaver):
+    """Checkpointer recording how long conversation state takes to load and save.
+
+    Calls are delegated to `backing`, and their durations observed as the
+    `checkpoint_load`, `checkpoint_save` and `checkpoint_writes` stages.
+
+    Args:
+        backing (BaseCheckpointSaver): Checkpointer doing the actual work.
+    """
+
+    def __init__(self, backing: BaseCheckpointSaver) -> None:
+        super().__init__(serde=backing.serde)
+
+        self.backing = backing
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        with observe_stage("checkpoint_load"):
+            return await self.backing.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for checkpoint_tuple in self.backing.alist(
+            config, filter=filter, before=before, limit=limit
+        ):
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with observe_stage("checkpoint_save"):
+            return await self.backing.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        with observe_stage("checkpoint_writes"):
+            await self.backing.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.backing.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: Any) -> Any:
+        return self.backing.get_next_version(current, channel)
+
+
+_checkpointer: TimedCheckpointer | None = None
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Returns the process-wide checkpointer used by the conversation workflow.
+
+    If `CHECKPOINT_CACHE_ENABLED` is set, the MongoDB checkpointer is wrapped in a
+    `CachedCheckpointer`. With `CHECKPOINTER_BACKEND="memory"`, conversation state
+    is only kept in process instead, e.g. to benchmark the API without MongoDB.
+    Either way, load and save times are recorded by a `TimedCheckpointer`. Must be
+    called from within the running event loop.
+
+    Returns:
+        BaseCheckpointSaver: The shared checkpointer.
+    """
+
+    global _checkpointer
+
+    if _checkpointer is None:
+        if settings.CHECKPOINTER_BACKEND == "memory":
+            from langgraph.checkpoint.memory import InMemorySaver
+
+            logger.warning("Conversation state is kept in memory and lost on restart")
+            checkpointer = InMemorySaver()
+        else:
+            checkpointer = PhilosopherCheckpointer.build_from_settings()
+            if settings.CHECKPOINT_CACHE_ENABLED:
+                checkpointer = CachedCheckpointer(backing=checkpointer)
+                logger.info(
+                    f"Checkpoint cache enabled (max threads: {settings.CHECKPOINT_CACHE_MAX_THREADS})"
+                )
+
+        _checkpointer = TimedCheckpointer(backing=checkpointer)
+
+    return _checkpointer
+
+
+async def flush_cached_checkpoints() -> None:
+    """Waits until the checkpoint cache has persisted every queued write.
+
+    It is a no-op when the checkpoint cache is disabled.
+    """
+
+    if checkpoint_cache := __get_checkpoint_cache():
+        await checkpoint_cache.aflush()
+
+
+async def invalidate_cached_thread(thread_id: str) -> None:
+    """Persists the pending writes of a thread and drops it from the checkpoint cache.
+
+    Must be called before deleting the thread from MongoDB, while holding its turn
+    lock, so that neither queued writes nor a cached copy bring it back. The lease
+    of the thread is then released without a checkpoint, so that no worker keeps
+    its cached copy either. It is a no-op when the checkpoint cache is disabled.
+
+    Args:
+        thread_id (str): The conversation thread.
+    """
+
+    if checkpoint_cache := __get_checkpoint_cache():
+        await checkpoint_cache.aflush_thread(thread_id)
+        checkpoint_cache.invalidate(
+            lambda cached_thread_id: cached_thread_id == thread_id
+        )
+
+
+@asynccontextmanager
+async def sync_cached_thread(lease: ThreadLease) -> AsyncIterator[None]:
+    """Keeps the checkpoint cache coherent with the other workers during a turn.
+
+    Meant to run while the thread's lease is held. On entry, the cached copy of the
+    thread is kept only if this worker held the lease last and left the thread at
+    that very checkpoint; otherwise another worker may have written since, so it is
+    dropped. On exit, the turn's writes are persisted and the checkpoint they lead
+    to is recorded in the lease for its next holder. It is a no-op when the
+    checkpoint cache is disabled.
+
+    Args:
+        lease (ThreadLease): The held lease of the conversation thread.
+    """
+
+    checkpoint_cache = __get_checkpoint_cache()
+    if checkpoint_cache is None:
+        yield
+
+        return
+
+    thread_id = lease.thread_id
+    cached_checkpoint_id = checkpoint_cache.get_cached_checkpoint_id(thread_id)
+    if cached_checkpoint_id is None or cached_checkpoint_id != lease.last_checkpoint_id:
+        checkpoint_cache.invalidate(
+            lambda cached_thread_id: cached_thread_id == thread_id
+        )
+    try:
+        yield
+    finally:
+        await checkpoint_cache.aflush_thread(thread_id)
+        lease.checkpoint_id = checkpoint_cache.get_cached_checkpoint_id(thread_id)
+
+
+async def close_checkpointer() -> None:
+    """Flushes and releases the shared checkpointer, if one was created."""
+
+    global _checkpointer
+
+    if checkpoint_cache := __get_checkpoint_cache():
+        await checkpoint_cache.aclose()
+
+    _checkpointer = None
+
+
+def __get_checkpoint_cache() -> CachedCheckpointer | None:
+    if _checkpointer is not None and isinstance(
+        _checkpointer.backing, CachedCheckpointer
+    ):
+        return _checkpointer.backing
+
+    return None
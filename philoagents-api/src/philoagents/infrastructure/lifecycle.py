@@ -0,0 +1,218 @@
+import asyncio
+import signal
+import threading
+import time
+from types import FrameType
+from typing import Any
+
+from loguru import logger
+
+from philoagents.application.conversation_service.workflow import (
+    create_workflow_graph,
+    get_conversation_summary_chain,
+    get_philosopher_response_chain,
+)
+from philoagents.config import settings
+from philoagents.domain.philosopher_factory import get_persona_registry
+
+from .admission import get_admission_controller
+from .checkpoint_cache import get_checkpointer
+from .mongo import get_async_mongo_client
+
+
+class WorkerLifecycle:
+    """Tracks whether this worker can take traffic, and drains it before it stops.
+
+    A worker is ready once warmed up, i.e. once what the first turns would otherwise
+    wait for is loaded: the workflow graph, the chains and chat models of every
+    philosopher, the MongoDB connection and, if the response cache is enabled, the
+    embedding model. Warm-up runs in the background and is retried until it
+    succeeds.
+
+    On SIGTERM the worker drains before stopping: it stops being ready, so that load
+    balancers route new conversations elsewhere, admission control rejects new
+    requests, and in-flight responses, WebSocket streams included, get up to
+    `drain_timeout` seconds to finish. Only then is the server asked to stop, which
+    closes the remaining connections. A second SIGTERM stops it right away.
+
+    Args:
+        drain_timeout (float, optional): Longest wait for in-flight responses, in
+            seconds. Defaults to value from settings.
+        warm_up_retry_interval (float, optional): Seconds between two warm-up
+            attempts. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        drain_timeout: float = settings.API_DRAIN_TIMEOUT_SECONDS,
+        warm_up_retry_interval: float = settings.API_WARM_UP_RETRY_SECONDS,
+    ) -> None:
+        self.drain_timeout = drain_timeout
+        self.warm_up_retry_interval = warm_up_retry_interval
+
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__warm_up_task: asyncio.Task | None = None
+        self.__warm_up_seconds: float | None = None
+        self.__warm_up_error: str | None = None
+        self.__drain_task: asyncio.Task | None = None
+        self.__terminating = False
+        self.__previous_handler: Any = None
+
+    @property
+    def warmed_up(self) -> bool:
+        return self.__warm_up_seconds is not None
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_up and not get_admission_controller().draining
+
+    def start(self) -> None:
+        """Starts warming up and intercepts SIGTERM to drain first.
+
+        Must be called from within the running event loop. Signal handlers can only
+        be set from the main thread, so elsewhere the worker stops without draining.
+        """
+
+        self.__loop = asyncio.get_running_loop()
+        self.__warm_up_task = asyncio.create_task(self.__warm_up())
+
+        if threading.current_thread() is threading.main_thread():
+            self.__previous_handler = signal.signal(signal.SIGTERM, self.__on_terminate)
+
+    async def stop(self) -> None:
+        """Cancels unfinished warm-up and drain, and restores the SIGTERM handler."""
+
+        for task in (self.__warm_up_task, self.__drain_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+
+        if self.__previous_handler is not None:
+            signal.signal(signal.SIGTERM, self.__previous_handler)
+            self.__previous_handler = None
+
+    async def drain(self) -> bool:
+        """Rejects new requests and waits for the in-flight ones to finish.
+
+        Returns:
+            bool: Whether every in-flight response finished within `drain_timeout`.
+        """
+
+        admission_controller = get_admission_controller()
+        admission_controller.start_draining()
+
+        admission_stats = admission_controller.stats()
+        logger.info(
+            f"Draining worker: waiting up to {self.drain_timeout}s for "
+            f"{admission_stats['in_flight'] + admission_stats['queued']} responses"
+        )
+        drained = await admission_controller.wait_idle(self.drain_timeout)
+        if drained:
+            logger.info("Worker drained")
+        else:
+            logger.warning(
+                f"Worker still has {admission_controller.stats()['in_flight']} "
+                "responses in flight after the drain timeout"
+            )
+
+        return drained
+
+    def status(self) -> dict:
+        """Returns the readiness of the worker, with its warm-up and drain state."""
+
+        admission_stats = get_admission_controller().stats()
+
+        return {
+            "ready": self.ready,
+            "warmed_up": self.warmed_up,
+            "warm_up_seconds": self.__warm_up_seconds,
+            "warm_up_error": self.__warm_up_error,
+            "draining": admission_stats["draining"],
+            "in_flight": admission_stats["in_flight"],
+        }
+
+    async def __warm_up(self) -> None:
+        started_at = time.perf_counter()
+        while True:
+            try:
+                await self.__load()
+                break
+            except Exception as e:
+                self.__warm_up_error = str(e)
+                logger.warning(
+                    f"Warm-up failed, retrying in {self.warm_up_retry_interval}s: {e}"
+                )
+                await asyncio.sleep(self.warm_up_retry_interval)
+
+        self.__warm_up_error = None
+        self.__warm_up_seconds = round(time.perf_counter() - started_at, 3)
+        logger.info(f"Worker warmed up in {self.__warm_up_seconds}s")
+
+    async def __load(self) -> None:
+        create_workflow_graph().compile(checkpointer=get_checkpointer())
+        # Building the chains imports the provider clients, which takes a while.
+        await asyncio.to_thread(self.__build_chains)
+
+        if settings.CHECKPOINTER_BACKEND == "mongo":
+            await get_async_mongo_client(settings.MONGO_URI).admin.command("ping")
+
+        if settings.RESPONSE_CACHE_ENABLED:
+            from philoagents.application.conversation_service.response_cache import (
+                get_response_cache,
+            )
+
+            # Loads the embedding model, then runs it once.
+            response_cache = await asyncio.to_thread(get_response_cache)
+            await response_cache.aembed("What is the meaning of life?")
+
+    @staticmethod
+    def __build_chains() -> None:
+        persona_registry = get_persona_registry()
+        for philosopher_id in persona_registry.ids:
+            get_philosopher_response_chain(persona_registry.get(philosopher_id))
+        get_conversation_summary_chain()
+
+    def __on_terminate(self, signum: int, frame: FrameType | None) -> None:
+        if self.__terminating:
+            self.__stop_server(signum, frame)
+
+            return
+
+        self.__terminating = True
+        # Signal handlers may interrupt the event loop anywhere, so the drain is
+        # scheduled through its thread-safe entry point.
+        self.__loop.call_soon_threadsafe(self.__start_drain, signum, frame)
+
+    def __start_drain(self, signum: int, frame: FrameType | None) -> None:
+        self.__drain_task = asyncio.create_task(self.__drain_then_stop(signum, frame))
+
+    async def __drain_then_stop(self, signum: int, frame: FrameType | None) -> None:
+        try:
+            await self.drain()
+        finally:
+            self.__stop_server(signum, frame)
+
+    def __stop_server(self, signum: int, frame: FrameType | None) -> None:
+        handler = self.__previous_handler
+        if callable(handler):
+            handler(signum, frame)
+        else:
+            signal.signal(signum, handler or signal.SIG_DFL)
+            signal.raise_signal(signum)
+
+
+_worker_lifecycle: WorkerLifecycle | None = None
+
+
+def get_worker_lifecycle() -> WorkerLifecycle:
+    """Returns the lifecycle of this worker process."""
+
+    global _worker_lifecycle
+
+    if _worker_lifecycle is None:
+        _worker_lifecycle = WorkerLifecycle()
+
+    return _worker_lifecycle
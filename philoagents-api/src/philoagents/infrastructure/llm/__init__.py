@@ -0,0 +1,16 @@
+from .backends import LLMBackend, get_chat_model
+from .resilience import (
+    CircuitBreaker,
+    LLMUnavailableError,
+    ResilientChatModel,
+    get_circuit_breaker,
+)
+
+__all__ = [
+    "CircuitBreaker",
+    "LLMBackend",
+    "LLMUnavailableError",
+    "ResilientChatModel",
+    "get_chat_model",
+    "get_circuit_breaker",
+]
@@ -0,0 +1,75 @@
+from typing import Literal
+
+from langchain_core.language_models import BaseChatModel
+
+from philoagents.config import settings
+
+LLMBackend = Literal["groq", "openai", "fake"]
+
+
+def get_chat_model(
+    model_name: str = settings.GROQ_LLM_MODEL,
+    temperature: float = 0.7,
+    max_retries: int = 2,
+    backend: LLMBackend = settings.LLM_BACKEND,
+) -> BaseChatModel:
+    """Builds a chat model of the configured LLM backend.
+
+    Backends:
+        - groq: The Groq API (or `GROQ_BASE_URL`).
+        - openai: Any OpenAI-compatible server at `LLM_OPENAI_BASE_URL`, such as a
+          local vLLM or llama.cpp server. Requires the `openai` extra
+          (`uv sync --extra openai`).
+        - fake: A local model streaming canned answers, see `FakeStreamingChatModel`.
+
+    Args:
+        model_name (str, optional): Model to call. Defaults to the main Groq model.
+        temperature (float, optional): Sampling temperature. Defaults to 0.7.
+        max_retries (int, optional): Retries made by the provider client. Defaults
+            to 2.
+        backend (LLMBackend, optional): Backend to use. Defaults to value from
+            settings.
+
+    Returns:
+        BaseChatModel: The chat model.
+
+    Raises:
+        ImportError: If the client library of the backend is not installed.
+        ValueError: If the backend is unknown.
+    """
+
+    # Provider clients are imported on demand, so that only the selected one is loaded.
+    if backend == "groq":
+        from langchain_groq import ChatGroq
+
+        return ChatGroq(
+            api_key=settings.GROQ_API_KEY,
+            model_name=model_name,
+            temperature=temperature,
+            base_url=settings.GROQ_BASE_URL,
+            max_retries=max_retries,
+        )
+
+    if backend == "openai":
+        try:
+            from langchain_openai import ChatOpenAI
+        except ImportError as e:
+            raise ImportError(
+                "The 'openai' LLM backend requires the `openai` extra: "
+                "`uv sync --extra openai`."
+            ) from e
+
+        return ChatOpenAI(
+            api_key=settings.LLM_OPENAI_API_KEY or settings.OPENAI_API_KEY,
+            model=model_name,
+            temperature=temperature,
+            base_url=settings.LLM_OPENAI_BASE_URL,
+            max_retries=max_retries,
+        )
+
+    if backend == "fake":
+        from .fake import FakeStreamingChatModel
+
+        return FakeStreamingChatModel(model_name=model_name)
+
+    raise ValueError(f"Unknown LLM backend '{backend}'.")
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import zlib
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.chat_models import (
+    agenerate_from_stream,
+    generate_from_stream,
+)
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from philoagents.config import settings
+
+FAKE_VOCABULARY = (
+    "the soul virtue reason knowledge truth mind nature justice wisdom thought "
+    "machine being question world good life man cannot know what is how why we "
+    "must first ask whether this that all"
+).split()
+
+
+class FakeStreamingChatModel(BaseChatModel):
+    """Chat model streaming a canned answer, to benchmark the stack without a provider.
+
+    The answer depends only on the last message, so identical requests get identical
+    answers. Tokens are words streamed `token_latency` seconds apart, which simulates
+    the pacing of a real model without any network call.
+
+    Attributes:
+        model_name (str): Name reported in the response metadata.
+        token_latency (float): Seconds between two tokens.
+        response_tokens (int): Number of tokens of each answer.
+    """
+
+    model_name: str = "fake"
+    token_latency: float = settings.FAKE_LLM_TOKEN_LATENCY_SECONDS
+    response_tokens: int = settings.FAKE_LLM_RESPONSE_TOKENS
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-streaming-chat-model"
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return generate_from_stream(
+            self._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return await agenerate_from_stream(
+            self._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = self.__get_tokens(messages)
+        for position, token in enumerate(tokens):
+            time.sleep(self.token_latency)
+
+            chunk = self.__to_chunk(token, is_last=position == len(tokens) - 1)
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self.__get_tokens(messages)
+        for position, token in enumerate(tokens):
+            await asyncio.sleep(self.token_latency)
+
+            chunk = self.__to_chunk(token, is_last=position == len(tokens) - 1)
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+
+            yield chunk
+
+    def __get_tokens(self, messages: list[BaseMessage]) -> list[str]:
+        last_message = str(messages[-1].content) if messages else ""
+        seed = zlib.crc32(last_message.encode("utf-8"))
+
+        return [
+            FAKE_VOCABULARY[(seed + position * 7) % len(FAKE_VOCABULARY)]
+            + ("." if position == self.response_tokens - 1 else " ")
+            for position in range(self.response_tokens)
+        ]
+
+    def __to_chunk(self, token: str, is_last: bool) -> ChatGenerationChunk:
+        # Like provider models, the model name is only sent with the last chunk, since
+        # chunks' metadata are concatenated when merged. Token usage adds up.
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=token,
+                response_metadata={"model_name": self.model_name} if is_last else {},
+                usage_metadata={
+                    "input_tokens": 0,
+                    "output_tokens": 1,
+                    "total_tokens": 1,
+                },
+            )
+        )
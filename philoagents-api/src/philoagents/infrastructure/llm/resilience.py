@@ -0,0 +1,370 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
+from loguru import logger
+
+from philoagents.config import settings
+from philoagents.infrastructure.metrics import LLM_ERRORS
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMUnavailableError(Exception):
+    """Exception raised when no model could answer, e.g. all circuits are open."""
+
+    def __init__(self, model_names: list[str]):
+        self.message = f"No LLM available (tried: {', '.join(model_names)})."
+        super().__init__(self.message)
+
+
+class CircuitBreaker:
+    """Stops calling a model after repeated failures, until it had time to recover.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    refused for `reset_timeout` seconds. A single trial call is then let through: it
+    closes the circuit if it succeeds and reopens it otherwise. A trial that ends
+    without an outcome, e.g. because it was cancelled, frees the trial slot for the
+    next call.
+
+    Args:
+        failure_threshold (int, optional): Consecutive failures opening the circuit.
+            Defaults to value from settings.
+        reset_timeout (float, optional): Seconds before a trial call is allowed.
+            Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = settings.LLM_CIRCUIT_RESET_SECONDS,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.__failures = 0
+        self.__opened_at: float | None = None
+        self.__trial_in_flight = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.__opened_at is None:
+            return "closed"
+
+        if time.monotonic() - self.__opened_at >= self.reset_timeout:
+            return "half_open"
+
+        return "open"
+
+    def allow(self) -> bool:
+        """Returns whether a call may be made now."""
+
+        with self.__lock:
+            state = self.state
+            if state == "closed":
+                return True
+
+            if state == "half_open" and not self.__trial_in_flight:
+                self.__trial_in_flight = True
+
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self.__lock:
+            self.__failures = 0
+            self.__opened_at = None
+            self.__trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Ends a call that neither succeeded nor failed, e.g. a cancelled one."""
+
+        with self.__lock:
+            self.__trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.__lock:
+            self.__failures += 1
+            if self.__trial_in_flight or self.__failures >= self.failure_threshold:
+                self.__opened_at = time.monotonic()
+            self.__trial_in_flight = False
+
+
+class _StreamWatcher(BaseCallbackHandler):
+    """Callback handler recording whether a model call streamed any token."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.streamed = False
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.streamed = True
+
+
+_circuit_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(model_name: str) -> CircuitBreaker:
+    """Returns the process-wide circuit breaker of a model."""
+
+    return _circuit_breakers.setdefault(model_name, CircuitBreaker())
+
+
+class ResilientChatModel(Runnable[LanguageModelInput, BaseMessage]):
+    """Chat model calling a list of models in order, with retries and failover.
+
+    Each model is retried with jittered exponential backoff on transient errors
+    (rate limits, timeouts, 5xx). When the provider sends a `Retry-After` delay, it
+    is honoured, unless it is longer than `max_delay`, in which case the next model
+    is tried right away. Models whose circuit breaker is open are skipped. Other
+    errors (e.g. invalid requests) are raised immediately.
+
+    Tokens are still streamed through the callbacks of the underlying models. A call
+    failing after it streamed its first token is neither retried nor failed over,
+    since clients would receive the beginning of the answer twice; its error is
+    raised instead. In practice rate limits and overloads are reported before the
+    first token.
+
+    Args:
+        models (list[tuple[str, BaseChatModel]]): `(name, model)` pairs, main model
+            first. The name keys the model's circuit breaker.
+        max_retries (int, optional): Retries per model. Defaults to value from
+            settings.
+        base_delay (float, optional): Backoff of the first retry, in seconds.
+            Defaults to value from settings.
+        max_delay (float, optional): Longest backoff, in seconds. Defaults to value
+            from settings.
+    """
+
+    def __init__(
+        self,
+        models: list[tuple[str, BaseChatModel]],
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        base_delay: float = settings.LLM_RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = settings.LLM_RETRY_MAX_DELAY_SECONDS,
+    ) -> None:
+        self.models = models
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        last_error = None
+        for model_name, model in self.models:
+            circuit_breaker = get_circuit_breaker(model_name)
+            for attempt in range(self.max_retries + 1):
+                if not self.__allow(model_name, circuit_breaker):
+                    break
+
+                attempt_config, stream_watcher = self.__watch_stream(config)
+                try:
+                    response = model.invoke(input, attempt_config, **kwargs)
+                except Exception as e:
+                    last_error = e
+                    delay = self.__on_failure(
+                        model_name,
+                        circuit_breaker,
+                        attempt,
+                        e,
+                        streamed=stream_watcher.streamed,
+                    )
+                    if delay is None:
+                        break
+                    time.sleep(delay)
+                except BaseException:
+                    circuit_breaker.release_trial()
+
+                    raise
+                else:
+                    circuit_breaker.record_success()
+
+                    return response
+
+        raise LLMUnavailableError(
+            [model_name for model_name, _ in self.models]
+        ) from last_error
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: RunnableConfig | None = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        last_error = None
+        for model_name, model in self.models:
+            circuit_breaker = get_circuit_breaker(model_name)
+            for attempt in range(self.max_retries + 1):
+                if not self.__allow(model_name, circuit_breaker):
+                    break
+
+                attempt_config, stream_watcher = self.__watch_stream(config)
+                try:
+                    response = await model.ainvoke(input, attempt_config, **kwargs)
+                except Exception as e:
+                    last_error = e
+                    delay = self.__on_failure(
+                        model_name,
+                        circuit_breaker,
+                        attempt,
+                        e,
+                        streamed=stream_watcher.streamed,
+                    )
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+                except BaseException:
+                    # Cancelled, e.g. because the client disconnected.
+                    circuit_breaker.release_trial()
+
+                    raise
+                else:
+                    circuit_breaker.record_success()
+
+                    return response
+
+        raise LLMUnavailableError(
+            [model_name for model_name, _ in self.models]
+        ) from last_error
+
+    def __allow(self, model_name: str, circuit_breaker: CircuitBreaker) -> bool:
+        if circuit_breaker.allow():
+            return True
+
+        logger.warning(f"Circuit of model '{model_name}' is open, skipping it")
+
+        return False
+
+    def __watch_stream(
+        self, config: RunnableConfig | None
+    ) -> tuple[RunnableConfig, _StreamWatcher]:
+        """Adds a handler recording whether the call streams any token to `config`."""
+
+        stream_watcher = _StreamWatcher()
+
+        config = ensure_config(config)
+        callbacks = config.get("callbacks")
+        if callbacks is None:
+            callbacks = [stream_watcher]
+        elif isinstance(callbacks, list):
+            callbacks = [*callbacks, stream_watcher]
+        else:
+            callbacks = callbacks.copy()
+            callbacks.add_handler(stream_watcher, inherit=True)
+
+        return {**config, "callbacks": callbacks}, stream_watcher
+
+    def __on_failure(
+        self,
+        model_name: str,
+        circuit_breaker: CircuitBreaker,
+        attempt: int,
+        error: Exception,
+        streamed: bool = False,
+    ) -> float | None:
+        """Records a failed call and returns the delay before the next attempt.
+
+        Args:
+            streamed (bool, optional): Whether the call streamed tokens before
+                failing. Defaults to False.
+
+        Returns:
+            float | None: Seconds to wait before retrying the same model, or None to
+                fail over to the next model.
+
+        Raises:
+            Exception: The error itself, if it is not transient or the call already
+                streamed tokens.
+        """
+
+        retryable = is_retryable(error)
+        LLM_ERRORS.labels(model=model_name, retryable=str(retryable).lower()).inc()
+
+        if not retryable:
+            # The provider answered, so the model itself is available.
+            circuit_breaker.record_success()
+
+            raise error
+
+        circuit_breaker.record_failure()
+
+        if streamed:
+            logger.warning(
+                f"Model '{model_name}' failed ({error}) after streaming tokens, "
+                "not retrying"
+            )
+
+            raise error
+
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.base_delay)
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+        if attempt >= self.max_retries or delay > self.max_delay:
+            logger.warning(f"Model '{model_name}' failed ({error}), failing over")
+
+            return None
+
+        logger.warning(
+            f"Model '{model_name}' failed ({error}), retrying in {delay:.2f}s "
+            f"(attempt {attempt + 1}/{self.max_retries})"
+        )
+
+        return delay
+
+
+def is_retryable(error: Exception) -> bool:
+    """Returns whether an LLM client error is transient."""
+
+    status_code = __get_status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+
+    # Connection errors and timeouts of the provider SDKs and httpx carry no status.
+    error_name = type(error).__name__
+
+    return "Timeout" in error_name or "Connection" in error_name
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """Returns the delay, in seconds, the provider asked to wait before retrying."""
+
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if (retry_after_ms := headers.get("retry-after-ms")) is not None:
+            return float(retry_after_ms) / 1000
+
+        if (retry_after := headers.get("retry-after")) is not None:
+            return float(retry_after)
+    except ValueError:
+        pass
+
+    return None
+
+
+def __get_status_code(error: Exception) -> int | None:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+
+    return status_code if isinstance(status_code, int) else None
@@ -0,0 +1,136 @@
+import os
+import shutil
+from pathlib import Path
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+# When set, e.g. by `enable_multiprocess_metrics`, every worker writes its metrics
+# to files in this directory, and any of them can report those of all.
+MULTIPROCESS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+STAGE_DURATION = Histogram(
+    "philoagents_stage_duration_seconds",
+    "Duration of the stages of a conversation turn.",
+    ("stage",),
+    buckets=DEFAULT_BUCKETS,
+)
+TIME_TO_FIRST_TOKEN = Histogram(
+    "philoagents_time_to_first_token_seconds",
+    "Time from the start of a streamed turn to its first response chunk.",
+    ("philosopher",),
+    buckets=DEFAULT_BUCKETS,
+)
+LLM_DURATION = Histogram(
+    "philoagents_llm_duration_seconds",
+    "Duration of the LLM call answering a turn.",
+    ("philosopher", "model"),
+    buckets=DEFAULT_BUCKETS,
+)
+LLM_TOKENS = Counter(
+    "philoagents_llm_tokens_total",
+    "Tokens generated by the LLM.",
+    ("philosopher", "model"),
+)
+LLM_ERRORS = Counter(
+    "philoagents_llm_errors_total",
+    "Failed LLM calls, including the retried ones.",
+    ("model", "retryable"),
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "philoagents_response_cache_lookups_total",
+    "Response cache lookups of opening questions.",
+    ("philosopher", "result"),
+)
+TURNS = Counter(
+    "philoagents_turns_total",
+    "Conversation turns, by outcome.",
+    ("philosopher", "outcome"),
+)
+CHECKPOINT_WRITE_ERRORS = Counter(
+    "philoagents_checkpoint_write_errors_total",
+    "Failed write-behind checkpoint operations, by outcome (retried or dropped).",
+    ("outcome",),
+)
+TRACES = Counter(
+    "philoagents_traces_total",
+    "Turn traces, by export outcome.",
+    ("outcome",),
+)
+ADMISSION_REJECTED = Counter(
+    "philoagents_admission_rejected_total",
+    "Requests rejected by admission control, by reason.",
+    ("reason",),
+)
+
+# Gauges of the workers still running are added up.
+ADMISSION_IN_FLIGHT = Gauge(
+    "philoagents_admission_in_flight",
+    "Responses being generated.",
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUED = Gauge(
+    "philoagents_admission_queued",
+    "Requests waiting for a generation slot.",
+    multiprocess_mode="livesum",
+)
+THREAD_TURNS_QUEUED = Gauge(
+    "philoagents_thread_turns_queued",
+    "Turns waiting for an earlier turn of their conversation thread.",
+    multiprocess_mode="livesum",
+)
+
+
+def observe_stage(stage: str):
+    """Times a stage of a conversation turn, e.g. `with observe_stage("retrieval"):`."""
+
+    return STAGE_DURATION.labels(stage=stage).time()
+
+
+def enable_multiprocess_metrics(directory: Path) -> None:
+    """Makes the worker processes started next share their metrics.
+
+    Must be called by the parent process before starting the workers, which inherit
+    the setting. The directory is emptied first, so that metrics of previous runs
+    aren't reported.
+
+    Args:
+        directory (Path): Directory the workers write their metrics to.
+    """
+
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+    os.environ[MULTIPROCESS_DIR_ENV] = str(directory.resolve())
+
+
+def render_metrics() -> bytes:
+    """Returns the metrics in the Prometheus text format.
+
+    With multiprocess metrics enabled, these are the metrics of every worker, which
+    makes the answer the same whichever worker serves the scrape. Otherwise, they
+    are the metrics of this process.
+    """
+
+    if MULTIPROCESS_DIR_ENV not in os.environ:
+        return generate_latest()
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return generate_latest(registry)
+
+
+def close_metrics() -> None:
+    """Stops reporting the gauges of this worker, e.g. on shutdown."""
+
+    if MULTIPROCESS_DIR_ENV in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,4 +1,51 @@
-from .client import MongoClientWrapper
-from .indexes import MongoIndex
+from typing import TYPE_CHECKING
 
-__all__ = ["MongoClientWrapper", "MongoIndex"]
+from philoagents.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .checkpointer import PhilosopherCheckpointer, create_checkpoint_indexes
+    from .client import MongoClientWrapper
+    from .indexes import MongoIndex
+    from .lease import (
+        MongoThreadLease,
+        ThreadLease,
+        ThreadLeaseLostError,
+        create_lease_indexes,
+    )
+    from .pool import close_mongo_clients, get_async_mongo_client, get_mongo_client
+    from .serializer import CompressedSerializer
+
+# Exports are imported on first access, so that e.g. borrowing a client from the
+# pool doesn't load the LangGraph checkpointer.
+__getattr__ = lazy_exports(
+    __name__,
+    {
+        "MongoClientWrapper": ".client",
+        "MongoIndex": ".indexes",
+        "MongoThreadLease": ".lease",
+        "ThreadLease": ".lease",
+        "ThreadLeaseLostError": ".lease",
+        "create_lease_indexes": ".lease",
+        "PhilosopherCheckpointer": ".checkpointer",
+        "create_checkpoint_indexes": ".checkpointer",
+        "CompressedSerializer": ".serializer",
+        "get_mongo_client": ".pool",
+        "get_async_mongo_client": ".pool",
+        "close_mongo_clients": ".pool",
+    },
+)
+
+__all__ = [
+    "MongoClientWrapper",
+    "MongoIndex",
+    "MongoThreadLease",
+    "ThreadLease",
+    "ThreadLeaseLostError",
+    "create_lease_indexes",
+    "PhilosopherCheckpointer",
+    "create_checkpoint_indexes",
+    "CompressedSerializer",
+    "get_mongo_client",
+    "get_async_mongo_client",
+    "close_mongo_clients",
+]
@@ -0,0 +1,132 @@
+from langgraph.checkpoint.mongodb.aio import AsyncMongoDBSaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from loguru import logger
+from pymongo import ASCENDING, DESCENDING, errors
+
+from philoagents.config import settings
+
+from .pool import get_async_mongo_client
+from .serializer import CompressedSerializer
+
+# Indexes created by `AsyncMongoDBSaver`, under their default names.
+CHECKPOINT_KEYS = [
+    ("thread_id", ASCENDING),
+    ("checkpoint_ns", ASCENDING),
+    ("checkpoint_id", DESCENDING),
+]
+WRITES_KEYS = [*CHECKPOINT_KEYS, ("task_id", ASCENDING), ("idx", ASCENDING)]
+CREATED_AT_FIELD = "created_at"
+TTL_INDEX_NAME = "created_at_1"
+
+CHECKPOINT_ID_INDEX_NAME = "checkpoint_id_index"
+ARCHIVE_INDEX_NAME = "thread_archive_index"
+# Indexes of earlier versions, superseded by those of the saver.
+LEGACY_INDEX_NAMES = ("thread_checkpoint_index", "updated_at_ttl_index")
+
+
+class PhilosopherCheckpointer(AsyncMongoDBSaver):
+    """LangGraph MongoDB checkpointer backed by the shared async client.
+
+    Checkpoints and writes are serialized with `CompressedSerializer` unless another
+    serializer is given.
+
+    When `ttl_seconds` is set, the saver stamps every checkpoint and pending write
+    with a `created_at` date in the same upsert, so that the TTL index created by
+    `create_checkpoint_indexes` can expire idle threads automatically.
+
+    Args:
+        ttl_seconds (int | None, optional): Idle time after which checkpoints expire.
+            Defaults to value from settings.
+        serde (SerializerProtocol | None, optional): Serializer for checkpoints and
+            writes. Defaults to `CompressedSerializer`.
+        **kwargs: Forwarded to `AsyncMongoDBSaver`.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int | None = settings.MONGO_STATE_TTL_SECONDS,
+        serde: SerializerProtocol | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(ttl=ttl_seconds, **kwargs)
+
+        self.serde = serde or CompressedSerializer()
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def build_from_settings(cls) -> "PhilosopherCheckpointer":
+        return cls(
+            client=get_async_mongo_client(settings.MONGO_URI),
+            db_name=settings.MONGO_DB_NAME,
+            checkpoint_collection_name=settings.MONGO_STATE_CHECKPOINT_COLLECTION,
+            writes_collection_name=settings.MONGO_STATE_WRITES_COLLECTION,
+            ttl_seconds=settings.MONGO_STATE_TTL_SECONDS,
+        )
+
+
+async def create_checkpoint_indexes(
+    ttl_seconds: int | None = settings.MONGO_STATE_TTL_SECONDS,
+) -> None:
+    """Creates the indexes used to look up, reset and expire conversation threads.
+
+    The checkpoints and writes collections get the unique indexes of
+    `AsyncMongoDBSaver`, which serve latest-checkpoint lookups and per-thread or
+    per-philosopher deletes. The saver only creates them in collections holding
+    fewer than two indexes, so they are created here, before any other index. Both
+    collections also get an index on `checkpoint_id` for age-based deletes. When
+    `ttl_seconds` is set, a TTL index on `created_at` is created (or updated in
+    place); otherwise it is dropped. The archive collection used by checkpoint
+    compaction is indexed by thread.
+
+    Args:
+        ttl_seconds (int | None, optional): Idle time after which checkpoints expire.
+            Defaults to value from settings.
+    """
+
+    db = get_async_mongo_client(settings.MONGO_URI)[settings.MONGO_DB_NAME]
+
+    for collection_name, keys in (
+        (settings.MONGO_STATE_CHECKPOINT_COLLECTION, CHECKPOINT_KEYS),
+        (settings.MONGO_STATE_WRITES_COLLECTION, WRITES_KEYS),
+    ):
+        collection = db[collection_name]
+
+        await collection.create_index(keys, unique=True)
+        await collection.create_index(
+            [("checkpoint_id", ASCENDING)], name=CHECKPOINT_ID_INDEX_NAME
+        )
+
+        existing_indexes = await collection.index_information()
+        for index_name in LEGACY_INDEX_NAMES:
+            if index_name in existing_indexes:
+                await collection.drop_index(index_name)
+
+        if ttl_seconds:
+            if TTL_INDEX_NAME in existing_indexes:
+                await db.command(
+                    "collMod",
+                    collection_name,
+                    index={"name": TTL_INDEX_NAME, "expireAfterSeconds": ttl_seconds},
+                )
+            else:
+                await collection.create_index(
+                    [(CREATED_AT_FIELD, ASCENDING)],
+                    name=TTL_INDEX_NAME,
+                    expireAfterSeconds=ttl_seconds,
+                )
+        elif TTL_INDEX_NAME in existing_indexes:
+            try:
+                await collection.drop_index(TTL_INDEX_NAME)
+            except errors.OperationFailure as e:
+                logger.warning(f"Failed to drop TTL index on '{collection_name}': {e}")
+
+    await db[settings.MONGO_STATE_ARCHIVE_COLLECTION].create_index(
+        [
+            ("thread_id", ASCENDING),
+            ("checkpoint_ns", ASCENDING),
+            ("archived_at", ASCENDING),
+        ],
+        name=ARCHIVE_INDEX_NAME,
+    )
+
+    logger.info(f"Checkpoint indexes ensured (TTL: {ttl_seconds or 'disabled'})")
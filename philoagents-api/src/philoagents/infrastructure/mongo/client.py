@@ -1,20 +1,27 @@
-from typing import Generic, Type, TypeVar
+from typing import Any, Generator, Generic, Type, TypeVar
 
 from bson import ObjectId
 from loguru import logger
 from pydantic import BaseModel
-from pymongo import MongoClient, errors
+from pymongo import errors
 
 from philoagents.config import settings
 
+from .pool import get_mongo_client
+
 T = TypeVar("T", bound=BaseModel)
 
+# Embedding vectors dominate the size of long-term memory documents and are only
+# needed by the vector search index, so they are excluded unless asked for.
+DEFAULT_PROJECTION = {"embedding": 0}
+
 
 class MongoClientWrapper(Generic[T]):
     """Service class for MongoDB operations, supporting ingestion, querying, and validation.
 
     This class provides methods to interact with MongoDB collections, including document
-    ingestion, querying, and validation operations.
+    ingestion, querying, and validation operations. The underlying `MongoClient` is
+    borrowed from the process-wide pool, so creating many wrappers is cheap.
 
     Args:
         model (Type[T]): The Pydantic model class to use for document serialization.
@@ -27,7 +34,7 @@ class MongoClientWrapper(Generic[T]):
         collection_name (str): Name of the MongoDB collection.
         database_name (str): Name of the MongoDB database.
         mongodb_uri (str): MongoDB connection URI.
-        client (MongoClient): MongoDB client instance for database connections.
+        client (MongoClient): Shared MongoDB client instance for database connections.
         database (Database): Reference to the target MongoDB database.
         collection (Collection): Reference to the target MongoDB collection.
     """
@@ -58,13 +65,7 @@ class MongoClientWrapper(Generic[T]):
         self.database_name = database_name
         self.mongodb_uri = mongodb_uri
 
-        try:
-            self.client = MongoClient(mongodb_uri, appname="philoagents")
-            self.client.admin.command("ping")
-        except Exception as e:
-            logger.error(f"Failed to initialize MongoDBService: {e}")
-            raise
-
+        self.client = get_mongo_client(mongodb_uri)
         self.database = self.client[database_name]
         self.collection = self.database[collection_name]
         logger.info(
@@ -81,7 +82,7 @@ class MongoClientWrapper(Generic[T]):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Close MongoDB connection when exiting context.
+        """Release the MongoDB collection when exiting context.
 
         Args:
             exc_type: Type of exception that occurred, if any.
@@ -139,52 +140,113 @@ class MongoClientWrapper(Generic[T]):
             logger.error(f"Error inserting documents: {e}")
             raise
 
-    def fetch_documents(self, limit: int, query: dict) -> list[T]:
+    def fetch_documents(
+        self,
+        limit: int,
+        query: dict,
+        projection: dict | None = DEFAULT_PROJECTION,
+        batch_size: int = settings.MONGO_FETCH_BATCH_SIZE,
+        raw: bool = False,
+    ) -> list[T] | list[dict[str, Any]]:
         """Retrieve documents from the MongoDB collection based on a query.
 
         Args:
             limit (int): Maximum number of documents to retrieve.
             query (dict): MongoDB query filter to apply.
+            projection (dict | None, optional): MongoDB projection to apply. Defaults
+                to excluding the `embedding` field. Pass None to fetch whole documents.
+            batch_size (int, optional): Number of documents per cursor batch.
+                Defaults to value from settings.
+            raw (bool, optional): If True, return the raw MongoDB documents without
+                Pydantic validation. Defaults to False.
 
         Returns:
-            list[T]: List of Pydantic model instances matching the query criteria.
+            list[T] | list[dict[str, Any]]: List of Pydantic model instances (or raw
+                documents if `raw` is True) matching the query criteria.
+
+        Raises:
+            Exception: If the query operation fails.
+        """
+
+        documents = list(
+            self.iter_documents(
+                query=query,
+                limit=limit,
+                projection=projection,
+                batch_size=batch_size,
+                raw=raw,
+            )
+        )
+        logger.debug(f"Fetched {len(documents)} documents with query: {query}")
+
+        return documents
+
+    def iter_documents(
+        self,
+        query: dict,
+        limit: int = 0,
+        projection: dict | None = DEFAULT_PROJECTION,
+        batch_size: int = settings.MONGO_FETCH_BATCH_SIZE,
+        raw: bool = False,
+    ) -> Generator[T | dict[str, Any], None, None]:
+        """Lazily iterate over documents from the MongoDB collection.
+
+        Documents are pulled from the server in batches of `batch_size`, so memory
+        usage stays bounded regardless of the size of the result set.
+
+        Args:
+            query (dict): MongoDB query filter to apply.
+            limit (int, optional): Maximum number of documents to retrieve. 0 means
+                no limit. Defaults to 0.
+            projection (dict | None, optional): MongoDB projection to apply. Defaults
+                to excluding the `embedding` field. Pass None to fetch whole documents.
+            batch_size (int, optional): Number of documents per cursor batch.
+                Defaults to value from settings.
+            raw (bool, optional): If True, yield the raw MongoDB documents without
+                Pydantic validation. Defaults to False.
+
+        Yields:
+            T | dict[str, Any]: Pydantic model instances, or raw documents if `raw`
+                is True.
 
         Raises:
             Exception: If the query operation fails.
         """
+
         try:
-            documents = list(self.collection.find(query).limit(limit))
-            logger.debug(f"Fetched {len(documents)} documents with query: {query}")
-            return self.__parse_documents(documents)
+            cursor = (
+                self.collection.find(query, projection=projection)
+                .limit(limit)
+                .batch_size(batch_size)
+            )
+            with cursor:
+                for document in cursor:
+                    yield document if raw else self.__parse_document(document)
         except Exception as e:
             logger.error(f"Error fetching documents: {e}")
             raise
 
-    def __parse_documents(self, documents: list[dict]) -> list[T]:
-        """Convert MongoDB documents to Pydantic model instances.
+    def __parse_document(self, document: dict) -> T:
+        """Convert a MongoDB document to a Pydantic model instance.
 
         Converts MongoDB ObjectId fields to strings and transforms the document structure
         to match the Pydantic model schema.
 
         Args:
-            documents (list[dict]): List of MongoDB documents to parse.
+            document (dict): MongoDB document to parse.
 
         Returns:
-            list[T]: List of validated Pydantic model instances.
+            T: Validated Pydantic model instance.
         """
-        parsed_documents = []
-        for doc in documents:
-            for key, value in doc.items():
-                if isinstance(value, ObjectId):
-                    doc[key] = str(value)
 
-            _id = doc.pop("_id", None)
-            doc["id"] = _id
+        for key, value in document.items():
+            if isinstance(value, ObjectId):
+                document[key] = str(value)
 
-            parsed_doc = self.model.model_validate(doc)
-            parsed_documents.append(parsed_doc)
+        _id = document.pop("_id", None)
+        document["id"] = _id
 
-        return parsed_documents
+        return self.model.model_validate(document)
 
     def get_collection_count(self) -> int:
         """Count the total number of documents in the collection.
@@ -203,11 +265,10 @@ class MongoClientWrapper(Generic[T]):
             raise
 
     def close(self) -> None:
-        """Close the MongoDB connection.
+        """Release the MongoDB collection.
 
-        This method should be called when the service is no longer needed
-        to properly release resources, unless using the context manager.
+        The shared client is left open for other wrappers. It is closed once per
+        process through `close_mongo_clients`.
         """
 
-        self.client.close()
-        logger.debug("Closed MongoDB connection.")
+        logger.debug(f"Released MongoDB collection: {self.collection_name}")
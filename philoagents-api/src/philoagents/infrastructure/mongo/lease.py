@@ -0,0 +1,247 @@
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable
+
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument, errors
+
+from philoagents.config import settings
+
+from .pool import get_async_mongo_client
+
+EXPIRES_AT_FIELD = "expires_at"
+LEASE_TTL_INDEX_NAME = "lease_expires_at_ttl_index"
+
+
+class ThreadLeaseLostError(Exception):
+    """Exception raised in a turn whose thread lease was lost, e.g. after expiring."""
+
+    def __init__(self, thread_id: str):
+        self.message = f"Lost the lease of thread '{thread_id}'."
+        super().__init__(self.message)
+
+
+@dataclass
+class ThreadLease:
+    """Lease held on a thread, with what its previous holder left behind.
+
+    Attributes:
+        thread_id (str): The leased conversation thread.
+        last_checkpoint_id (str | None): Checkpoint this process left the thread at
+            when it last released the lease, if nobody held it since. None otherwise.
+        checkpoint_id (str | None): Checkpoint the thread is left at, recorded on
+            release for the next holder. Set by the holder.
+    """
+
+    thread_id: str
+    last_checkpoint_id: str | None = None
+    checkpoint_id: str | None = None
+
+
+class MongoThreadLease:
+    """Lease on conversation threads shared by every worker through MongoDB.
+
+    A lease is a `{_id: thread_id, owner, released, expires_at}` document. It is
+    acquired by upserting the document, which only succeeds if it is missing,
+    released, expired or already owned by this process, and renewed in the
+    background while held. A worker that dies without releasing its leases blocks
+    their threads for at most `ttl_seconds`. Failed renewals are retried, and if
+    the lease is lost all the same, the holder is cancelled and
+    `ThreadLeaseLostError` raised in its place, so that it stops writing to a
+    thread another worker may now hold.
+
+    Released leases are kept for `retain_seconds` with the checkpoint the thread
+    was left at, so that a worker taking the lease back can tell whether another
+    worker wrote to the thread in between. Once that retention is over, the
+    checkpoint is no longer handed over, even if the document isn't deleted yet.
+
+    Args:
+        collection (AsyncIOMotorCollection): Collection storing the leases.
+        ttl_seconds (float, optional): Lifetime of a lease that isn't renewed.
+            Defaults to value from settings.
+        poll_interval (float, optional): Seconds to wait between two acquisition
+            attempts. Defaults to value from settings.
+        retain_seconds (float, optional): Lifetime of a released lease. Defaults to
+            value from settings.
+    """
+
+    def __init__(
+        self,
+        collection: AsyncIOMotorCollection,
+        ttl_seconds: float = settings.THREAD_LEASE_TTL_SECONDS,
+        poll_interval: float = settings.THREAD_LEASE_POLL_INTERVAL_SECONDS,
+        retain_seconds: float = settings.THREAD_LEASE_RETAIN_SECONDS,
+    ) -> None:
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self.retain_seconds = retain_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @classmethod
+    def build_from_settings(cls) -> "MongoThreadLease":
+        client = get_async_mongo_client(settings.MONGO_URI)
+
+        # A released lease must not outlive the conversation state it refers to.
+        retain_seconds = settings.THREAD_LEASE_RETAIN_SECONDS
+        if settings.MONGO_STATE_TTL_SECONDS is not None:
+            retain_seconds = min(retain_seconds, settings.MONGO_STATE_TTL_SECONDS)
+
+        return cls(
+            collection=client[settings.MONGO_DB_NAME][
+                settings.MONGO_THREAD_LEASE_COLLECTION
+            ],
+            retain_seconds=retain_seconds,
+        )
+
+    @asynccontextmanager
+    async def hold(self, thread_id: str) -> AsyncIterator[ThreadLease]:
+        """Holds the lease of a thread for the duration of the context.
+
+        Args:
+            thread_id (str): The conversation thread to lease.
+
+        Yields:
+            ThreadLease: The held lease.
+
+        Raises:
+            ThreadLeaseLostError: If the lease was lost while held.
+        """
+
+        lease = await self.acquire(thread_id)
+
+        holder = asyncio.current_task()
+        lost = False
+
+        def on_lost() -> None:
+            nonlocal lost
+
+            lost = True
+            holder.cancel()
+
+        renewal = asyncio.create_task(self.__renew(thread_id, on_lost))
+        try:
+            yield lease
+        except asyncio.CancelledError:
+            # Only the cancellation requested by the renewal becomes an error; any
+            # other one, e.g. of a disconnected client, keeps propagating.
+            if lost and holder.uncancel() == 0:
+                raise ThreadLeaseLostError(thread_id) from None
+
+            raise
+        finally:
+            renewal.cancel()
+            await asyncio.gather(renewal, return_exceptions=True)
+            await self.release(lease)
+
+    async def acquire(self, thread_id: str) -> ThreadLease:
+        """Waits until the lease of a thread is acquired."""
+
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                previous = await self.collection.find_one_and_update(
+                    {
+                        "_id": thread_id,
+                        "$or": [
+                            {"released": True},
+                            {EXPIRES_AT_FIELD: {"$lte": now}},
+                            {"owner": self.owner},
+                        ],
+                    },
+                    {
+                        "$set": {
+                            "owner": self.owner,
+                            "released": False,
+                            EXPIRES_AT_FIELD: self.__expiry(self.ttl_seconds),
+                        }
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE,
+                )
+            except errors.DuplicateKeyError:
+                # Another worker holds the lease.
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            if (
+                previous is not None
+                and previous.get("owner") == self.owner
+                and self.__as_utc(previous[EXPIRES_AT_FIELD]) > now
+            ):
+                return ThreadLease(thread_id, previous.get("checkpoint_id"))
+
+            return ThreadLease(thread_id)
+
+    async def release(self, lease: ThreadLease) -> None:
+        """Releases a lease, if this process still holds it."""
+
+        try:
+            await self.collection.update_one(
+                {"_id": lease.thread_id, "owner": self.owner},
+                {
+                    "$set": {
+                        "released": True,
+                        "checkpoint_id": lease.checkpoint_id,
+                        EXPIRES_AT_FIELD: self.__expiry(self.retain_seconds),
+                    }
+                },
+            )
+        except errors.PyMongoError as e:
+            logger.warning(
+                f"Failed to release lease of thread '{lease.thread_id}': {e}"
+            )
+
+    async def __renew(self, thread_id: str, on_lost: Callable[[], None]) -> None:
+        renew_interval = self.ttl_seconds / 3
+        delay = renew_interval
+        while True:
+            await asyncio.sleep(delay)
+
+            try:
+                result = await self.collection.update_one(
+                    {"_id": thread_id, "owner": self.owner},
+                    {"$set": {EXPIRES_AT_FIELD: self.__expiry(self.ttl_seconds)}},
+                )
+            except errors.PyMongoError as e:
+                # Retried more and more often as the lease gets closer to expiring.
+                delay = max(delay / 2, self.poll_interval)
+                logger.warning(
+                    f"Failed to renew lease of thread '{thread_id}', "
+                    f"retrying in {delay:.2f}s: {e}"
+                )
+                continue
+
+            if result.matched_count == 0:
+                logger.warning(
+                    f"Lost the lease of thread '{thread_id}', cancelling its turn"
+                )
+                on_lost()
+
+                return
+
+            delay = renew_interval
+
+    def __expiry(self, seconds: float) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+    def __as_utc(self, value: datetime) -> datetime:
+        # PyMongo returns naive UTC datetimes unless the client is timezone aware.
+        return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+async def create_lease_indexes() -> None:
+    """Creates the TTL index removing leases left behind by dead workers."""
+
+    client = get_async_mongo_client(settings.MONGO_URI)
+    collection = client[settings.MONGO_DB_NAME][settings.MONGO_THREAD_LEASE_COLLECTION]
+
+    await collection.create_index(
+        EXPIRES_AT_FIELD, name=LEASE_TTL_INDEX_NAME, expireAfterSeconds=0
+    )
@@ -0,0 +1,94 @@
+import threading
+
+from loguru import logger
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+
+from philoagents.config import settings
+
+APP_NAME = "philoagents"
+
+_clients: dict[str, MongoClient] = {}
+_async_clients: dict[str, AsyncIOMotorClient] = {}
+_lock = threading.Lock()
+
+
+def get_mongo_client(mongodb_uri: str = settings.MONGO_URI) -> MongoClient:
+    """Returns the process-wide synchronous MongoDB client for the given URI.
+
+    The client (and its connection pool) is created and pinged only on first use.
+    Subsequent calls with the same URI return the same instance, so callers must
+    not close it themselves; use `close_mongo_clients` on process shutdown instead.
+
+    Args:
+        mongodb_uri (str, optional): URI for connecting to MongoDB instance.
+            Defaults to value from settings.
+
+    Returns:
+        MongoClient: The shared MongoDB client.
+
+    Raises:
+        Exception: If connection to MongoDB fails.
+    """
+
+    client = _clients.get(mongodb_uri)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(mongodb_uri)
+        if client is None:
+            try:
+                client = MongoClient(mongodb_uri, appname=APP_NAME)
+                client.admin.command("ping")
+            except Exception as e:
+                logger.error(f"Failed to initialize MongoDB client: {e}")
+                raise
+
+            _clients[mongodb_uri] = client
+            logger.info(f"Opened shared MongoDB client for URI: {mongodb_uri}")
+
+    return client
+
+
+def get_async_mongo_client(
+    mongodb_uri: str = settings.MONGO_URI,
+) -> AsyncIOMotorClient:
+    """Returns the process-wide asynchronous MongoDB client for the given URI.
+
+    Args:
+        mongodb_uri (str, optional): URI for connecting to MongoDB instance.
+            Defaults to value from settings.
+
+    Returns:
+        AsyncIOMotorClient: The shared asynchronous MongoDB client.
+    """
+
+    client = _async_clients.get(mongodb_uri)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _async_clients.get(mongodb_uri)
+        if client is None:
+            client = AsyncIOMotorClient(mongodb_uri, appname=APP_NAME)
+            _async_clients[mongodb_uri] = client
+            logger.info(f"Opened shared async MongoDB client for URI: {mongodb_uri}")
+
+    return client
+
+
+def close_mongo_clients() -> None:
+    """Closes every shared MongoDB client and empties the registry.
+
+    This should be called once when the process shuts down (API lifespan or at the
+    end of a CLI command). Clients requested afterwards are created from scratch.
+    """
+
+    with _lock:
+        for uri, client in list(_clients.items()) + list(_async_clients.items()):
+            client.close()
+            logger.debug(f"Closed shared MongoDB client for URI: {uri}")
+
+        _clients.clear()
+        _async_clients.clear()
@@ -0,0 +1,76 @@
+import zlib
+from typing import Any
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from philoagents.config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_SUFFIX = "+zstd"
+ZLIB_SUFFIX = "+zlib"
+
+
+class CompressedSerializer(SerializerProtocol):
+    """Checkpoint serializer producing compact msgpack payloads.
+
+    Values are first serialized by LangGraph's `JsonPlusSerializer` (msgpack). Payloads
+    larger than `min_size` bytes are then compressed with zstd, or with zlib when
+    `zstandard` is not installed, and the compression is recorded in the type tag.
+    Payloads written without compression (including those of older checkpoints)
+    are still decoded as-is.
+
+    Args:
+        min_size (int, optional): Smallest payload, in bytes, worth compressing.
+            Defaults to value from settings.
+        level (int, optional): Compression level. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        min_size: int = settings.CHECKPOINT_COMPRESSION_MIN_BYTES,
+        level: int = settings.CHECKPOINT_COMPRESSION_LEVEL,
+    ) -> None:
+        self.min_size = min_size
+        self.level = level
+
+        self.__serde = JsonPlusSerializer()
+        if zstandard is not None:
+            self.__compressor = zstandard.ZstdCompressor(level=level)
+            self.__decompressor = zstandard.ZstdDecompressor()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.__serde.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.__serde.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.__serde.dumps_typed(obj)
+        if len(data) < self.min_size:
+            return type_, data
+
+        if zstandard is not None:
+            return f"{type_}{ZSTD_SUFFIX}", self.__compressor.compress(data)
+
+        return f"{type_}{ZLIB_SUFFIX}", zlib.compress(data, self.level)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+
+        if type_.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise RuntimeError(
+                    "Checkpoint is zstd-compressed but 'zstandard' is not installed."
+                )
+            type_ = type_.removesuffix(ZSTD_SUFFIX)
+            payload = self.__decompressor.decompress(payload)
+        elif type_.endswith(ZLIB_SUFFIX):
+            type_ = type_.removesuffix(ZLIB_SUFFIX)
+            payload = zlib.decompress(payload)
+
+        return self.__serde.loads_typed((type_, payload))
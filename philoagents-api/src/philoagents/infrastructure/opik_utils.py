@@ -1,15 +1,48 @@
 import os
+import threading
+from typing import TYPE_CHECKING
 
-import opik
 from loguru import logger
-from opik.configurator.configure import OpikConfigurator
-from opik.rest_api.core.api_error import ApiError
 
 from philoagents.config import settings
 
+# opik is imported inside the functions below, as loading it is a significant part
+# of the API cold start.
+if TYPE_CHECKING:
+    import opik
+
+# Set once `configure` has run, whether or not it succeeded.
+_configured = threading.Event()
+
 
 def configure() -> None:
+    try:
+        __configure()
+    finally:
+        _configured.set()
+
+
+def wait_until_configured(timeout: float | None = None) -> bool:
+    """Waits for `configure` to run, e.g. in the background at startup.
+
+    Opik clients created before that would use the default configuration.
+
+    Args:
+        timeout (float | None, optional): Longest wait, in seconds. Defaults to
+            waiting indefinitely.
+
+    Returns:
+        bool: Whether `configure` has run.
+    """
+
+    return _configured.wait(timeout)
+
+
+def __configure() -> None:
     if settings.COMET_API_KEY and settings.COMET_PROJECT:
+        import opik
+        from opik.configurator.configure import OpikConfigurator
+
         try:
             client = OpikConfigurator(api_key=settings.COMET_API_KEY)
             default_workspace = client._get_default_workspace()
@@ -43,7 +76,9 @@ def configure() -> None:
         )
 
 
-def get_dataset(name: str) -> opik.Dataset | None:
+def get_dataset(name: str) -> "opik.Dataset | None":
+    import opik
+
     client = opik.Opik()
     try:
         dataset = client.get_dataset(name=name)
@@ -53,7 +88,10 @@ def get_dataset(name: str) -> opik.Dataset | None:
     return dataset
 
 
-def create_dataset(name: str, description: str, items: list[dict]) -> opik.Dataset:
+def create_dataset(name: str, description: str, items: list[dict]) -> "opik.Dataset":
+    import opik
+    from opik.rest_api.core.api_error import ApiError
+
     client = opik.Opik()
 
     try:
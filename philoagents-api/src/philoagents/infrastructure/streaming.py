@@ -0,0 +1,259 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal
+
+from fastapi import Request, WebSocket, WebSocketDisconnect
+from loguru import logger
+
+from philoagents.config import settings
+
+from .metrics import observe_stage
+
+FrameFormat = Literal["json", "msgpack"]
+EmitEvent = Callable[[str, dict[str, Any]], Awaitable[None]]
+
+
+class ChunkBatcher:
+    """Coalesces streamed response chunks into fewer, larger frames.
+
+    Chunks are buffered and sent together once `max_bytes` of text is buffered, or
+    at most `flush_interval` seconds after the first buffered chunk, whichever comes
+    first. Setting either value to 0 sends every chunk as soon as it arrives.
+
+    Args:
+        send (Callable[[str], Awaitable[None]]): Sends a batch of chunks to the client.
+        flush_interval (float, optional): Longest time, in seconds, a chunk stays
+            buffered. Defaults to value from settings.
+        max_bytes (int, optional): Buffered size, in UTF-8 bytes, that triggers a
+            flush. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[None]],
+        flush_interval: float = settings.STREAM_FLUSH_INTERVAL_SECONDS,
+        max_bytes: int = settings.STREAM_FLUSH_MAX_BYTES,
+    ) -> None:
+        self.send = send
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+
+        self.__chunks: list[str] = []
+        self.__buffer: list[str] = []
+        self.__buffered_bytes = 0
+        self.__send_lock = asyncio.Lock()
+        self.__timer: asyncio.TimerHandle | None = None
+        self.__timer_flushes: set[asyncio.Task] = set()
+
+    @property
+    def text(self) -> str:
+        """The full text received so far."""
+
+        return "".join(self.__chunks)
+
+    async def add(self, chunk: str) -> None:
+        """Buffers a chunk, flushing the buffer if the flush policy requires it."""
+
+        if not chunk:
+            return
+
+        self.__chunks.append(chunk)
+        self.__buffer.append(chunk)
+        self.__buffered_bytes += len(chunk.encode("utf-8"))
+
+        if self.__buffered_bytes >= self.max_bytes or self.flush_interval <= 0:
+            await self.flush()
+        elif self.__timer is None:
+            self.__timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, self.__on_timer
+            )
+
+    async def flush(self) -> None:
+        """Sends the buffered chunks, if any, as a single batch."""
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+        if not self.__buffer:
+            return
+
+        batch = "".join(self.__buffer)
+        self.__buffer.clear()
+        self.__buffered_bytes = 0
+
+        # Batches are taken from the buffer and queued on the lock in the same step,
+        # so they are sent in order even when a timer flush is still in progress.
+        async with self.__send_lock:
+            await self.send(batch)
+
+    async def aclose(self) -> None:
+        """Flushes the remaining chunks and waits for the in-flight timer flushes."""
+
+        await self.flush()
+
+        if self.__timer_flushes:
+            await asyncio.gather(*self.__timer_flushes)
+
+    def cancel(self) -> None:
+        """Drops the buffered chunks and stops pending and in-flight timer flushes."""
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+
+        for timer_flush in self.__timer_flushes:
+            timer_flush.cancel()
+
+        self.__buffer.clear()
+        self.__buffered_bytes = 0
+
+    def __on_timer(self) -> None:
+        self.__timer = None
+
+        # A timer flush may still be waiting to send when the next one starts, so
+        # all of them are tracked until done.
+        timer_flush = asyncio.create_task(self.flush())
+        self.__timer_flushes.add(timer_flush)
+        timer_flush.add_done_callback(self.__timer_flushes.discard)
+
+
+def get_frame_sender(
+    websocket: WebSocket, frame_format: FrameFormat = settings.WS_FRAME_FORMAT
+) -> Callable[[dict[str, Any]], Awaitable[None]]:
+    """Returns a function sending messages over a WebSocket in the given format.
+
+    Args:
+        websocket (WebSocket): The connected WebSocket.
+        frame_format (FrameFormat, optional): "json" for text frames or "msgpack"
+            for binary frames. Defaults to value from settings.
+
+    Returns:
+        Callable[[dict[str, Any]], Awaitable[None]]: Sends one message per frame.
+
+    Raises:
+        ValueError: If the frame format is not supported.
+    """
+
+    if frame_format == "json":
+
+        async def send_json(message: dict[str, Any]) -> None:
+            with observe_stage("websocket_send"):
+                await websocket.send_text(json.dumps(message, separators=(",", ":")))
+
+        return send_json
+
+    if frame_format == "msgpack":
+        import ormsgpack
+
+        async def send_msgpack(message: dict[str, Any]) -> None:
+            with observe_stage("websocket_send"):
+                await websocket.send_bytes(ormsgpack.packb(message))
+
+        return send_msgpack
+
+    raise ValueError(f"Unsupported frame format: {frame_format}")
+
+
+async def receive_frame(websocket: WebSocket) -> Any:
+    """Receives a message sent either as a JSON text frame or a msgpack binary frame.
+
+    Raises:
+        WebSocketDisconnect: If the client disconnected.
+    """
+
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+
+    if message.get("bytes") is not None:
+        import ormsgpack
+
+        return ormsgpack.unpackb(message["bytes"])
+
+    return json.loads(message["text"])
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    """Formats a Server-Sent Event with a JSON payload."""
+
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def stream_sse(
+    request: Request,
+    produce: Callable[[EmitEvent], Awaitable[None]],
+    heartbeat_interval: float = settings.SSE_HEARTBEAT_INTERVAL_SECONDS,
+    max_queued_events: int = settings.SSE_MAX_QUEUED_EVENTS,
+) -> AsyncIterator[str]:
+    """Runs `produce` in a background task and streams the events it emits as SSE.
+
+    Events go through a bounded queue: once `max_queued_events` are waiting to be
+    written, `produce` is paused until the client catches up. A comment line is sent
+    whenever no event was written for `heartbeat_interval` seconds, and `produce` is
+    cancelled as soon as the client disconnects.
+
+    Args:
+        request (Request): The streaming HTTP request.
+        produce (Callable[[EmitEvent], Awaitable[None]]): Coroutine function called
+            with an `emit(event, data)` callback.
+        heartbeat_interval (float, optional): Seconds of inactivity before sending a
+            heartbeat. Defaults to value from settings.
+        max_queued_events (int, optional): Maximum number of events waiting to be
+            sent. Defaults to value from settings.
+
+    Yields:
+        str: Formatted events and heartbeats.
+    """
+
+    queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=max_queued_events)
+
+    async def emit(event: str, data: dict[str, Any]) -> None:
+        await queue.put(format_sse(event, data))
+
+    async def run() -> None:
+        try:
+            await produce(emit)
+        except Exception as e:
+            logger.error(f"SSE stream failed: {e}")
+            await emit("error", {"error": str(e)})
+
+        await queue.put(None)
+
+    producer = asyncio.create_task(run())
+    disconnected = asyncio.create_task(__wait_for_disconnect(request))
+
+    try:
+        while True:
+            next_event = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=heartbeat_interval,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if next_event not in done:
+                next_event.cancel()
+                if disconnected in done:
+                    logger.info("SSE client disconnected, cancelling generation.")
+                    break
+
+                yield ": heartbeat\n\n"
+                continue
+
+            event = next_event.result()
+            if event is None:
+                break
+
+            yield event
+    finally:
+        producer.cancel()
+        disconnected.cancel()
+        # Lets the producer clean up (e.g. release its admission slot) before the
+        # response ends.
+        await asyncio.gather(producer, disconnected, return_exceptions=True)
+
+
+async def __wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable
+
+from loguru import logger
+
+from philoagents.config import settings
+from philoagents.infrastructure.checkpoint_cache import sync_cached_thread
+from philoagents.infrastructure.metrics import THREAD_TURNS_QUEUED
+from philoagents.infrastructure.mongo import MongoThreadLease, ThreadLease
+
+
+@dataclass
+class _ThreadQueue:
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    turns: int = 0
+
+
+class ThreadTurnLocks:
+    """Serializes the turns of each conversation thread.
+
+    Two turns of the same thread would otherwise read the same parent checkpoint and
+    race to write the next one, losing messages. Within the process, turns of a
+    thread wait on an asyncio lock and run in arrival order. With a `lease`, the
+    holder of the lock also leases the thread in MongoDB, which serializes turns
+    across workers.
+
+    Args:
+        lease (MongoThreadLease | None, optional): Cross-worker lease. Defaults to
+            None (serialization within the process only).
+        lease_scope (Callable[[ThreadLease], AbstractAsyncContextManager] | None,
+            optional): Context entered with the held lease, e.g. to sync in-process
+            caches with the other workers. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        lease: MongoThreadLease | None = None,
+        lease_scope: Callable[[ThreadLease], AbstractAsyncContextManager] | None = None,
+    ) -> None:
+        self.lease = lease
+        self.lease_scope = lease_scope
+
+        self.__queues: dict[str, _ThreadQueue] = {}
+        self.__total_turns = 0
+        self.__total_wait_seconds = 0.0
+        self.__max_queue_depth = 0
+
+    @asynccontextmanager
+    async def turn(self, thread_id: str) -> AsyncIterator[None]:
+        """Waits for the thread's previous turns, then holds it for this turn.
+
+        Args:
+            thread_id (str): The conversation thread.
+        """
+
+        queue = self.__queues.setdefault(thread_id, _ThreadQueue())
+        queue.turns += 1
+        self.__max_queue_depth = max(self.__max_queue_depth, queue.turns - 1)
+
+        started_at = time.monotonic()
+        lease = self.lease.hold(thread_id) if self.lease is not None else nullcontext()
+        waiting = True
+        THREAD_TURNS_QUEUED.inc()
+        try:
+            async with queue.lock, lease as thread_lease:
+                waiting = False
+                THREAD_TURNS_QUEUED.dec()
+                lease_scope = (
+                    self.lease_scope(thread_lease)
+                    if thread_lease is not None and self.lease_scope is not None
+                    else nullcontext()
+                )
+                async with lease_scope:
+                    self.__record_wait(thread_id, time.monotonic() - started_at)
+                    yield
+        finally:
+            if waiting:
+                THREAD_TURNS_QUEUED.dec()
+            queue.turns -= 1
+            if queue.turns == 0:
+                del self.__queues[thread_id]
+
+    def stats(self) -> dict:
+        """Returns queue depth and wait time statistics.
+
+        Returns:
+            dict: `active_threads` (threads with a running or queued turn),
+                `queued_turns` (turns waiting for their thread), `max_queue_depth`
+                (most turns seen waiting for one thread), `turns` and
+                `average_wait_seconds` (since startup).
+        """
+
+        return {
+            "active_threads": len(self.__queues),
+            "queued_turns": sum(queue.turns - 1 for queue in self.__queues.values()),
+            "max_queue_depth": self.__max_queue_depth,
+            "turns": self.__total_turns,
+            "average_wait_seconds": round(
+                self.__total_wait_seconds / max(self.__total_turns, 1), 4
+            ),
+            "lease_enabled": self.lease is not None,
+        }
+
+    def __record_wait(self, thread_id: str, wait_seconds: float) -> None:
+        self.__total_turns += 1
+        self.__total_wait_seconds += wait_seconds
+
+        if wait_seconds > 1.0:
+            logger.debug(f"Turn of thread '{thread_id}' waited {wait_seconds:.2f}s")
+
+
+_thread_locks: ThreadTurnLocks | None = None
+
+
+def is_thread_lease_enabled() -> bool:
+    """Whether turns are serialized across workers, as required with several of them."""
+
+    return settings.THREAD_LEASE_ENABLED or settings.API_WORKERS > 1
+
+
+def get_thread_locks() -> ThreadTurnLocks:
+    """Returns the process-wide turn locks, with a MongoDB lease if enabled.
+
+    Leased turns also keep the checkpoint cache coherent across workers.
+    """
+
+    global _thread_locks
+
+    if _thread_locks is None:
+        if is_thread_lease_enabled():
+            _thread_locks = ThreadTurnLocks(
+                lease=MongoThreadLease.build_from_settings(),
+                lease_scope=sync_cached_thread,
+            )
+        else:
+            _thread_locks = ThreadTurnLocks()
+
+    return _thread_locks
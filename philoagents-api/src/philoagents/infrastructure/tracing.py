@@ -0,0 +1,252 @@
+import queue
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.tracers.base import AsyncBaseTracer
+from langchain_core.tracers.schemas import Run
+from loguru import logger
+
+from philoagents.config import settings
+
+from .metrics import TRACES
+from .opik_utils import wait_until_configured
+
+# opik is only imported by the exporter thread, off the request path.
+if TYPE_CHECKING:
+    import opik
+
+_STOP = object()
+
+
+class _RunRecorder(AsyncBaseTracer):
+    """Keeps the finished root runs of a turn in memory."""
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        self.runs: list[Run] = []
+
+    async def _persist_run(self, run: Run) -> None:
+        self.runs.append(run)
+
+
+class TraceExporter:
+    """Exports turn traces to Opik from a background thread.
+
+    Traces are queued without blocking; when `max_queued` traces are already
+    waiting, new ones are dropped rather than slowing down requests. The Opik client
+    is only created once Opik is configured, which the API does in the background
+    at startup; until then, traces wait in the queue.
+
+    Args:
+        max_queued (int, optional): Traces waiting for export before new ones are
+            dropped. Defaults to value from settings.
+        configure_timeout (float, optional): Longest wait for Opik to be configured
+            before a trace fails to export, in seconds. Defaults to 60.
+    """
+
+    def __init__(
+        self,
+        max_queued: int = settings.OPIK_TRACE_QUEUE_SIZE,
+        configure_timeout: float = 60.0,
+    ) -> None:
+        self.max_queued = max_queued
+        self.configure_timeout = configure_timeout
+
+        self.__queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self.__client: "opik.Opik | None" = None
+        self.__thread = threading.Thread(
+            target=self.__run, name="opik-trace-exporter", daemon=True
+        )
+        self.__thread.start()
+
+    def submit(self, run: Run, metadata: dict[str, Any], tags: list[str]) -> bool:
+        """Queues a run tree for export.
+
+        Returns:
+            bool: Whether the trace was queued, rather than dropped.
+        """
+
+        try:
+            self.__queue.put_nowait((run, metadata, tags))
+        except queue.Full:
+            TRACES.labels(outcome="dropped").inc()
+
+            return False
+
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Exports the queued traces, waiting at most `timeout` seconds."""
+
+        deadline = time.monotonic() + timeout
+        try:
+            self.__queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Trace export queue still full on shutdown")
+
+            return
+
+        self.__thread.join(max(0.0, deadline - time.monotonic()))
+        if self.__client is not None:
+            self.__client.flush(timeout=max(1, int(deadline - time.monotonic())))
+
+    def __run(self) -> None:
+        while (item := self.__queue.get()) is not _STOP:
+            run, metadata, tags = item
+            try:
+                self.__export(run, metadata, tags)
+                TRACES.labels(outcome="exported").inc()
+            except Exception as e:
+                TRACES.labels(outcome="failed").inc()
+                logger.warning(f"Failed to export trace of run '{run.name}': {e}")
+
+    def __export(self, run: Run, metadata: dict[str, Any], tags: list[str]) -> None:
+        if self.__client is None:
+            if not wait_until_configured(self.configure_timeout):
+                raise RuntimeError("Opik is not configured yet")
+
+            import opik
+
+            self.__client = opik.Opik(project_name=settings.COMET_PROJECT)
+
+        trace = self.__client.trace(
+            name=run.name,
+            start_time=run.start_time,
+            end_time=run.end_time,
+            input=run.inputs,
+            output=run.outputs,
+            metadata={**metadata, "error": run.error} if run.error else metadata,
+            tags=tags,
+        )
+        for child_run in run.child_runs:
+            self.__export_span(trace, child_run)
+
+    def __export_span(self, parent, run: Run) -> None:
+        run_metadata = (run.extra or {}).get("metadata") or {}
+        if run.error:
+            run_metadata = {**run_metadata, "error": run.error}
+
+        span = parent.span(
+            name=run.name,
+            type="llm" if run.run_type in ("llm", "chat_model") else "general",
+            start_time=run.start_time,
+            end_time=run.end_time,
+            input=run.inputs,
+            output=run.outputs,
+            metadata=run_metadata,
+            tags=run.tags,
+            model=run_metadata.get("ls_model_name"),
+            provider=run_metadata.get("ls_provider"),
+        )
+        for child_run in run.child_runs:
+            self.__export_span(span, child_run)
+
+
+_trace_exporter: TraceExporter | None = None
+
+
+def get_trace_exporter() -> TraceExporter:
+    """Returns the process-wide trace exporter, starting it on first use."""
+
+    global _trace_exporter
+
+    if _trace_exporter is None:
+        _trace_exporter = TraceExporter()
+
+    return _trace_exporter
+
+
+def close_trace_exporter() -> None:
+    """Exports the queued traces and stops the exporter, if it was started."""
+
+    global _trace_exporter
+
+    if _trace_exporter is not None:
+        _trace_exporter.close()
+
+    _trace_exporter = None
+
+
+class TurnTrace:
+    """Records a conversation turn and decides, once it ends, whether to export it.
+
+    A share of the turns (`sample_rate`) is traced at random. Failed turns and
+    turns slower than `slow_turn_seconds` are traced regardless, so that the
+    traces worth looking at are kept even with a low sample rate.
+
+    Args:
+        metadata (dict[str, Any]): Metadata of the trace, e.g. the thread ID.
+        sample_rate (float, optional): Share of turns traced at random. Defaults to
+            value from settings.
+        trace_errors (bool, optional): Whether failed turns are always traced.
+            Defaults to value from settings.
+        slow_turn_seconds (float | None, optional): Duration above which turns are
+            always traced. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        metadata: dict[str, Any],
+        sample_rate: float = settings.OPIK_TRACE_SAMPLE_RATE,
+        trace_errors: bool = settings.OPIK_TRACE_ERRORS,
+        slow_turn_seconds: float | None = settings.OPIK_TRACE_SLOW_TURN_SECONDS,
+    ) -> None:
+        self.metadata = metadata
+        self.trace_errors = trace_errors
+        self.slow_turn_seconds = slow_turn_seconds
+        self.sampled = random.random() < sample_rate
+
+        # Without tail sampling, unsampled turns aren't even recorded.
+        self.__recorder = (
+            _RunRecorder()
+            if self.sampled or trace_errors or slow_turn_seconds is not None
+            else None
+        )
+        self.__started_at = time.perf_counter()
+
+    @property
+    def callbacks(self) -> list:
+        """Callbacks to pass in the config of the traced runs."""
+
+        return [self.__recorder] if self.__recorder is not None else []
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """Queues the recorded runs for export if the turn is sampled."""
+
+        if self.__recorder is None or not self.__recorder.runs:
+            return
+
+        duration_seconds = time.perf_counter() - self.__started_at
+        if self.sampled:
+            reason = "sampled"
+        elif error is not None and self.trace_errors:
+            reason = "error"
+        elif (
+            self.slow_turn_seconds is not None
+            and duration_seconds > self.slow_turn_seconds
+        ):
+            reason = "slow"
+        else:
+            TRACES.labels(outcome="skipped").inc()
+
+            return
+
+        exporter = get_trace_exporter()
+        for run in self.__recorder.runs:
+            exporter.submit(
+                run,
+                {**self.metadata, "duration_seconds": round(duration_seconds, 3)},
+                tags=[reason],
+            )
+
+
+def start_turn_trace(metadata: dict[str, Any]) -> TurnTrace | None:
+    """Starts recording a conversation turn, or returns None if tracing is disabled."""
+
+    if not settings.OPIK_TRACING_ENABLED:
+        return None
+
+    return TurnTrace(metadata)
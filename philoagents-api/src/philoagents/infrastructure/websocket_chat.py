@@ -0,0 +1,234 @@
+import asyncio
+import uuid
+from contextlib import AsyncExitStack, aclosing
+from typing import Any, Awaitable, Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+from loguru import logger
+
+from philoagents.application.conversation_service.generate_response import (
+    get_streaming_response,
+)
+from philoagents.config import settings
+from philoagents.domain.philosopher_factory import get_persona_registry
+
+from .admission import AdmissionRejected, get_admission_controller
+from .streaming import ChunkBatcher, receive_frame
+
+SendFrame = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class WebSocketChatSession:
+    """Serves the chat requests of a single WebSocket connection.
+
+    The socket is read continuously, and each request is answered in its own task,
+    so that a client can talk to several philosophers at once or cancel a request
+    while its response is streaming. Requests may carry a `request_id`, which is
+    echoed in every frame of their response; requests without one can't be told
+    apart and are answered one at a time. Requests to the same conversation thread
+    are answered one at a time, in the order they were received.
+
+    Besides chat requests (`{"message", "philosopher_id", "request_id"?}`), clients
+    can send `{"type": "cancel", "request_id": ...}` to stop an in-flight request.
+    Only requests sent with a `request_id` can be cancelled.
+
+    Args:
+        websocket (WebSocket): The accepted WebSocket.
+        send (SendFrame): Sends a message over the WebSocket.
+        client_keys (tuple[str, ...]): Identify the client for rate limiting.
+        max_concurrent_requests (int, optional): Maximum number of requests in
+            flight; further requests are rejected. Defaults to value from settings.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        send: SendFrame,
+        client_keys: tuple[str, ...],
+        max_concurrent_requests: int = settings.WS_MAX_CONCURRENT_REQUESTS,
+    ) -> None:
+        self.websocket = websocket
+        self.send = send
+        self.client_keys = client_keys
+        self.max_concurrent_requests = max_concurrent_requests
+
+        self.__requests: dict[str, asyncio.Task] = {}
+        self.__thread_locks: dict[str, asyncio.Lock] = {}
+        self.__unidentified_lock = asyncio.Lock()
+        self.__closed = False
+
+    async def run(self) -> None:
+        """Serves requests until the client disconnects."""
+
+        try:
+            while True:
+                try:
+                    data = await receive_frame(self.websocket)
+                except ValueError as e:
+                    await self.send({"error": f"Invalid frame: {e}"})
+                    continue
+
+                await self.__dispatch(data)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Cancels every in-flight request and waits for them to stop."""
+
+        self.__closed = True
+
+        requests = list(self.__requests.values())
+        for request in requests:
+            request.cancel()
+
+        await asyncio.gather(*requests, return_exceptions=True)
+
+    async def __dispatch(self, data: Any) -> None:
+        if not isinstance(data, dict):
+            await self.send({"error": "Invalid message format. Expected an object."})
+            return
+
+        request_id = data.get("request_id")
+        if request_id is not None and not isinstance(request_id, str):
+            await self.send({"error": "Invalid 'request_id'. Expected a string."})
+            return
+
+        send = self.__get_request_sender(request_id)
+
+        if data.get("type") == "cancel":
+            if request_id is None:
+                await send(
+                    {"error": "Cancelling requires the 'request_id' of the request."}
+                )
+                return
+
+            request = self.__requests.get(request_id)
+            if request is None:
+                await send({"error": f"No request '{request_id}' in flight."})
+            else:
+                request.cancel()
+
+            return
+
+        if "message" not in data or "philosopher_id" not in data:
+            await send(
+                {
+                    "error": "Invalid message format. Required fields: 'message' and 'philosopher_id'"
+                }
+            )
+            return
+
+        if not isinstance(data["philosopher_id"], str):
+            await send({"error": "Invalid 'philosopher_id'. Expected a string."})
+            return
+
+        if data["philosopher_id"] not in get_persona_registry():
+            await send({"error": f"Philosopher '{data['philosopher_id']}' not found."})
+            return
+
+        if request_id is not None and request_id in self.__requests:
+            await send({"error": f"Request '{request_id}' is already in flight."})
+            return
+
+        if len(self.__requests) >= self.max_concurrent_requests:
+            await send(
+                {
+                    "error": f"Too many concurrent requests (max {self.max_concurrent_requests})."
+                }
+            )
+            return
+
+        try:
+            get_admission_controller().check(self.client_keys)
+        except AdmissionRejected as e:
+            await send({"error": str(e), "retry_after": e.retry_after})
+            return
+
+        thread_lock = self.__thread_locks.setdefault(
+            data["philosopher_id"].lower(), asyncio.Lock()
+        )
+        if request_id is None:
+            # Frames of requests without a `request_id` can't be told apart, so
+            # these requests are answered one at a time, as before multiplexing.
+            request_key = uuid.uuid4().hex
+            locks = (self.__unidentified_lock, thread_lock)
+        else:
+            request_key = request_id
+            locks = (thread_lock,)
+
+        request = asyncio.create_task(self.__handle(send, data, locks))
+        self.__requests[request_key] = request
+        request.add_done_callback(lambda _: self.__requests.pop(request_key, None))
+
+    def __get_request_sender(self, request_id: str | None) -> SendFrame:
+        if request_id is None:
+            return self.send
+
+        async def send(message: dict[str, Any]) -> None:
+            await self.send({**message, "request_id": request_id})
+
+        return send
+
+    async def __handle(
+        self, send: SendFrame, data: dict, locks: tuple[asyncio.Lock, ...]
+    ) -> None:
+        try:
+            async with AsyncExitStack() as stack:
+                for lock in locks:
+                    await stack.enter_async_context(lock)
+
+                await stream_response(send, data)
+        except asyncio.CancelledError:
+            if not self.__closed:
+                logger.info(f"Request '{data.get('request_id')}' cancelled by client.")
+                await send({"cancelled": True, "streaming": False})
+
+            raise
+        except WebSocketDisconnect:
+            pass
+
+
+async def stream_response(send: SendFrame, data: dict) -> None:
+    """Streams the philosopher's answer to a chat message as batched chunk frames.
+
+    Args:
+        send (SendFrame): Sends a message to the client.
+        data (dict): The chat message, with `message` and `philosopher_id` keys.
+
+    Raises:
+        WebSocketDisconnect: If the client disconnected.
+    """
+
+    try:
+        # Send initial message to indicate streaming has started
+        await send({"streaming": True})
+
+        # Stream the response in batches of chunks
+        batcher = ChunkBatcher(lambda batch: send({"chunk": batch}))
+        try:
+            async with (
+                get_admission_controller().slot(),
+                aclosing(
+                    get_streaming_response(
+                        messages=data["message"],
+                        philosopher_id=data["philosopher_id"],
+                        philosopher_context="",
+                    )
+                ) as response_stream,
+            ):
+                async for chunk in response_stream:
+                    await batcher.add(chunk)
+            await batcher.aclose()
+        finally:
+            batcher.cancel()
+
+        await send({"response": batcher.text, "streaming": False})
+
+    except WebSocketDisconnect:
+        raise
+    except AdmissionRejected as e:
+        await send({"error": str(e), "retry_after": e.retry_after})
+    except Exception as e:
+        await send({"error": str(e)})
@@ -0,0 +1,26 @@
+from importlib import import_module
+from typing import Any, Callable
+
+
+def lazy_exports(module_name: str, exports: dict[str, str]) -> Callable[[str], Any]:
+    """Builds a module `__getattr__` importing the given exports on first access.
+
+    Lets a package re-export names from submodules with heavy dependencies without
+    loading them when the package itself is imported.
+
+    Args:
+        module_name (str): `__name__` of the exporting package.
+        exports (dict[str, str]): Maps each exported name to the module defining
+            it, relative to the package (e.g. `".embeddings"`).
+
+    Returns:
+        Callable[[str], Any]: The `__getattr__` function of the package.
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name in exports:
+            return getattr(import_module(exports[name], module_name), name)
+
+        raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+
+    return __getattr__
@@ -0,0 +1,6 @@
+import os
+
+# Settings are loaded on import and require these, so give them dummy values.
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
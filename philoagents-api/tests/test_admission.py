@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from philoagents.infrastructure.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    TokenBucket,
+)
+
+
+def test_token_bucket_allows_bursts_then_the_sustained_rate() -> None:
+    bucket = TokenBucket(rate=10, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    retry_after = bucket.try_acquire()
+    assert 0 < retry_after <= 0.1
+
+    asyncio.run(asyncio.sleep(retry_after + 0.01))
+    assert bucket.try_acquire() == 0.0
+
+
+def test_rate_limits_each_client_key() -> None:
+    controller = AdmissionController(rate_per_second=0.01, burst=2)
+
+    controller.check(("ip:a", "session:1"))
+    controller.check(("ip:a", "session:2"))
+
+    # The IP address is out of tokens, whatever the session.
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check(("ip:a", "session:3"))
+    assert rejected.value.reason == "rate_limited"
+    assert rejected.value.retry_after > 0
+
+    controller.check(("ip:b",))
+    assert controller.stats()["rejected"] == {"rate_limited": 1}
+
+
+def test_rate_limiting_is_disabled_by_default() -> None:
+    controller = AdmissionController(rate_per_second=0)
+
+    for _ in range(100):
+        controller.check(("ip:a",))
+
+
+def test_slot_times_out_when_every_slot_is_busy() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+
+        async with controller.slot():
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with controller.slot():
+                    pass
+            assert rejected.value.reason == "queue_timeout"
+
+        async with controller.slot():
+            assert controller.stats()["in_flight"] == 1
+
+        stats = controller.stats()
+        assert stats["in_flight"] == stats["queued"] == 0
+        assert stats["admitted"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_slot_rejects_when_the_queue_is_full() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController(
+            max_concurrent=1, max_queued=1, queue_timeout=1
+        )
+        release = asyncio.Event()
+
+        async def generate() -> None:
+            async with controller.slot():
+                await release.wait()
+
+        running = asyncio.create_task(generate())
+        queued = asyncio.create_task(generate())
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.check(("ip:a",))
+        assert rejected.value.reason == "overloaded"
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(scenario())
+
+
+def test_draining_rejects_new_requests() -> None:
+    async def scenario() -> None:
+        controller = AdmissionController()
+        controller.start_draining()
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.check(("ip:a",))
+        assert rejected.value.reason == "draining"
+        assert await controller.wait_idle(timeout=0.1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+
+from philoagents.infrastructure.checkpoint_cache import CachedCheckpointer
+
+
+class FlakySaver(InMemorySaver):
+    """In-memory checkpointer whose puts fail `failures` times, or wait for `gate`."""
+
+    def __init__(self, failures: int = 0, gate: asyncio.Event | None = None) -> None:
+        super().__init__()
+
+        self.failures = failures
+        self.gate = gate
+        self.attempts = 0
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        self.attempts += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("MongoDB is unavailable")
+
+        return await super().aput(config, checkpoint, metadata, new_versions)
+
+
+def thread_config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+def build_cache(backing: InMemorySaver, **kwargs) -> CachedCheckpointer:
+    options = {"batch_size": 1, "flush_interval": 0.01, "retry_backoff": 0}
+    options.update(kwargs)
+
+    return CachedCheckpointer(backing=backing, **options)
+
+
+async def put(cache: CachedCheckpointer, thread_id: str) -> str:
+    checkpoint = empty_checkpoint()
+    await cache.aput(thread_config(thread_id), checkpoint, {}, {})
+
+    return checkpoint["id"]
+
+
+def test_write_behind_retries_failed_puts() -> None:
+    async def scenario() -> None:
+        backing = FlakySaver(failures=2)
+        cache = build_cache(backing, max_retries=3)
+
+        checkpoint_id = await put(cache, "thread")
+        await cache.aflush()
+
+        persisted = await backing.aget_tuple(thread_config("thread"))
+        assert persisted.checkpoint["id"] == checkpoint_id
+        assert backing.attempts == 3
+        assert cache.get_cached_checkpoint_id("thread") == checkpoint_id
+
+        await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_write_behind_drops_thread_after_last_retry() -> None:
+    async def scenario() -> None:
+        backing = FlakySaver(failures=10)
+        cache = build_cache(backing, max_retries=2)
+
+        await put(cache, "thread")
+        await cache.aflush()
+
+        assert backing.attempts == 3
+        assert await backing.aget_tuple(thread_config("thread")) is None
+        assert cache.get_cached_checkpoint_id("thread") is None
+
+        await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_puts_wait_when_write_behind_queue_is_full() -> None:
+    async def scenario() -> None:
+        gate = asyncio.Event()
+        cache = build_cache(FlakySaver(gate=gate), max_queued=1)
+
+        # The first put is taken by the writer, which then waits on the gate, and
+        # the second one fills the queue.
+        await put(cache, "thread")
+        await asyncio.sleep(0.01)
+        await put(cache, "thread")
+
+        third_put = asyncio.create_task(put(cache, "thread"))
+        await asyncio.sleep(0.05)
+        assert not third_put.done()
+
+        gate.set()
+        await asyncio.wait_for(third_put, timeout=1)
+        await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_aflush_thread_waits_only_for_that_thread() -> None:
+    async def scenario() -> None:
+        gate = asyncio.Event()
+        backing = FlakySaver(gate=gate)
+        cache = build_cache(backing)
+
+        checkpoint_id = await put(cache, "blocked")
+
+        await asyncio.wait_for(cache.aflush_thread("other"), timeout=1)
+
+        flush = asyncio.create_task(cache.aflush_thread("blocked"))
+        await asyncio.sleep(0.05)
+        assert not flush.done()
+
+        gate.set()
+        await asyncio.wait_for(flush, timeout=1)
+        persisted = await backing.aget_tuple(thread_config("blocked"))
+        assert persisted.checkpoint["id"] == checkpoint_id
+
+        await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_makes_reads_go_to_backing_store() -> None:
+    async def scenario() -> None:
+        backing = InMemorySaver()
+        cache = build_cache(backing)
+
+        cached_id = await put(cache, "thread")
+        await cache.aflush()
+
+        # Another worker moves the thread on, behind this cache's back.
+        newer = empty_checkpoint()
+        persisted = await backing.aget_tuple(thread_config("thread"))
+        await backing.aput(persisted.config, newer, {}, {})
+
+        cached = await cache.aget_tuple(thread_config("thread"))
+        assert cached.checkpoint["id"] == cached_id
+
+        cache.invalidate(lambda thread_id: thread_id == "thread")
+
+        reloaded = await cache.aget_tuple(thread_config("thread"))
+        assert reloaded.checkpoint["id"] == newer["id"]
+        assert cache.get_cached_checkpoint_id("thread") == newer["id"]
+
+        await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_threads_idle_longer_than_ttl_are_reloaded() -> None:
+    async def scenario() -> None:
+        backing = InMemorySaver()
+        cache = build_cache(backing, ttl_seconds=0.05)
+
+        await put(cache, "thread")
+        await cache.aflush()
+
+        # MongoDB expires the idle thread.
+        await backing.adelete_thread("thread")
+        await asyncio.sleep(0.1)
+
+        assert cache.get_cached_checkpoint_id("thread") is None
+        assert await cache.aget_tuple(thread_config("thread")) is None
+
+        await cache.aclose()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("thread_ids", [["a"], ["a", "b", "a"]])
+def test_aflush_persists_every_queued_put(thread_ids: list[str]) -> None:
+    async def scenario() -> None:
+        backing = InMemorySaver()
+        cache = build_cache(backing, batch_size=4)
+
+        latest = {}
+        for thread_id in thread_ids:
+            latest[thread_id] = await put(cache, thread_id)
+        await cache.aflush()
+
+        for thread_id, checkpoint_id in latest.items():
+            persisted = await backing.aget_tuple(thread_config(thread_id))
+            assert persisted.checkpoint["id"] == checkpoint_id
+
+        await cache.aclose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from philoagents.infrastructure.metrics import MULTIPROCESS_DIR_ENV
+
+WORKER = """
+from philoagents.infrastructure.metrics import ADMISSION_IN_FLIGHT, TURNS, close_metrics
+TURNS.labels(philosopher="socrates", outcome="completed").inc()
+ADMISSION_IN_FLIGHT.inc()
+if {stopped}:
+    close_metrics()
+"""
+SCRAPE = """
+import sys
+from philoagents.infrastructure.metrics import render_metrics
+sys.stdout.write(render_metrics().decode())
+"""
+
+
+def run(code: str, metrics_dir: Path) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        env={
+            **os.environ,
+            "PYTHONPATH": os.pathsep.join(sys.path),
+            MULTIPROCESS_DIR_ENV: str(metrics_dir),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def test_metrics_of_every_worker_are_reported(tmp_path: Path) -> None:
+    run(WORKER.format(stopped=False), tmp_path)
+    run(WORKER.format(stopped=True), tmp_path)
+
+    metrics = run(SCRAPE, tmp_path)
+
+    assert (
+        'philoagents_turns_total{outcome="completed",philosopher="socrates"} 2.0'
+        in metrics
+    )
+    # Only the worker still running counts towards live gauges.
+    assert "philoagents_admission_in_flight 1.0" in metrics
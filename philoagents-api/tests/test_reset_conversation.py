@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from philoagents.application.conversation_service import reset_conversation
+from philoagents.config import settings
+from philoagents.infrastructure.mongo import MongoThreadLease
+from philoagents.infrastructure.thread_locks import ThreadTurnLocks
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> AsyncMongoMockClient:
+    client = AsyncMongoMockClient()
+    monkeypatch.setattr(reset_conversation, "get_async_mongo_client", lambda _: client)
+
+    return client
+
+
+def build_lease(client: AsyncMongoMockClient) -> MongoThreadLease:
+    return MongoThreadLease(
+        client[settings.MONGO_DB_NAME][settings.MONGO_THREAD_LEASE_COLLECTION],
+        poll_interval=0.01,
+    )
+
+
+async def insert_threads(client: AsyncMongoMockClient, *thread_ids: str) -> None:
+    db = client[settings.MONGO_DB_NAME]
+    for thread_id in thread_ids:
+        await db[settings.MONGO_STATE_CHECKPOINT_COLLECTION].insert_one(
+            {"thread_id": thread_id, "checkpoint_id": "1ef00000-0000-6000-8000-0"}
+        )
+        await db[settings.MONGO_STATE_WRITES_COLLECTION].insert_one(
+            {"thread_id": thread_id, "checkpoint_id": "1ef00000-0000-6000-8000-0"}
+        )
+
+
+def test_reset_deletes_scoped_threads(client: AsyncMongoMockClient) -> None:
+    async def scenario() -> dict:
+        await insert_threads(client, "socrates", "socrates-1", "plato")
+
+        return await reset_conversation.reset_conversation_state(
+            philosopher_id="socrates"
+        )
+
+    result = asyncio.run(scenario())
+
+    assert result["deleted"] == {
+        settings.MONGO_STATE_CHECKPOINT_COLLECTION: 2,
+        settings.MONGO_STATE_WRITES_COLLECTION: 2,
+    }
+
+
+def test_reset_clears_the_checkpoint_left_in_the_lease(
+    client: AsyncMongoMockClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lease_store = build_lease(client)
+    monkeypatch.setattr(
+        reset_conversation,
+        "get_thread_locks",
+        lambda: ThreadTurnLocks(lease=build_lease(client)),
+    )
+
+    async def scenario() -> None:
+        await insert_threads(client, "socrates", "plato")
+        # A worker caching both threads left them at these checkpoints.
+        for thread_id in ("socrates", "plato"):
+            async with lease_store.hold(thread_id) as lease:
+                lease.checkpoint_id = f"{thread_id}-checkpoint"
+
+        await reset_conversation.reset_conversation_state(thread_id="socrates")
+
+        # The reset thread must be reloaded from MongoDB, the other one not.
+        async with lease_store.hold("socrates") as lease:
+            assert lease.last_checkpoint_id is None
+        async with lease_store.hold("plato") as lease:
+            assert lease.last_checkpoint_id == "plato-checkpoint"
+
+    asyncio.run(scenario())
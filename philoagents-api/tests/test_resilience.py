@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from philoagents.infrastructure.llm import (
+    CircuitBreaker,
+    LLMUnavailableError,
+    ResilientChatModel,
+    resilience,
+)
+from philoagents.infrastructure.llm.fake import FakeStreamingChatModel
+
+
+class ServiceUnavailable(Exception):
+    status_code = 503
+
+
+class FailingChatModel(FakeStreamingChatModel):
+    """Fake model failing with a 503 after streaming `fail_after` tokens."""
+
+    fail_after: int = 0
+    calls: int = 0
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        tokens = super()._astream(messages, stop, run_manager, **kwargs)
+        for _ in range(self.fail_after):
+            yield await anext(tokens)
+
+        raise ServiceUnavailable("overloaded")
+
+
+def build_model(*models: tuple[str, FakeStreamingChatModel]) -> ResilientChatModel:
+    return ResilientChatModel(list(models), max_retries=1, base_delay=0)
+
+
+def fake_model(name: str, **kwargs) -> FakeStreamingChatModel:
+    options = {"token_latency": 0, "response_tokens": 3}
+    options.update(kwargs)
+    model_type = FailingChatModel if "fail_after" in options else FakeStreamingChatModel
+
+    return model_type(model_name=name, **options)
+
+
+def test_circuit_opens_then_lets_a_single_trial_through() -> None:
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    circuit_breaker.record_failure()
+    assert circuit_breaker.allow()
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == "open"
+    assert not circuit_breaker.allow()
+
+    time.sleep(0.06)
+    assert circuit_breaker.state == "half_open"
+    assert circuit_breaker.allow()
+    assert not circuit_breaker.allow()
+
+    # A failed trial reopens the circuit, a successful one closes it.
+    circuit_breaker.record_failure()
+    assert circuit_breaker.state == "open"
+    time.sleep(0.06)
+    assert circuit_breaker.allow()
+    circuit_breaker.record_success()
+    assert circuit_breaker.state == "closed"
+
+
+def test_released_trial_lets_the_next_call_through() -> None:
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    circuit_breaker.record_failure()
+    time.sleep(0.02)
+
+    assert circuit_breaker.allow()
+    circuit_breaker.release_trial()
+
+    assert circuit_breaker.state == "half_open"
+    assert circuit_breaker.allow()
+
+
+def test_fails_over_when_the_call_fails_before_streaming() -> None:
+    failing = fake_model("test-main-before", fail_after=0)
+    model = build_model(
+        ("test-main-before", failing), ("test-fallback-before", fake_model("b"))
+    )
+
+    response = asyncio.run(model.ainvoke([HumanMessage("What is virtue?")]))
+
+    assert failing.calls == 2
+    assert response.response_metadata["model_name"] == "b"
+
+
+def test_raises_when_the_call_fails_after_streaming() -> None:
+    failing = fake_model("test-main-after", fail_after=2)
+    fallback = fake_model("test-fallback-after", fail_after=0)
+    model = build_model(("test-main-after", failing), ("test-fallback-after", fallback))
+
+    with pytest.raises(ServiceUnavailable):
+        asyncio.run(model.ainvoke([HumanMessage("What is virtue?")]))
+
+    assert failing.calls == 1
+    assert fallback.calls == 0
+
+
+def test_cancelled_trial_frees_the_circuit() -> None:
+    async def scenario() -> None:
+        slow = fake_model("test-cancelled-trial", token_latency=1)
+        model = build_model(("test-cancelled-trial", slow))
+        circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+        resilience._circuit_breakers["test-cancelled-trial"] = circuit_breaker
+        circuit_breaker.record_failure()
+
+        call = asyncio.create_task(model.ainvoke([HumanMessage("Hello")]))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+        assert circuit_breaker.allow()
+
+    asyncio.run(scenario())
+
+
+def test_raises_when_every_circuit_is_open() -> None:
+    model = build_model(("test-open", fake_model("test-open")))
+    circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+
+    resilience._circuit_breakers["test-open"] = circuit_breaker
+    circuit_breaker.record_failure()
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(model.ainvoke([HumanMessage("Hello")]))
@@ -0,0 +1,42 @@
+import numpy as np
+
+from philoagents.application.conversation_service.response_cache import (
+    SemanticResponseCache,
+)
+
+KEY = ("socrates", "1:1")
+
+
+def unit(*values: float) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+
+    return vector / np.linalg.norm(vector)
+
+
+def test_get_returns_most_similar_answer_above_threshold() -> None:
+    cache = SemanticResponseCache(embedding_model=None, similarity_threshold=0.9)
+    cache.put(KEY, unit(1, 0, 0), "virtue")
+    cache.put(KEY, unit(0, 1, 0), "knowledge")
+    cache.put(("plato", "1:1"), unit(1, 0.05, 0), "forms")
+
+    assert cache.get(KEY, unit(1, 0.1, 0)) == "virtue"
+    assert cache.get(KEY, unit(0.1, 1, 0)) == "knowledge"
+    assert cache.get(KEY, unit(1, 1, 0)) is None
+    assert cache.get(("aristotle", "1:1"), unit(1, 0, 0)) is None
+
+
+def test_expired_and_evicted_entries_are_dropped() -> None:
+    cache = SemanticResponseCache(
+        embedding_model=None, similarity_threshold=0.9, max_entries=2
+    )
+    cache.put(KEY, unit(1, 0, 0), "virtue")
+    cache.put(KEY, unit(0, 1, 0), "knowledge")
+    cache.put(KEY, unit(0, 0, 1), "soul")
+
+    assert len(cache) == 2
+    assert cache.get(KEY, unit(1, 0, 0)) is None
+    assert cache.get(KEY, unit(0, 0, 1)) == "soul"
+
+    cache.ttl_seconds = -1
+    assert cache.get(KEY, unit(0, 0, 1)) is None
+    assert len(cache) == 0
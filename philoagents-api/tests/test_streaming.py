@@ -0,0 +1,102 @@
+import asyncio
+import random
+
+from philoagents.infrastructure.streaming import ChunkBatcher
+
+
+class SlowClient:
+    """Records the batches it receives, taking a random time to send each one."""
+
+    def __init__(self, max_delay: float = 0.005) -> None:
+        self.max_delay = max_delay
+        self.batches: list[str] = []
+
+    async def send(self, batch: str) -> None:
+        await asyncio.sleep(random.uniform(self.max_delay / 2, self.max_delay))
+        self.batches.append(batch)
+
+
+def test_batches_are_sent_in_order_and_flushed_on_close() -> None:
+    async def scenario() -> None:
+        client = SlowClient()
+        batcher = ChunkBatcher(client.send, flush_interval=0.001, max_bytes=16)
+
+        chunks = [f"token{i} " for i in range(200)]
+        for chunk in chunks:
+            await batcher.add(chunk)
+            if random.random() < 0.3:
+                await asyncio.sleep(0.002)
+        await batcher.aclose()
+
+        # Everything was sent before aclose returned, in the order received.
+        assert "".join(client.batches) == "".join(chunks) == batcher.text
+        assert len(client.batches) < len(chunks)
+
+    random.seed(0)
+    asyncio.run(scenario())
+
+
+def test_aclose_waits_for_every_in_flight_timer_flush() -> None:
+    async def scenario() -> None:
+        client = SlowClient(max_delay=0.02)
+        batcher = ChunkBatcher(client.send, flush_interval=0.001, max_bytes=1024)
+
+        # Each chunk is flushed by its own timer, and the sends overlap.
+        for i in range(5):
+            await batcher.add(f"{i}")
+            await asyncio.sleep(0.003)
+        await batcher.aclose()
+        client.batches.append("final")
+
+        assert client.batches == ["0", "1", "2", "3", "4", "final"]
+
+    random.seed(1)
+    asyncio.run(scenario())
+
+
+def test_cancel_drops_buffered_and_pending_chunks() -> None:
+    async def scenario() -> None:
+        client = SlowClient(max_delay=0)
+        batcher = ChunkBatcher(client.send, flush_interval=0.01, max_bytes=1024)
+
+        await batcher.add("dropped")
+        batcher.cancel()
+        await asyncio.sleep(0.02)
+
+        assert client.batches == []
+        assert batcher.text == "dropped"
+
+    asyncio.run(scenario())
+
+
+def test_cancel_stops_every_in_flight_timer_flush() -> None:
+    async def scenario() -> None:
+        client = SlowClient(max_delay=0.05)
+        batcher = ChunkBatcher(client.send, flush_interval=0.001, max_bytes=1024)
+
+        # The first timer flush is still sending when the second one starts.
+        await batcher.add("a")
+        await asyncio.sleep(0.01)
+        await batcher.add("b")
+        await asyncio.sleep(0.01)
+        batcher.cancel()
+        await asyncio.sleep(0.1)
+
+        assert client.batches == []
+
+    random.seed(2)
+    asyncio.run(scenario())
+
+
+def test_zero_flush_interval_sends_every_chunk() -> None:
+    async def scenario() -> None:
+        client = SlowClient(max_delay=0)
+        batcher = ChunkBatcher(client.send, flush_interval=0, max_bytes=1024)
+
+        for chunk in ("a", "", "b"):
+            await batcher.add(chunk)
+        await batcher.aclose()
+
+        assert client.batches == ["a", "b"]
+
+    asyncio.run(scenario())
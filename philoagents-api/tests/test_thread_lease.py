@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import AutoReconnect
+
+from philoagents.infrastructure.mongo import MongoThreadLease, ThreadLeaseLostError
+
+
+def build_leases(count: int, **kwargs) -> list[MongoThreadLease]:
+    collection = AsyncMongoMockClient()["philoagents"]["leases"]
+    options = {"ttl_seconds": 30, "poll_interval": 0.01, "retain_seconds": 60}
+    options.update(kwargs)
+
+    return [MongoThreadLease(collection, **options) for _ in range(count)]
+
+
+def test_lease_is_exclusive_until_released() -> None:
+    async def scenario() -> None:
+        first, second = build_leases(2)
+
+        async with first.hold("thread"):
+            waiting = asyncio.create_task(second.acquire("thread"))
+            await asyncio.sleep(0.05)
+            assert not waiting.done()
+
+        lease = await asyncio.wait_for(waiting, timeout=1)
+        assert lease.last_checkpoint_id is None
+
+    asyncio.run(scenario())
+
+
+def test_expired_lease_can_be_taken_over() -> None:
+    async def scenario() -> None:
+        first, second = build_leases(2, ttl_seconds=0.05)
+
+        # The first worker dies while holding the lease, which is never renewed.
+        await first.acquire("thread")
+
+        lease = await asyncio.wait_for(second.acquire("thread"), timeout=1)
+        assert lease.thread_id == "thread"
+
+    asyncio.run(scenario())
+
+
+def test_reacquired_lease_returns_the_checkpoint_left_behind() -> None:
+    async def scenario() -> None:
+        first, second = build_leases(2)
+
+        async with first.hold("thread") as lease:
+            lease.checkpoint_id = "checkpoint-1"
+
+        async with first.hold("thread") as lease:
+            assert lease.last_checkpoint_id == "checkpoint-1"
+            lease.checkpoint_id = "checkpoint-2"
+
+        # Another worker held the lease in between, so its checkpoint is unknown.
+        async with second.hold("thread"):
+            pass
+        async with first.hold("thread") as lease:
+            assert lease.last_checkpoint_id is None
+
+    asyncio.run(scenario())
+
+
+def test_checkpoint_is_not_handed_over_once_retention_is_over() -> None:
+    async def scenario() -> None:
+        (lease_store,) = build_leases(1, retain_seconds=0.05)
+
+        async with lease_store.hold("thread") as lease:
+            lease.checkpoint_id = "checkpoint-1"
+        await asyncio.sleep(0.1)
+
+        # The expired document may not have been deleted by MongoDB yet.
+        async with lease_store.hold("thread") as lease:
+            assert lease.last_checkpoint_id is None
+
+    asyncio.run(scenario())
+
+
+def test_losing_the_lease_cancels_the_turn() -> None:
+    async def scenario() -> None:
+        first, second = build_leases(2, ttl_seconds=0.06)
+
+        async def turn() -> None:
+            async with first.hold("thread"):
+                # Another worker steals the lease, as if it had expired.
+                await first.collection.update_one(
+                    {"_id": "thread"}, {"$set": {"owner": second.owner}}
+                )
+                await asyncio.sleep(1)
+
+        with pytest.raises(ThreadLeaseLostError):
+            await asyncio.wait_for(turn(), timeout=1)
+
+    asyncio.run(scenario())
+
+
+def test_renewal_retries_after_mongo_errors() -> None:
+    async def scenario() -> None:
+        (lease,) = build_leases(1, ttl_seconds=0.06)
+        update_one = lease.collection.update_one
+        failures = 3
+
+        async def flaky_update_one(*args, **kwargs):
+            nonlocal failures
+            if failures > 0:
+                failures -= 1
+                raise AutoReconnect("primary stepped down")
+
+            return await update_one(*args, **kwargs)
+
+        lease.collection.update_one = flaky_update_one
+
+        async with lease.hold("thread"):
+            await asyncio.sleep(0.2)
+
+        assert failures == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,74 @@
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+import opik
+import pytest
+
+from philoagents.infrastructure import opik_utils
+from philoagents.infrastructure.tracing import TraceExporter
+
+
+class FakeOpik:
+    def __init__(self, **kwargs) -> None:
+        self.configured = opik_utils._configured.is_set()
+        self.traces: list[str] = []
+
+    def trace(self, name: str, **kwargs) -> None:
+        self.traces.append(name)
+
+    def flush(self, timeout: int) -> None:
+        pass
+
+
+def make_run(name: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        name=name,
+        start_time=datetime.now(),
+        end_time=datetime.now(),
+        inputs={},
+        outputs={},
+        error=None,
+        child_runs=[],
+    )
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+
+    return True
+
+
+@pytest.fixture
+def clients(monkeypatch: pytest.MonkeyPatch) -> list[FakeOpik]:
+    created: list[FakeOpik] = []
+
+    def create_client(**kwargs) -> FakeOpik:
+        created.append(FakeOpik(**kwargs))
+
+        return created[-1]
+
+    monkeypatch.setattr(opik, "Opik", create_client)
+    monkeypatch.setattr(opik_utils, "_configured", threading.Event())
+
+    return created
+
+
+def test_client_is_created_once_opik_is_configured(clients: list[FakeOpik]) -> None:
+    exporter = TraceExporter(max_queued=10)
+    exporter.submit(make_run("turn"), {}, tags=["sampled"])
+
+    time.sleep(0.1)
+    assert clients == []
+
+    opik_utils.configure()
+
+    assert wait_for(lambda: clients and clients[0].traces == ["turn"])
+    assert clients[0].configured
+
+    exporter.close(timeout=1.0)
@@ -0,0 +1,498 @@
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+import click
+import httpx
+import psutil
+from websockets.asyncio.client import connect
+
+TRANSPORTS = ("websocket", "sse", "rest")
+QUESTIONS = [
+    "Can a machine think?",
+    "What would it take for an AI to be conscious?",
+    "Should we trust the decisions of intelligent machines?",
+    "Is language enough to prove understanding?",
+]
+
+# The API runs with the fake LLM and in-memory conversation state, so the benchmark
+# measures our own stack only, without tracing. Rate limiting is disabled since every
+# session comes from the same address.
+BENCHMARK_ENV = {
+    "LLM_BACKEND": "fake",
+    "CHECKPOINTER_BACKEND": "memory",
+    "RESPONSE_CACHE_ENABLED": "false",
+    "THREAD_LEASE_ENABLED": "false",
+    "ADMISSION_RATE_PER_SECOND": "0",
+    "OPIK_TRACING_ENABLED": "false",
+}
+# Settings required at startup but never used by the fake stack.
+PLACEHOLDER_ENV = {
+    "GROQ_API_KEY": "benchmark",
+    "OPENAI_API_KEY": "benchmark",
+    "MONGO_URI": "mongodb://localhost:27017",
+}
+
+
+@dataclass
+class TurnResult:
+    """Timings of a single conversation turn, relative to when it was sent."""
+
+    started_at: float = field(default_factory=time.perf_counter)
+    first_chunk_seconds: float | None = None
+    chunk_gaps_seconds: list[float] = field(default_factory=list)
+    latency_seconds: float | None = None
+    error: str | None = None
+
+    last_chunk_at: float | None = field(default=None, repr=False)
+
+    def record_chunk(self) -> None:
+        now = time.perf_counter()
+        if self.first_chunk_seconds is None:
+            self.first_chunk_seconds = now - self.started_at
+        else:
+            self.chunk_gaps_seconds.append(now - self.last_chunk_at)
+        self.last_chunk_at = now
+
+    def finish(self, error: str | None = None) -> None:
+        self.latency_seconds = time.perf_counter() - self.started_at
+        self.error = error
+
+
+async def run_websocket_session(
+    base_url: str, philosopher_id: str, turns: int
+) -> list[TurnResult]:
+    results = []
+    async with connect(f"{base_url.replace('http', 'ws', 1)}/ws/chat") as websocket:
+        for turn in range(turns):
+            result = TurnResult()
+            await websocket.send(
+                json.dumps(
+                    {
+                        "message": QUESTIONS[turn % len(QUESTIONS)],
+                        "philosopher_id": philosopher_id,
+                    }
+                )
+            )
+
+            while result.latency_seconds is None:
+                frame = json.loads(await websocket.recv())
+                if "chunk" in frame:
+                    result.record_chunk()
+                elif "response" in frame:
+                    result.finish()
+                elif "error" in frame:
+                    result.finish(error=frame["error"])
+
+            results.append(result)
+
+    return results
+
+
+async def run_sse_session(
+    client: httpx.AsyncClient, philosopher_id: str, turns: int
+) -> list[TurnResult]:
+    results = []
+    for turn in range(turns):
+        result = TurnResult()
+        payload = {
+            "message": QUESTIONS[turn % len(QUESTIONS)],
+            "philosopher_id": philosopher_id,
+        }
+
+        try:
+            async with client.stream("POST", "/chat/stream", json=payload) as response:
+                response.raise_for_status()
+
+                event = None
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line.removeprefix("event:").strip()
+                    elif line.startswith("data:") and event == "chunk":
+                        result.record_chunk()
+                    elif line.startswith("data:") and event == "end":
+                        result.finish()
+                    elif line.startswith("data:") and event == "error":
+                        result.finish(error=json.loads(line[5:])["error"])
+        except httpx.HTTPError as e:
+            result.finish(error=str(e))
+
+        if result.latency_seconds is None:
+            result.finish(error="Stream ended without an end event.")
+        results.append(result)
+
+    return results
+
+
+async def run_rest_session(
+    client: httpx.AsyncClient, philosopher_id: str, turns: int
+) -> list[TurnResult]:
+    results = []
+    for turn in range(turns):
+        result = TurnResult()
+        payload = {
+            "message": QUESTIONS[turn % len(QUESTIONS)],
+            "philosopher_id": philosopher_id,
+        }
+
+        try:
+            response = await client.post("/chat", json=payload)
+            response.raise_for_status()
+            result.finish()
+        except httpx.HTTPError as e:
+            result.finish(error=str(e))
+
+        results.append(result)
+
+    return results
+
+
+async def run_phase(
+    transport: str,
+    base_url: str,
+    philosopher_ids: list[str],
+    turns: int,
+    server: psutil.Process | None,
+) -> dict:
+    """Runs one session per philosopher over `transport` and summarizes the turns.
+
+    Each session gets its own philosopher, hence its own conversation thread, so
+    sessions are not serialized by the per-thread turn locks.
+    """
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(120.0),
+        limits=httpx.Limits(max_connections=len(philosopher_ids)),
+    ) as client:
+        idle_rss = get_rss(server)
+        peak_rss = idle_rss
+        stop_sampling = asyncio.Event()
+
+        async def sample_rss() -> None:
+            nonlocal peak_rss
+            while not stop_sampling.is_set():
+                peak_rss = max(peak_rss, get_rss(server))
+                await asyncio.sleep(0.1)
+
+        sampler = asyncio.create_task(sample_rss())
+        started_at = time.perf_counter()
+
+        if transport == "websocket":
+            sessions = [
+                run_websocket_session(base_url, philosopher_id, turns)
+                for philosopher_id in philosopher_ids
+            ]
+        elif transport == "sse":
+            sessions = [
+                run_sse_session(client, philosopher_id, turns)
+                for philosopher_id in philosopher_ids
+            ]
+        else:
+            sessions = [
+                run_rest_session(client, philosopher_id, turns)
+                for philosopher_id in philosopher_ids
+            ]
+        session_results = await asyncio.gather(*sessions, return_exceptions=True)
+
+        elapsed = time.perf_counter() - started_at
+        stop_sampling.set()
+        await sampler
+
+        server_stats = (await client.get("/stats")).json()
+
+    results = []
+    for session_result in session_results:
+        if isinstance(session_result, BaseException):
+            failed_session = TurnResult()
+            failed_session.finish(error=f"Session failed: {session_result!r}")
+            results.append(failed_session)
+        else:
+            results.extend(session_result)
+
+    return {
+        **summarize_turns(results, elapsed),
+        "memory": summarize_memory(idle_rss, peak_rss, len(philosopher_ids)),
+        "server_stats": server_stats,
+    }
+
+
+def summarize_turns(results: list[TurnResult], elapsed: float) -> dict:
+    succeeded = [result for result in results if result.error is None]
+
+    return {
+        "turns": len(results),
+        "errors": len(results) - len(succeeded),
+        "error_samples": sorted({r.error for r in results if r.error})[:5],
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_turns_per_second": round(len(succeeded) / elapsed, 3),
+        "time_to_first_token_ms": get_percentiles(
+            [r.first_chunk_seconds for r in succeeded if r.first_chunk_seconds]
+        ),
+        # Chunk frames batch tokens according to the streaming flush policy.
+        "inter_chunk_ms": get_percentiles(
+            [gap for r in succeeded for gap in r.chunk_gaps_seconds]
+        ),
+        "turn_latency_ms": get_percentiles([r.latency_seconds for r in succeeded]),
+    }
+
+
+def summarize_memory(idle_rss: int, peak_rss: int, connections: int) -> dict | None:
+    if not idle_rss:
+        return None
+
+    return {
+        "idle_rss_mb": round(idle_rss / 2**20, 1),
+        "peak_rss_mb": round(peak_rss / 2**20, 1),
+        "per_connection_kb": round((peak_rss - idle_rss) / 1024 / connections, 1),
+    }
+
+
+def get_percentiles(values_seconds: list[float]) -> dict | None:
+    if not values_seconds:
+        return None
+
+    values_ms = [value * 1000 for value in values_seconds]
+    quantiles = (
+        statistics.quantiles(values_ms, n=100, method="inclusive")
+        if len(values_ms) > 1
+        else values_ms * 99
+    )
+
+    return {
+        "count": len(values_ms),
+        "mean": round(statistics.fmean(values_ms), 2),
+        "p50": round(quantiles[49], 2),
+        "p95": round(quantiles[94], 2),
+        "p99": round(quantiles[98], 2),
+        "max": round(max(values_ms), 2),
+    }
+
+
+def get_rss(server: psutil.Process | None) -> int:
+    """Returns the resident memory of the server and its children, in bytes."""
+
+    if server is None:
+        return 0
+
+    try:
+        processes = [server, *server.children(recursive=True)]
+
+        return sum(process.memory_info().rss for process in processes)
+    except psutil.Error:
+        return 0
+
+
+def write_personas(file_path: Path, count: int) -> list[str]:
+    """Writes `count` synthetic personas, one per session, plus one for the warm-up."""
+
+    personas = [
+        {
+            "id": f"bench-{index}",
+            "name": f"Benchmark Philosopher {index}",
+            "perspective": "Believes machines can think if they reason well.",
+            "style": "Answers briefly and calmly.",
+        }
+        for index in range(count + 1)
+    ]
+    file_path.write_text(json.dumps(personas), encoding="utf-8")
+
+    return [persona["id"] for persona in personas]
+
+
+@contextmanager
+def run_server(port: int, env: dict[str, str]) -> Iterator[psutil.Process]:
+    """Starts the API in a subprocess and waits until it serves requests."""
+
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "philoagents.infrastructure.api:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env=env,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                raise click.ClickException("The API exited during startup.")
+
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/stats").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if time.monotonic() > deadline:
+                    raise click.ClickException("The API did not start within 60s.")
+                time.sleep(0.2)
+
+        yield psutil.Process(process.pid)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run_benchmark(
+    base_url: str,
+    transports: list[str],
+    philosopher_ids: list[str],
+    warmup_philosopher_id: str,
+    turns: int,
+    server: psutil.Process | None,
+) -> dict:
+    # Loads the lazily imported modules and compiles prompts before measuring.
+    await run_websocket_session(base_url, warmup_philosopher_id, 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0) as client:
+        await run_rest_session(client, warmup_philosopher_id, 1)
+
+    return {
+        transport: await run_phase(transport, base_url, philosopher_ids, turns, server)
+        for transport in transports
+    }
+
+
+@click.command()
+@click.option(
+    "--sessions", default=20, type=int, help="Number of concurrent client sessions."
+)
+@click.option("--turns", default=5, type=int, help="Conversation turns per session.")
+@click.option(
+    "--transport",
+    "transports",
+    multiple=True,
+    type=click.Choice(TRANSPORTS),
+    help="Transports to benchmark, one after the other. Defaults to all of them.",
+)
+@click.option(
+    "--token-latency",
+    default=0.02,
+    type=float,
+    help="Seconds between two tokens of the fake LLM.",
+)
+@click.option(
+    "--response-tokens", default=40, type=int, help="Tokens per fake LLM answer."
+)
+@click.option(
+    "--port", default=8077, type=int, help="Port the API under test listens on."
+)
+@click.option(
+    "--url",
+    default=None,
+    help="Benchmark an already running API instead of starting one. "
+    "It must serve the 'bench-<n>' personas, and memory is not reported.",
+)
+@click.option(
+    "--output",
+    default=None,
+    type=click.Path(dir_okay=False, path_type=Path),
+    help="Write the results to this JSON file, for regression tracking.",
+)
+def main(
+    sessions: int,
+    turns: int,
+    transports: tuple[str, ...],
+    token_latency: float,
+    response_tokens: int,
+    port: int,
+    url: str | None,
+    output: Path | None,
+) -> None:
+    """Load test the API end to end with a fake LLM and in-memory conversation state.
+
+    Drives concurrent WebSocket, SSE and REST sessions and reports time to first
+    token, inter-chunk latency, p50/p95/p99 turn latency, throughput and server
+    memory per connection.
+
+    Args:
+        sessions: Number of concurrent client sessions.
+        turns: Conversation turns per session.
+        transports: Transports to benchmark, one after the other.
+        token_latency: Seconds between two tokens of the fake LLM.
+        response_tokens: Tokens per fake LLM answer.
+        port: Port the API under test listens on.
+        url: URL of an already running API to benchmark instead.
+        output: JSON file the results are written to.
+    """
+
+    transports = list(transports or TRANSPORTS)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        warmup_philosopher_id, *philosopher_ids = write_personas(
+            Path(tmp_dir) / "personas.json", sessions
+        )
+
+        if url is not None:
+            results = asyncio.run(
+                run_benchmark(
+                    url, transports, philosopher_ids, warmup_philosopher_id, turns, None
+                )
+            )
+        else:
+            env = {
+                **PLACEHOLDER_ENV,
+                **os.environ,
+                **BENCHMARK_ENV,
+                "FAKE_LLM_TOKEN_LATENCY_SECONDS": str(token_latency),
+                "FAKE_LLM_RESPONSE_TOKENS": str(response_tokens),
+                "PHILOSOPHERS_FILE_PATH": str(Path(tmp_dir) / "personas.json"),
+                "ADMISSION_MAX_CONCURRENT_GENERATIONS": str(max(sessions, 1)),
+                "ADMISSION_MAX_QUEUED": str(max(sessions, 1)),
+            }
+            with run_server(port, env) as server:
+                results = asyncio.run(
+                    run_benchmark(
+                        f"http://127.0.0.1:{port}",
+                        transports,
+                        philosopher_ids,
+                        warmup_philosopher_id,
+                        turns,
+                        server,
+                    )
+                )
+
+    report = {
+        "config": {
+            "sessions": sessions,
+            "turns": turns,
+            "token_latency": token_latency,
+            "response_tokens": response_tokens,
+            "url": url,
+        },
+        "results": results,
+    }
+
+    for transport, result in results.items():
+        latency = result["turn_latency_ms"] or {}
+        first_token = result["time_to_first_token_ms"] or {}
+        click.echo(
+            f"{transport:<10} {result['throughput_turns_per_second']:>8.2f} turns/s | "
+            f"TTFT p50 {first_token.get('p50', '-')} ms | "
+            f"latency p50 {latency.get('p50', '-')} / p95 {latency.get('p95', '-')} "
+            f"/ p99 {latency.get('p99', '-')} ms | errors {result['errors']}"
+        )
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        click.echo(f"Results written to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import click
+
+# Entry points with their import time budget, in milliseconds, and the heavy modules
+# they must not load at import time.
+HEAVY_MODULES = ["torch", "sentence_transformers", "langchain_huggingface", "opik"]
+IMPORT_BUDGETS = {
+    "philoagents.config": {"budget_ms": 400, "forbidden": HEAVY_MODULES},
+    "philoagents.domain": {"budget_ms": 500, "forbidden": HEAVY_MODULES},
+    "philoagents.application": {
+        "budget_ms": 500,
+        "forbidden": [*HEAVY_MODULES, "langchain_mongodb"],
+    },
+    "philoagents.application.conversation_service.generate_response": {
+        "budget_ms": 3000,
+        "forbidden": HEAVY_MODULES,
+    },
+    "philoagents.infrastructure.api": {
+        "budget_ms": 4000,
+        "forbidden": HEAVY_MODULES,
+    },
+}
+
+
+def measure_import(module: str) -> tuple[float, set[str]]:
+    """Imports `module` in a fresh interpreter with `-X importtime`.
+
+    Args:
+        module: Dotted name of the module to import.
+
+    Returns:
+        tuple[float, set[str]]: The cumulative import time of the module in
+            milliseconds and the names of every module it loaded.
+
+    Raises:
+        click.ClickException: If the module can't be imported.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise click.ClickException(f"Failed to import '{module}':\n{result.stderr}")
+
+    cumulative_us = 0
+    imported_modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # Header line.
+
+        name = fields[2].strip()
+        imported_modules.add(name)
+        if name == module:
+            cumulative_us = int(fields[1])
+
+    return cumulative_us / 1000, imported_modules
+
+
+@click.command()
+@click.option(
+    "--runs",
+    default=5,
+    type=int,
+    help="Number of fresh interpreters per module. The median time is reported.",
+)
+@click.option(
+    "--budget",
+    "budget_overrides",
+    multiple=True,
+    help="Override a budget, as `module=milliseconds`. Can be repeated.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Optional path to write the JSON report to.",
+)
+def main(runs: int, budget_overrides: tuple[str, ...], output: Path | None) -> None:
+    """Benchmark the cold import time of the API and CLI entry points.
+
+    Each module is imported in fresh interpreters with `python -X importtime`. The
+    command fails if a module exceeds its time budget or loads one of the heavy
+    modules (torch, sentence-transformers, opik, ...) that must only be imported
+    on first use.
+
+    Args:
+        runs: Number of fresh interpreters per module.
+        budget_overrides: Budgets to override, as `module=milliseconds`.
+        output: Optional path to write the JSON report to.
+    """
+
+    budgets = {module: dict(config) for module, config in IMPORT_BUDGETS.items()}
+    for override in budget_overrides:
+        module, _, budget_ms = override.partition("=")
+        budgets.setdefault(module, {"forbidden": []})["budget_ms"] = float(budget_ms)
+
+    report = {"python": sys.version.split()[0], "runs": runs, "modules": {}}
+    for module, config in budgets.items():
+        timings_ms = []
+        for _ in range(runs):
+            import_time_ms, imported_modules = measure_import(module)
+            timings_ms.append(import_time_ms)
+
+        median_ms = statistics.median(timings_ms)
+        loaded_heavy_modules = sorted(
+            set(config["forbidden"]) & {name.split(".")[0] for name in imported_modules}
+        )
+
+        report["modules"][module] = {
+            "median_ms": round(median_ms, 1),
+            "min_ms": round(min(timings_ms), 1),
+            "budget_ms": config["budget_ms"],
+            "loaded_heavy_modules": loaded_heavy_modules,
+            "passed": median_ms <= config["budget_ms"] and not loaded_heavy_modules,
+        }
+
+    report_json = json.dumps(report, indent=4)
+    click.echo(report_json)
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(report_json, encoding="utf-8")
+
+    failed_modules = [
+        module for module, result in report["modules"].items() if not result["passed"]
+    ]
+    if failed_modules:
+        raise click.ClickException(
+            f"Import time budget exceeded for: {', '.join(failed_modules)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
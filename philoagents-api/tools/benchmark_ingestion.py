@@ -0,0 +1,301 @@
+import json
+import random
+import statistics
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import click
+import psutil
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+from philoagents.application.data import deduplicate_documents
+from philoagents.application.data.extract import extract_paragraphs_and_headers
+from philoagents.application.rag.splitters import get_splitter
+from philoagents.config import settings
+
+STAGES = ("extract", "split", "deduplicate", "embed", "ingest")
+VOCABULARY = (
+    "being substance form matter cause virtue soul reason knowledge truth justice "
+    "nature mind language world good state citizen logic argument premise "
+    "conclusion perception memory habit happiness friendship law city art science"
+).split()
+
+
+class PeakRSS:
+    """Samples the resident memory of this process while the context is active."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.peak = 0
+
+        self.__process = psutil.Process()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__sample, daemon=True)
+
+    def __enter__(self) -> "PeakRSS":
+        self.peak = self.__process.memory_info().rss
+        self.__thread.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.__stopped.set()
+        self.__thread.join()
+        self.peak = max(self.peak, self.__process.memory_info().rss)
+
+    def __sample(self) -> None:
+        while not self.__stopped.wait(self.interval):
+            self.peak = max(self.peak, self.__process.memory_info().rss)
+
+
+def generate_pages(
+    num_docs: int, words_per_doc: int, duplicate_ratio: float, seed: int
+) -> list[str]:
+    """Generates synthetic encyclopedia pages as HTML.
+
+    Pages hold headed paragraphs of random words plus a bibliography section, which
+    extraction strips. A `duplicate_ratio` share of them are near-duplicates of
+    another page, so deduplication has work to do.
+    """
+
+    rng = random.Random(seed)
+
+    pages = []
+    for index in range(num_docs):
+        if pages and rng.random() < duplicate_ratio:
+            page = rng.choice(pages).replace("</p>", " Revised edition.</p>", 1)
+        else:
+            sections = []
+            for section in range(max(1, words_per_doc // 400)):
+                paragraphs = "".join(
+                    f"<p>{' '.join(rng.choices(VOCABULARY, k=80)).capitalize()}.</p>"
+                    for _ in range(5)
+                )
+                sections.append(f"<h2>{section + 1}. Section</h2>{paragraphs}")
+
+            page = (
+                f"<html><head><title>Philosopher {index}</title></head><body>"
+                f"<div id='article'><h1>Philosopher {index}</h1>{''.join(sections)}</div>"
+                "<div id='bibliography'><p>Some reference, 1999.</p></div>"
+                "<div class='footer'><p>Copyright.</p></div></body></html>"
+            )
+        pages.append(page)
+
+    return pages
+
+
+def extract_pages(pages: list[str]) -> list[Document]:
+    return [
+        Document(
+            page_content=extract_paragraphs_and_headers(
+                BeautifulSoup(page, "html.parser")
+            ),
+            metadata={"source": f"synthetic://{index}", "philosopher_id": "benchmark"},
+        )
+        for index, page in enumerate(pages)
+    ]
+
+
+def measure(stage: Callable[[], Any], rounds: int) -> tuple[Any, dict[str, float]]:
+    """Runs `stage` `rounds` times and returns its last output with its timings."""
+
+    durations = []
+    start_rss = psutil.Process().memory_info().rss
+    with PeakRSS() as peak_rss:
+        for _ in range(rounds):
+            started_at = time.perf_counter()
+            output = stage()
+            durations.append(time.perf_counter() - started_at)
+
+    return output, {
+        "median_seconds": round(statistics.median(durations), 4),
+        "min_seconds": round(min(durations), 4),
+        "peak_rss_mb": round(peak_rss.peak / 2**20, 1),
+        "rss_growth_mb": round((peak_rss.peak - start_rss) / 2**20, 1),
+    }
+
+
+def throughput(count: int, seconds: float) -> float:
+    return round(count / seconds, 2) if seconds > 0 else float("inf")
+
+
+@click.command()
+@click.option("--docs", "num_docs", default=200, type=int, help="Synthetic pages.")
+@click.option(
+    "--words-per-doc", default=2000, type=int, help="Approximate words per page."
+)
+@click.option(
+    "--duplicate-ratio",
+    default=0.1,
+    type=float,
+    help="Share of pages that are near-duplicates of another one.",
+)
+@click.option("--rounds", default=3, type=int, help="Runs per stage.")
+@click.option(
+    "--stage",
+    "stages",
+    multiple=True,
+    type=click.Choice(STAGES),
+    help="Stages to benchmark. Defaults to all of them. The stages a selected "
+    "stage depends on are run untimed.",
+)
+@click.option("--seed", default=42, type=int, help="Seed of the synthetic corpus.")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Optional path to write the JSON report to.",
+)
+def main(
+    num_docs: int,
+    words_per_doc: int,
+    duplicate_ratio: float,
+    rounds: int,
+    stages: tuple[str, ...],
+    seed: int,
+    output: Path | None,
+) -> None:
+    """Benchmark each stage of the long-term memory ingestion on a synthetic corpus.
+
+    The stages are those of `create_long_term_memory.py`: extracting the article
+    text from HTML pages, splitting it into chunks, deduplicating the chunks,
+    embedding them and inserting them into MongoDB (in a scratch collection, dropped
+    afterwards). Pages are generated locally, so no network access is needed except
+    to download the embedding model once. The report gives the median duration,
+    throughput and peak RSS of each stage.
+
+    Args:
+        num_docs: Number of synthetic pages.
+        words_per_doc: Approximate words per page.
+        duplicate_ratio: Share of pages that are near-duplicates of another one.
+        rounds: Runs per stage; the median duration is reported.
+        stages: Stages to benchmark. Defaults to all of them.
+        seed: Seed of the synthetic corpus.
+        output: Optional path to write the JSON report to.
+    """
+
+    selected_stages = set(stages or STAGES)
+    last_stage = max(STAGES.index(stage) for stage in selected_stages)
+    report: dict[str, Any] = {
+        "config": {
+            "docs": num_docs,
+            "words_per_doc": words_per_doc,
+            "duplicate_ratio": duplicate_ratio,
+            "rounds": rounds,
+            "chunk_size": settings.RAG_CHUNK_SIZE,
+            "embedding_model_id": settings.RAG_TEXT_EMBEDDING_MODEL_ID,
+            "device": settings.RAG_DEVICE,
+        },
+        "stages": {},
+    }
+
+    def run(stage: str, function: Callable[[], Any]) -> tuple[Any, dict | None]:
+        if stage not in selected_stages:
+            return function(), None
+
+        output, timings = measure(function, rounds)
+        report["stages"][stage] = timings
+
+        return output, timings
+
+    pages = generate_pages(num_docs, words_per_doc, duplicate_ratio, seed)
+
+    docs, timings = run("extract", lambda: extract_pages(pages))
+    if timings:
+        timings["docs_per_second"] = throughput(len(docs), timings["median_seconds"])
+
+    if last_stage >= STAGES.index("split"):
+        splitter = get_splitter(chunk_size=settings.RAG_CHUNK_SIZE)
+        chunks, timings = run("split", lambda: splitter.split_documents(docs))
+        if timings:
+            timings["docs_per_second"] = throughput(
+                len(docs), timings["median_seconds"]
+            )
+            timings["chunks_per_second"] = throughput(
+                len(chunks), timings["median_seconds"]
+            )
+            timings["chunks"] = len(chunks)
+
+    if last_stage >= STAGES.index("deduplicate"):
+        unique_chunks, timings = run(
+            "deduplicate", lambda: deduplicate_documents(chunks, threshold=0.7)
+        )
+        if timings:
+            timings["chunks_per_second"] = throughput(
+                len(chunks), timings["median_seconds"]
+            )
+            timings["duplicates_removed"] = len(chunks) - len(unique_chunks)
+
+    if last_stage >= STAGES.index("embed"):
+        from philoagents.application.rag.embeddings import get_embedding_model
+
+        started_at = time.perf_counter()
+        embedding_model = get_embedding_model(
+            settings.RAG_TEXT_EMBEDDING_MODEL_ID, settings.RAG_DEVICE
+        )
+        load_seconds = time.perf_counter() - started_at
+
+        texts = [chunk.page_content for chunk in unique_chunks]
+        embeddings, timings = run(
+            "embed", lambda: embedding_model.embed_documents(texts)
+        )
+        if timings:
+            timings["embeddings_per_second"] = throughput(
+                len(texts), timings["median_seconds"]
+            )
+            timings["model_load_seconds"] = round(load_seconds, 4)
+
+    if last_stage >= STAGES.index("ingest"):
+        from philoagents.infrastructure.mongo import (
+            MongoClientWrapper,
+            close_mongo_clients,
+        )
+
+        embedded_chunks = [
+            Document(
+                page_content=chunk.page_content,
+                metadata={**chunk.metadata, "embedding": embedding},
+            )
+            for chunk, embedding in zip(unique_chunks, embeddings)
+        ]
+
+        try:
+            with MongoClientWrapper(
+                model=Document,
+                collection_name=f"{settings.MONGO_LONG_TERM_MEMORY_COLLECTION}_benchmark",
+            ) as client:
+
+                def ingest() -> None:
+                    client.clear_collection()
+                    client.ingest_documents(embedded_chunks)
+
+                _, timings = run("ingest", ingest)
+                timings["chunks_per_second"] = throughput(
+                    len(embedded_chunks), timings["median_seconds"]
+                )
+                client.collection.drop()
+        finally:
+            close_mongo_clients()
+
+    for stage, timings in report["stages"].items():
+        rates = ", ".join(
+            f"{value} {key.removesuffix('_per_second').replace('_', ' ')}/s"
+            for key, value in timings.items()
+            if key.endswith("_per_second")
+        )
+        click.echo(
+            f"{stage:<12} {timings['median_seconds']:>9.4f}s | {rates} | "
+            f"peak RSS {timings['peak_rss_mb']} MB"
+        )
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        click.echo(f"Report written to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
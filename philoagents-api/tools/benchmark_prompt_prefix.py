@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import click
+import tiktoken
+from langchain_core.messages import HumanMessage
+
+from philoagents.application.conversation_service.workflow import (
+    get_philosopher_response_prompt,
+)
+from philoagents.domain.philosopher_factory import PhilosopherFactory
+
+SAMPLE_SUMMARIES = [
+    "",
+    "The user introduced themselves as Sophia and asked whether machines can think.",
+    "The user asked about consciousness. The philosopher argued that understanding "
+    "requires more than symbol manipulation, and the user pushed back with examples "
+    "of large language models solving novel problems.",
+]
+
+
+def common_prefix_length(sequences: list[list[int]] | list[str]) -> int:
+    """Returns the length of the longest prefix shared by all sequences."""
+
+    prefix_length = 0
+    for items in zip(*sequences):
+        if any(item != items[0] for item in items[1:]):
+            break
+        prefix_length += 1
+
+    return prefix_length
+
+
+@click.command()
+@click.option(
+    "--encoding-name",
+    default="cl100k_base",
+    help="tiktoken encoding used to count prompt tokens.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Optional path to write the JSON report to.",
+)
+def main(encoding_name: str, output: Path | None) -> None:
+    """Benchmark how stable the philosopher system prompt prefix is across turns.
+
+    For every philosopher, the system prompt is rendered with summaries of growing
+    length (as the conversation goes on). The report gives the number of prompt
+    tokens per turn and the number of leading tokens shared by every turn, i.e.
+    the part of the prompt that providers can serve from their prompt cache.
+
+    Args:
+        encoding_name: tiktoken encoding used to count prompt tokens.
+        output: Optional path to write the JSON report to.
+    """
+
+    encoding = tiktoken.get_encoding(encoding_name)
+
+    report = {"encoding_name": encoding_name, "philosophers": {}}
+    for philosopher_id in PhilosopherFactory.get_available_philosophers():
+        philosopher = PhilosopherFactory.get_philosopher(philosopher_id)
+        prompt = get_philosopher_response_prompt(philosopher)
+
+        rendered_prompts = []
+        for summary in SAMPLE_SUMMARIES:
+            prompt_value = prompt.invoke(
+                {
+                    "messages": [HumanMessage(content="What is intelligence?")],
+                    "philosopher_context": "",
+                    "summary": summary,
+                }
+            )
+            rendered_prompts.append(prompt_value.to_messages()[0].content)
+
+        tokenized_prompts = [encoding.encode(text) for text in rendered_prompts]
+        prompt_tokens = [len(tokens) for tokens in tokenized_prompts]
+        stable_prefix_tokens = common_prefix_length(tokenized_prompts)
+
+        report["philosophers"][philosopher_id] = {
+            "prompt_tokens": prompt_tokens,
+            "stable_prefix_chars": common_prefix_length(rendered_prompts),
+            "stable_prefix_tokens": stable_prefix_tokens,
+            "stable_prefix_ratio": round(stable_prefix_tokens / max(prompt_tokens), 3),
+        }
+
+    report_json = json.dumps(report, indent=4)
+    click.echo(report_json)
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(report_json, encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ import click
 from philoagents.application.conversation_service.generate_response import (
     get_response,
 )
-from philoagents.domain.philosopher_factory import PhilosopherFactory
+from philoagents.infrastructure.opik_utils import configure
 
 
 def async_command(f):
@@ -33,8 +33,7 @@ async def main(philosopher_id: str, query: str) -> None:
         query: Query to call the agent with.
     """
 
-    philosopher_factory = PhilosopherFactory()
-    philosopher = philosopher_factory.get_philosopher(philosopher_id)
+    configure()
 
     print(
         f"\033[32mCalling agent with philosopher_id: `{philosopher_id}` and query: `{query}`\033[0m"
@@ -45,9 +44,6 @@ async def main(philosopher_id: str, query: str) -> None:
     response, _ = await get_response(
         messages=query,
         philosopher_id=philosopher_id,
-        philosopher_name=philosopher.name,
-        philosopher_perspective=philosopher.perspective,
-        philosopher_style=philosopher.style,
         philosopher_context="",
     )
 
@@ -0,0 +1,53 @@
+import asyncio
+
+import click
+from loguru import logger
+
+from philoagents.application.conversation_service.compact_conversation import (
+    compact_conversation_state,
+)
+from philoagents.config import settings
+from philoagents.infrastructure.mongo import close_mongo_clients
+
+
+@click.command()
+@click.option(
+    "--keep-last",
+    type=int,
+    default=settings.MONGO_STATE_KEEP_LAST_CHECKPOINTS,
+    help="Number of checkpoints to keep per conversation thread.",
+)
+@click.option(
+    "--thread-id",
+    type=str,
+    default=None,
+    help="Only compact this conversation thread.",
+)
+@click.option(
+    "--archive/--no-archive",
+    default=True,
+    help="Whether to archive pruned checkpoints before deleting them.",
+)
+def main(keep_last: int, thread_id: str | None, archive: bool) -> None:
+    """CLI command to prune old conversation checkpoints.
+
+    Args:
+        keep_last: Number of checkpoints to keep per conversation thread.
+        thread_id: Only compact this conversation thread.
+        archive: Whether to archive pruned checkpoints before deleting them.
+    """
+
+    try:
+        result = asyncio.run(
+            compact_conversation_state(
+                keep_last=keep_last, thread_id=thread_id, archive=archive
+            )
+        )
+    finally:
+        close_mongo_clients()
+
+    logger.info(result["message"])
+
+
+if __name__ == "__main__":
+    main()
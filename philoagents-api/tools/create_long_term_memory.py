@@ -5,6 +5,7 @@ import click
 from philoagents.application import LongTermMemoryCreator
 from philoagents.config import settings
 from philoagents.domain.philosopher import PhilosopherExtract
+from philoagents.infrastructure.mongo import close_mongo_clients
 
 
 @click.command()
@@ -22,8 +23,11 @@ def main(metadata_file: Path) -> None:
     """
     philosophers = PhilosopherExtract.from_json(metadata_file)
 
-    long_term_memory_creator = LongTermMemoryCreator.build_from_settings()
-    long_term_memory_creator(philosophers)
+    try:
+        long_term_memory_creator = LongTermMemoryCreator.build_from_settings()
+        long_term_memory_creator(philosophers)
+    finally:
+        close_mongo_clients()
 
 
 if __name__ == "__main__":
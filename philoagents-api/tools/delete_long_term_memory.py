@@ -1,9 +1,9 @@
 import click
 from loguru import logger
-from pymongo import MongoClient
 from pymongo.database import Database
 
 from philoagents.config import settings
+from philoagents.infrastructure.mongo import close_mongo_clients, get_mongo_client
 
 
 @click.command()
@@ -34,18 +34,17 @@ def main(collection_name: str, mongo_uri: str, db_name: str) -> None:
         db_name (str): The name of the database containing the collection.
     """
 
-    client = MongoClient(mongo_uri)
-
-    db: Database = client[db_name]
-
-    # Delete collection if it exists
-    if collection_name in db.list_collection_names():
-        db.drop_collection(collection_name)
-        logger.info(f"Successfully deleted '{collection_name}' collection.")
-    else:
-        logger.info(f"'{collection_name}' collection does not exist.")
-
-    client.close()
+    try:
+        db: Database = get_mongo_client(mongo_uri)[db_name]
+
+        # Delete collection if it exists
+        if collection_name in db.list_collection_names():
+            db.drop_collection(collection_name)
+            logger.info(f"Successfully deleted '{collection_name}' collection.")
+        else:
+            logger.info(f"'{collection_name}' collection does not exist.")
+    finally:
+        close_mongo_clients()
 
 
 if __name__ == "__main__":
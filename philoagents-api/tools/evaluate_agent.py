@@ -4,6 +4,7 @@ import click
 
 from philoagents.application.evaluation import evaluate_agent, upload_dataset
 from philoagents.config import settings
+from philoagents.infrastructure.opik_utils import configure
 
 
 @click.command()
@@ -31,6 +32,8 @@ def main(name: str, data_path: Path, workers: int, nb_samples: int) -> None:
         nb_samples (int): Number of samples to evaluate
     """
 
+    configure()
+
     dataset = upload_dataset(name=name, data_path=data_path)
     evaluate_agent(dataset, workers=workers, nb_samples=nb_samples)
 
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import click
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FAKE_ANSWER = (
+    "That is a fascinating question. Before answering it, let us agree on what we "
+    "mean by intelligence, for a machine that merely follows rules may appear wise "
+    "without understanding anything at all."
+)
+
+
+def create_app(
+    token_latency: float, failure_rate: float, retry_after: float | None
+) -> FastAPI:
+    """Builds an OpenAI-compatible chat completions server with a canned answer.
+
+    The answer is streamed word by word, `token_latency` seconds apart. A fraction
+    `failure_rate` of the requests fail with a 429 (with a `Retry-After` header when
+    `retry_after` is set) or a 503, to exercise retries and failover.
+    """
+
+    app = FastAPI()
+
+    # Groq clients call `/openai/v1/...`, OpenAI clients call `/v1/...`.
+    @app.post("/openai/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake-model")
+
+        if random.random() < failure_rate:
+            if random.random() < 0.5:
+                headers = (
+                    {"retry-after": str(retry_after)} if retry_after is not None else {}
+                )
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached", "type": "rate_limit"}},
+                    status_code=429,
+                    headers=headers,
+                )
+
+            return JSONResponse(
+                {"error": {"message": "Service unavailable", "type": "overloaded"}},
+                status_code=503,
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        tokens = [f"{word} " for word in FAKE_ANSWER.split()]
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_latency * len(tokens))
+
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": FAKE_ANSWER},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": len(tokens),
+                },
+            }
+
+        async def stream_tokens():
+            for token in tokens:
+                await asyncio.sleep(token_latency)
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "delta": {"content": token}, "finish_reason": None}
+                    ],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+
+            final_chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(final_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream_tokens(), media_type="text/event-stream")
+
+    return app
+
+
+@click.command()
+@click.option("--host", default="127.0.0.1", help="Host to bind to.")
+@click.option("--port", default=8001, type=int, help="Port to listen on.")
+@click.option(
+    "--token-latency",
+    default=0.02,
+    type=float,
+    help="Seconds between two streamed tokens.",
+)
+@click.option(
+    "--failure-rate",
+    default=0.0,
+    type=float,
+    help="Fraction of requests failing with a 429 or a 503.",
+)
+@click.option(
+    "--retry-after",
+    default=None,
+    type=float,
+    help="Retry-After header sent with 429 responses, in seconds.",
+)
+def main(
+    host: str,
+    port: int,
+    token_latency: float,
+    failure_rate: float,
+    retry_after: float | None,
+) -> None:
+    """Run a local fake LLM server speaking the OpenAI chat completions API.
+
+    Point the API at it with `GROQ_BASE_URL=http://127.0.0.1:8001` to test retries,
+    failover and circuit breaking without calling a real provider.
+
+    Args:
+        host: Host to bind to.
+        port: Port to listen on.
+        token_latency: Seconds between two streamed tokens.
+        failure_rate: Fraction of requests failing with a 429 or a 503.
+        retry_after: Retry-After header sent with 429 responses, in seconds.
+    """
+
+    uvicorn.run(
+        create_app(token_latency, failure_rate, retry_after), host=host, port=port
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from loguru import logger
 from philoagents.application.evaluation import EvaluationDatasetGenerator
 from philoagents.config import settings
 from philoagents.domain.philosopher import PhilosopherExtract
+from philoagents.infrastructure.opik_utils import configure
 
 
 @click.command()
@@ -37,6 +38,8 @@ def main(metadata_file: Path, temperature: float, max_samples: int) -> None:
         max_samples: Maximum number of samples to generate
     """
 
+    configure()
+
     philosophers = PhilosopherExtract.from_json(metadata_file)
 
     logger.info(